@@ -0,0 +1,306 @@
+"""Wire the app to the stand-in providers and drive it under load."""
+
+from __future__ import annotations
+
+import math
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest.mock import patch
+from uuid import uuid4
+
+from .stub_server import StubProviders, load_fixture
+
+
+class _StubTavily:
+    """Drop-in for ``TavilySearchResults`` that queries the stand-in server."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+
+    def invoke(self, query: str) -> List[Dict[str, Any]]:
+        from vp_generator.services.http_pool import get_http_client
+
+        response = get_http_client(self.url).post(self.url, json={"query": query})
+        response.raise_for_status()
+        return response.json()["results"]
+
+    async def ainvoke(self, query: str) -> List[Dict[str, Any]]:
+        from vp_generator.services.http_pool import get_async_http_client
+
+        response = await get_async_http_client(self.url).post(self.url, json={"query": query})
+        response.raise_for_status()
+        return response.json()["results"]
+
+
+@contextmanager
+def stand_in_providers(
+    base_url: str, *, search_cache: bool = False, llm_cache: bool = False
+) -> Iterator[None]:
+    """Point every provider integration at ``base_url`` for the duration of the block.
+
+    Both caches are off by default: every scenario repeats one request, so they
+    would otherwise measure cache hits rather than the providers.
+    """
+
+    from vp_generator import config, langgraph_agent, llm, llm_cache as llm_cache_module
+    from vp_generator import search_cache as cache_module
+    from vp_generator.services import amadeus_client, exa_client, flights, hotelbeds, hotels
+
+    env = {
+        "OPENAI_API_KEY": "bench-openai-key",
+        "OPENAI_BASE_URL": f"{base_url}/openai/v1",
+        "OPENAI_API_BASE": f"{base_url}/openai/v1",
+        "VP_AGENT_LLM_PROVIDER": "openai",
+        "AMADEUS_API_KEY": "bench",
+        "AMADEUS_API_SECRET": "bench",
+        "TRAVEL_PAYOUTS_TOKEN": "bench",
+        "AVIASALES_PARTNER_ID": "bench",
+        "HOTELBEDS_API_KEY": "bench",
+        "HOTELBEDS_API_SECRET": "bench",
+        "SERPAPI_KEY": "bench",
+        "RAPIDAPI_KEY": "",
+        "ANTHROPIC_API_KEY": "",
+    }
+    with ExitStack() as stack:
+        stack.enter_context(patch.dict(os.environ, env))
+        stack.enter_context(patch.object(exa_client, "EXA_API_KEY", "bench"))
+        stack.enter_context(patch.object(exa_client, "EXA_SEARCH_URL", f"{base_url}/exa/search"))
+        stack.enter_context(
+            patch.object(langgraph_agent, "get_tavily", lambda: _StubTavily(f"{base_url}/tavily/search"))
+        )
+        stack.enter_context(
+            patch.object(amadeus_client, "TOKEN_URL", f"{base_url}/amadeus/v1/security/oauth2/token")
+        )
+        stack.enter_context(
+            patch.object(flights, "AMADEUS_FLIGHTS_URL", f"{base_url}/amadeus/v2/shopping/flight-offers")
+        )
+        stack.enter_context(
+            patch.object(flights, "AVIASALES_URL", f"{base_url}/travelpayouts/v1/prices/cheap")
+        )
+        stack.enter_context(
+            patch.object(hotelbeds, "HOTELBEDS_TEST_ENDPOINT", f"{base_url}/hotelbeds/hotel-api/1.0/hotels")
+        )
+        stack.enter_context(patch.object(hotels, "SERP_API_ENDPOINT", f"{base_url}/serpapi/search"))
+        stack.enter_context(patch.object(llm, "_client", None))
+        if not search_cache:
+            stack.enter_context(patch.object(cache_module, "_cache", None))
+        if not llm_cache:
+            stack.enter_context(patch.object(llm_cache_module, "_cache", None))
+        # Settings and the agent LLM are cached from the real environment.
+        config.get_settings.cache_clear()
+        langgraph_agent.get_llm.cache_clear()
+        stack.callback(config.get_settings.cache_clear)
+        stack.callback(langgraph_agent.get_llm.cache_clear)
+        yield
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+Scenario = Callable[[int], Any]
+
+
+def _pipeline_scenario(_base_url: Optional[str]) -> Scenario:
+    from vp_generator import TripRequest, generate_visa_pack
+
+    request = load_fixture("requests")["legacy"]
+    return lambda _i: generate_visa_pack(TripRequest(**request))
+
+
+def _agent_scenario(_base_url: Optional[str]) -> Scenario:
+    from vp_generator.langgraph_agent import run_vpagent
+
+    payload = load_fixture("requests")["agent"]
+    payload = {**payload, "num_travelers": len(payload["travelers"])}
+    return lambda _i: run_vpagent(payload, thread_id=f"bench-{uuid4()}")
+
+
+def _http_scenario(path: str, fixture_key: str) -> Callable[[Optional[str]], Scenario]:
+    def _build(api_url: Optional[str]) -> Scenario:
+        import httpx
+
+        body = load_fixture("requests")[fixture_key]
+        client = httpx.Client(base_url=api_url or "", timeout=120.0)
+
+        def _call(_i: int) -> Any:
+            response = client.post(path, json=body)
+            response.raise_for_status()
+            return response
+
+        return _call
+
+    return _build
+
+
+SCENARIOS: Dict[str, Callable[[Optional[str]], Scenario]] = {
+    "pipeline": _pipeline_scenario,
+    "agent": _agent_scenario,
+    "http_visa_pack": _http_scenario("/visa-pack", "legacy"),
+    "http_agent": _http_scenario("/visa-pack/agent", "agent"),
+}
+
+
+class ApiServer:
+    """Run the FastAPI app under uvicorn on an ephemeral local port."""
+
+    def __init__(self) -> None:
+        import uvicorn
+
+        from vp_generator.api import app
+
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="on")
+        )
+        self._thread = threading.Thread(target=self._server.run, name="bench-api", daemon=True)
+
+    def __enter__(self) -> str:
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+# ---------------------------------------------------------------------------
+# Load generation and statistics
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    requests: int
+    concurrency: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    throughput_rps: float
+    peak_rss_mb: float
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def percentile(samples: List[float], quantile: float) -> float:
+    """Nearest-rank percentile of ``samples`` (which need not be sorted)."""
+
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(quantile * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def current_rss_mb() -> float:
+    """Resident set size right now (Linux); falls back to the peak elsewhere."""
+
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return peak_rss_mb()
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+def run_load(
+    name: str, call: Scenario, *, requests: int, concurrency: int, warmup: int = 1
+) -> ScenarioResult:
+    for i in range(warmup):
+        call(-1 - i)
+
+    def _timed(i: int) -> Optional[float]:
+        started = time.perf_counter()
+        try:
+            call(i)
+        except Exception:  # noqa: BLE001 - errors are counted, not fatal
+            return None
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bench-{name}") as pool:
+        outcomes = list(pool.map(_timed, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = [ms for ms in outcomes if ms is not None]
+    return ScenarioResult(
+        scenario=name,
+        requests=requests,
+        concurrency=concurrency,
+        errors=requests - len(latencies),
+        p50_ms=round(percentile(latencies, 0.50), 1),
+        p95_ms=round(percentile(latencies, 0.95), 1),
+        p99_ms=round(percentile(latencies, 0.99), 1),
+        mean_ms=round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+        throughput_rps=round(len(latencies) / wall, 3) if wall else 0.0,
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def run_benchmarks(
+    scenarios: List[str],
+    *,
+    requests: int = 20,
+    concurrency: int = 4,
+    warmup: int = 1,
+    latency_scale: float = 1.0,
+    search_cache: bool = False,
+    llm_cache: bool = False,
+) -> Dict[str, Any]:
+    """Run ``scenarios`` against freshly started stand-ins and return a report."""
+
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {sorted(unknown)}; choose from {sorted(SCENARIOS)}.")
+    results: List[ScenarioResult] = []
+    with StubProviders(latency_scale=latency_scale) as stub, stand_in_providers(
+        stub.base_url, search_cache=search_cache, llm_cache=llm_cache
+    ):
+        needs_api = any(name.startswith("http_") for name in scenarios)
+        with ApiServer() if needs_api else _no_server() as api_url:
+            for name in scenarios:
+                call = SCENARIOS[name](api_url)
+                results.append(
+                    run_load(name, call, requests=requests, concurrency=concurrency, warmup=warmup)
+                )
+        provider_hits = dict(stub.hits)
+    return {
+        "settings": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "latency_scale": latency_scale,
+            "search_cache": search_cache,
+            "llm_cache": llm_cache,
+        },
+        "results": {result.scenario: result.as_dict() for result in results},
+        "provider_hits": provider_hits,
+    }
+
+
+@contextmanager
+def _no_server() -> Iterator[None]:
+    yield None
@@ -0,0 +1,294 @@
+"""Micro-benchmarks for the VPAgent result-parsing hot paths.
+
+Every Exa/Tavily result passes through these functions, so their per-call cost
+matters more than their code size suggests. The corpus is built from the
+recorded fixtures plus generated variants that stress the regex paths:
+
+* large ``text`` fields (tens of KB) with the interesting token near the end;
+* Tavily-style rows without a structured summary;
+* fenced and malformed JSON summaries.
+
+For each case the report gives the best-of-``repeat`` time per call (ns/op) and
+the memory allocated by one call (``alloc_peak_bytes`` is the tracemalloc
+high-water mark above the starting point; ``alloc_retained_bytes`` is what is
+still referenced afterwards)::
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter extract_price --save-baseline
+    python -m benchmarks.micro --compare
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import re
+import sys
+import timeit
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .stub_server import load_fixture
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "micro.json"
+
+Case = Tuple[str, Callable[..., Any], Tuple[Any, ...]]
+
+# Realistic filler copied from travel pages: no prices, stops or ratings, so the
+# regexes have to scan all of it before reaching the tail.
+_FILLER = (
+    "Compare airlines, cabin classes and travel dates to find the best option for your trip. "
+    "Baggage allowances vary by fare family; check the carrier's policy before booking. "
+    "Free cancellation is available on selected rates. Prices include taxes and fees where shown. "
+    "Travellers should carry a valid passport and the appropriate visa for every country visited. "
+)
+
+
+def large_text(tail: str, size: int = 32_000) -> str:
+    """``size`` characters of filler followed by ``tail``."""
+
+    repeats = max(1, size // len(_FILLER))
+    return _FILLER * repeats + tail
+
+
+def _tavily_rows(size: int) -> List[Dict[str, Any]]:
+    tails = (
+        "Nonstop 7h flight from €412.",
+        "1 stop via Istanbul, 11h total, fares from $389.",
+        "Flights with a short layover from 455 EUR.",
+        "Direct flight, 6h 40m. Return fares from USD 520.",
+    )
+    return [
+        {
+            "title": f"Flight deals {index} | Tavily",
+            "url": f"https://example.com/flights/{index}",
+            "content": large_text(tail, size) if size else tail,
+        }
+        for index, tail in enumerate(tails)
+    ]
+
+
+def _hotel_text_rows(size: int) -> List[Dict[str, Any]]:
+    tails = (
+        "4-star stay from €145 per night with breakfast.",
+        "Rated 4.5/5 by guests, rooms from 160 EUR.",
+        "3 star hotel near the station, $98 per night, half board available.",
+    )
+    return [
+        {
+            "title": f"Hotel option {index}",
+            "url": f"https://example.com/hotels/{index}",
+            "content": large_text(tail, size) if size else tail,
+            "structured_summary": None,
+        }
+        for index, tail in enumerate(tails)
+    ]
+
+
+def _with_large_text(payload: Dict[str, Any], size: int) -> List[Dict[str, Any]]:
+    results = []
+    for result in payload["results"]:
+        results.append({**result, "text": large_text(result.get("text") or "", size)})
+    return results
+
+
+def build_corpus(text_size: int = 32_000) -> List[Case]:
+    """Return the ``(name, function, args)`` cases to measure."""
+
+    from vp_generator import langgraph_agent as agent
+    from vp_generator import text_extract
+
+    exa_flights = load_fixture("exa_flights")
+    exa_hotels = load_fixture("exa_hotels")
+    exa_insurance = load_fixture("exa_insurance")
+
+    flights_norm = agent._normalize_exa_results(exa_flights["results"])
+    hotels_norm = agent._normalize_exa_results(exa_hotels["results"])
+    flights_large = _with_large_text(exa_flights, text_size)
+    tavily_small = _tavily_rows(0)
+    tavily_large = _tavily_rows(text_size)
+    hotel_text_large = _hotel_text_rows(text_size)
+
+    summary = exa_flights["results"][0]["summary"]
+    fenced = f"```json\n{summary}\n```"
+    prose = exa_insurance["results"][0]["summary"]
+    big_blob = large_text("Nonstop flight, 4-star hotel from €199 per night.", text_size)
+    dest = {
+        "country": "France",
+        "city": "Paris",
+        "nights": 4,
+        "check_in": "2025-10-01",
+        "check_out": "2025-10-05",
+    }
+
+    return [
+        ("normalize_exa_results/fixture", agent._normalize_exa_results, (exa_flights["results"],)),
+        ("normalize_exa_results/large_text", agent._normalize_exa_results, (flights_large,)),
+        ("parse_structured_summary/json", agent._parse_structured_summary, (summary,)),
+        ("parse_structured_summary/fenced", agent._parse_structured_summary, (fenced,)),
+        ("parse_structured_summary/prose", agent._parse_structured_summary, (prose,)),
+        ("extract_price/short", text_extract.price_eur, ("Return fares from €412 per person",)),
+        ("extract_price/large_text", text_extract.price_eur, (big_blob,)),
+        ("extract_price/no_match", text_extract.price_eur, (large_text("", text_size),)),
+        ("extract_rating/short", text_extract.extract_rating, ("Rated 4.5/5 by guests",)),
+        ("extract_rating/large_text", text_extract.extract_rating, (big_blob,)),
+        ("extract_facts/short", text_extract.extract_facts, ("1 stop via Istanbul, 11h, from $389",)),
+        ("extract_facts/large_text", text_extract.extract_facts, (big_blob,)),
+        ("build_flights/structured", agent._build_flights, (flights_norm, "2025-10-01")),
+        ("build_flights/text_only", agent._build_flights, (tavily_small, "2025-10-01")),
+        ("build_flights/text_only_large", agent._build_flights, (tavily_large, "2025-10-01")),
+        ("build_hotels/structured", agent._build_hotels, (hotels_norm, dest)),
+        ("build_hotels/text_only_large", agent._build_hotels, (hotel_text_large, dest)),
+    ]
+
+
+@dataclass
+class MicroResult:
+    case: str
+    ns_per_op: float
+    calls: int
+    alloc_peak_bytes: int
+    alloc_retained_bytes: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def measure(
+    name: str,
+    func: Callable[..., Any],
+    args: Tuple[Any, ...],
+    *,
+    repeat: int = 5,
+    number: Optional[int] = None,
+) -> MicroResult:
+    """Time ``func(*args)`` (best of ``repeat``) and measure one call's allocations."""
+
+    timer = timeit.Timer(lambda: func(*args))
+    if number is None:
+        number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    func(*args)  # warm any lazy caches before tracing
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        result = func(*args)
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return MicroResult(
+        case=name,
+        ns_per_op=round(best * 1e9, 1),
+        calls=number * repeat,
+        alloc_peak_bytes=max(0, peak - start),
+        alloc_retained_bytes=max(0, after - start),
+    )
+
+
+def run_micro(
+    pattern: Optional[str] = None,
+    *,
+    repeat: int = 5,
+    number: Optional[int] = None,
+    text_size: int = 32_000,
+) -> Dict[str, Any]:
+    regex = re.compile(pattern) if pattern else None
+    results = [
+        measure(name, func, args, repeat=repeat, number=number)
+        for name, func, args in build_corpus(text_size)
+        if regex is None or regex.search(name)
+    ]
+    return {
+        "settings": {"repeat": repeat, "number": number, "text_size": text_size},
+        "results": {result.case: result.as_dict() for result in results},
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Print per-case ns/op and allocation deltas; return the ns/op regressions."""
+
+    regressions: List[str] = []
+    print(f"\nCompared with baseline {baseline.get('commit', '?')}:")
+    for name, row in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("ns_per_op"):
+            print(f"  {name}: no baseline")
+            continue
+        change = (row["ns_per_op"] - base["ns_per_op"]) / base["ns_per_op"]
+        alloc = row["alloc_peak_bytes"] - base["alloc_peak_bytes"]
+        print(f"  {name:<36} ns/op {change:+7.1%}   peak alloc {alloc:+,d} B")
+        if change > max_regression:
+            regressions.append(f"{name} ns/op {change:+.1%}")
+    return regressions
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    header = f"{'case':<36}{'ns/op':>14}{'peak alloc B':>15}{'retained B':>12}"
+    print(header)
+    print("-" * len(header))
+    for name, row in report["results"].items():
+        print(
+            f"{name:<36}{row['ns_per_op']:>14,.0f}"
+            f"{row['alloc_peak_bytes']:>15,d}{row['alloc_retained_bytes']:>12,d}"
+        )
+
+
+def main(argv: List[str] | None = None) -> int:
+    from .run import _git_commit
+
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for result parsing.")
+    parser.add_argument("--filter", help="Only run cases whose name matches this regex.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats (best is kept).")
+    parser.add_argument(
+        "--number", type=int, help="Calls per repeat (default: calibrated to ~0.2s)."
+    )
+    parser.add_argument(
+        "--text-size", type=int, default=32_000, help="Characters in the large text fields."
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Overwrite {BASELINE.name}.")
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const=BASELINE,
+        type=Path,
+        help="Compare against a baseline (default: the stored one).",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Fail when a case's ns/op grows by more than this fraction.",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_micro(args.filter, repeat=args.repeat, number=args.number, text_size=args.text_size)
+    report.update(commit=_git_commit(), python=platform.python_version())
+    _print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save_baseline:
+        BASELINE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline saved to {BASELINE}")
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.max_regression)
+        if regressions:
+            print("\nRegressions: " + "; ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
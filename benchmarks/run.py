@@ -0,0 +1,135 @@
+"""Command-line entry point: ``python -m benchmarks.run``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .harness import SCENARIOS, run_benchmarks
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "baseline.json"
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "peak_rss_mb")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    header = f"{'scenario':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'errors':>8}{'RSS MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, row in report["results"].items():
+        print(
+            f"{name:<16}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+            f"{row['throughput_rps']:>9.2f}{row['errors']:>8}{row['peak_rss_mb']:>9.1f}"
+        )
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Print per-metric deltas and return the regressions beyond ``max_regression``."""
+
+    regressions: List[str] = []
+    print(f"\nCompared with baseline {baseline.get('commit', '?')} ({baseline.get('created_at', '?')}):")
+    for name, row in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"  {name}: no baseline")
+            continue
+        deltas = []
+        for metric in COMPARED:
+            if not base.get(metric):
+                continue
+            change = (row[metric] - base[metric]) / base[metric]
+            deltas.append(f"{metric} {change:+.1%}")
+            # Throughput regresses when it drops; everything else when it grows.
+            worse = -change if metric == "throughput_rps" else change
+            if metric in ("p95_ms", "throughput_rps") and worse > max_regression:
+                regressions.append(f"{name} {metric} {change:+.1%}")
+        print(f"  {name}: " + ", ".join(deltas))
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline latency/throughput benchmarks.")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run (repeatable); defaults to all.",
+    )
+    parser.add_argument("--requests", type=int, default=20, help="Measured requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent callers.")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured requests first.")
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Multiply the recorded provider latencies (0 disables injected latency).",
+    )
+    parser.add_argument("--search-cache", action="store_true", help="Keep the search cache enabled.")
+    parser.add_argument("--llm-cache", action="store_true", help="Keep the LLM response cache enabled.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Overwrite {BASELINE.name}.")
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const=BASELINE,
+        type=Path,
+        help="Compare against a baseline (default: the stored one).",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Fail when p95 grows or throughput drops by more than this fraction.",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        args.scenario or list(SCENARIOS),
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        latency_scale=args.latency_scale,
+        search_cache=args.search_cache,
+        llm_cache=args.llm_cache,
+    )
+    report.update(
+        commit=_git_commit(),
+        created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+    )
+    _print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save_baseline:
+        BASELINE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline saved to {BASELINE}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("settings") != report["settings"]:
+            print("\nWarning: baseline was recorded with different settings:", baseline.get("settings"))
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print("\nRegressions: " + "; ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Memory soak test: run the agent many times and check that RSS stays flat.
+
+Every ``run_vpagent`` call uses a fresh ``thread_id``, as the API does, so the
+checkpointer is what decides whether memory is reclaimed. The run samples the
+current RSS every ``--sample-every`` runs and reports the growth after warm-up.
+The warm-up has to fill the saver (``--max-threads`` runs) for the growth to be
+meaningful::
+
+    python -m benchmarks.soak                           # 10k runs, bounded memory saver
+    python -m benchmarks.soak --checkpointer sqlite
+    python -m benchmarks.soak --checkpointer unbounded --runs 2000   # the old MemorySaver
+
+It exits with status 1 when RSS grows by more than ``--max-growth-mb`` between
+the end of warm-up and the last sample.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .harness import SCENARIOS, current_rss_mb, stand_in_providers
+from .stub_server import StubProviders
+
+CHECKPOINTERS = ("memory", "sqlite", "unbounded")
+
+
+def _saver(kind: str, workdir: str, max_threads: int) -> Any:
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from vp_generator.checkpoints import BoundedMemorySaver, SQLiteCheckpointSaver
+
+    if kind == "unbounded":
+        return InMemorySaver()
+    if kind == "sqlite":
+        return SQLiteCheckpointSaver(os.path.join(workdir, "checkpoints.sqlite3"))
+    return BoundedMemorySaver(max_threads=max_threads)
+
+
+def run_soak(
+    *,
+    runs: int = 10_000,
+    warmup: int = 1500,
+    concurrency: int = 8,
+    sample_every: int = 500,
+    checkpointer: str = "memory",
+    max_threads: int = 1000,
+) -> Dict[str, Any]:
+    """Run the ``agent`` scenario ``runs`` times and sample RSS as it goes."""
+
+    from vp_generator import checkpoints, langgraph_agent
+
+    samples: List[Dict[str, Any]] = []
+    errors = 0
+    with tempfile.TemporaryDirectory() as workdir, StubProviders(
+        latency_scale=0
+    ) as stub, stand_in_providers(stub.base_url):
+        saver = _saver(checkpointer, workdir, max_threads)
+        checkpoints.set_checkpointer(saver)
+        langgraph_agent._compiled_app.cache_clear()
+        try:
+            call = SCENARIOS["agent"](None)
+
+            def _safe(i: int) -> bool:
+                try:
+                    call(i)
+                except Exception:  # noqa: BLE001 - counted, not fatal
+                    return False
+                return True
+
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="soak") as pool:
+                errors += sum(not ok for ok in pool.map(_safe, range(warmup)))
+                gc.collect()
+                samples.append({"runs": 0, "rss_mb": current_rss_mb()})
+                done = 0
+                while done < runs:
+                    chunk = min(sample_every, runs - done)
+                    errors += sum(not ok for ok in pool.map(_safe, range(done, done + chunk)))
+                    done += chunk
+                    gc.collect()
+                    samples.append({"runs": done, "rss_mb": current_rss_mb()})
+                    print(f"  {done:>7,d} runs  RSS {samples[-1]['rss_mb']:>8.1f} MB", flush=True)
+            stored = saver.stats() if hasattr(saver, "stats") else {"threads": len(saver.storage)}
+        finally:
+            checkpoints.set_checkpointer(None)
+            langgraph_agent._compiled_app.cache_clear()
+            if checkpointer == "sqlite":
+                saver.close()
+    return {
+        "settings": {
+            "runs": runs,
+            "warmup": warmup,
+            "concurrency": concurrency,
+            "checkpointer": checkpointer,
+            "max_threads": max_threads,
+        },
+        "errors": errors,
+        "samples": samples,
+        "growth_mb": round(samples[-1]["rss_mb"] - samples[0]["rss_mb"], 1),
+        "stored": stored,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check that agent runs do not leak memory.")
+    parser.add_argument("--runs", type=int, default=10_000, help="Measured runs after warm-up.")
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1500,
+        help="Runs before the first sample; keep it above --max-threads so the saver is full.",
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers.")
+    parser.add_argument("--sample-every", type=int, default=500, help="Runs between RSS samples.")
+    parser.add_argument("--checkpointer", choices=CHECKPOINTERS, default="memory")
+    parser.add_argument(
+        "--max-threads", type=int, default=1000, help="Thread limit for the memory saver."
+    )
+    parser.add_argument(
+        "--max-growth-mb", type=float, default=25.0, help="Fail when RSS grows by more than this."
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    report = run_soak(
+        runs=args.runs,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        sample_every=args.sample_every,
+        checkpointer=args.checkpointer,
+        max_threads=args.max_threads,
+    )
+    print(
+        f"\n{args.checkpointer}: RSS grew {report['growth_mb']:+.1f} MB over {args.runs:,d} runs "
+        f"({report['errors']} errors); stored {report['stored']}"
+    )
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if report["growth_mb"] > args.max_growth_mb:
+        print(f"RSS growth exceeds {args.max_growth_mb} MB")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Local stand-in for every external provider the visa pack generator calls.
+
+One threaded HTTP server replays the recorded responses in ``fixtures/``. Each
+provider has its own path prefix, and every reply is delayed by that
+provider's recorded median latency with +/-20% jitter. The OpenAI routes
+answer the shapes the code expects:
+
+* Responses API calls, both the itinerary tool call and plain text.
+* Chat completions, used by the LangGraph agent.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+DATE_RE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+
+
+def load_fixture(name: str) -> Any:
+    return json.loads((FIXTURES / f"{name}.json").read_text(encoding="utf-8"))
+
+
+class StubProviders:
+    """Start/stop the stand-in server; ``base_url`` is valid once started."""
+
+    def __init__(
+        self,
+        latencies: Optional[Dict[str, float]] = None,
+        latency_scale: float = 1.0,
+        seed: int = 7,
+    ) -> None:
+        self.latencies = latencies if latencies is not None else load_fixture("latencies")
+        self.latency_scale = latency_scale
+        self.hits: Counter = Counter()
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._fixtures = {
+            name: load_fixture(name)
+            for name in (
+                "exa_flights",
+                "exa_hotels",
+                "exa_insurance",
+                "tavily",
+                "amadeus_token",
+                "amadeus_flights",
+                "aviasales",
+                "hotelbeds",
+                "serpapi",
+                "llm_texts",
+            )
+        }
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Stub server is not running.")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubProviders":
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+            def do_GET(self) -> None:  # noqa: N802
+                self._dispatch(None)
+
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                self._dispatch(raw)
+
+            def _dispatch(self, raw: Optional[bytes]) -> None:
+                provider, status, body = stub.handle(self.command, self.path, raw)
+                stub.hits[provider] += 1
+                stub.sleep(provider)
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="stub-providers", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubProviders":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def sleep(self, provider: str) -> None:
+        median_ms = self.latencies.get(provider, 0) * self.latency_scale
+        if median_ms <= 0:
+            return
+        with self._random_lock:
+            jitter = self._random.uniform(0.8, 1.2)
+        time.sleep(median_ms * jitter / 1000)
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def handle(self, method: str, path: str, raw: Optional[bytes]) -> Tuple[str, int, Any]:
+        route = urlsplit(path).path
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:  # form-encoded (e.g. the OAuth token request)
+            body = {}
+        fixtures = self._fixtures
+        if route.startswith("/exa/"):
+            query = str(body.get("query", "")).lower()
+            if "insurance" in query:
+                return "exa", 200, fixtures["exa_insurance"]
+            if "flight" in query:
+                return "exa", 200, fixtures["exa_flights"]
+            return "exa", 200, fixtures["exa_hotels"]
+        if route.startswith("/tavily/"):
+            return "tavily", 200, {"results": fixtures["tavily"]}
+        if route.startswith("/amadeus/v1/security/oauth2/token"):
+            return "amadeus_token", 200, fixtures["amadeus_token"]
+        if route.startswith("/amadeus/"):
+            return "amadeus_flights", 200, fixtures["amadeus_flights"]
+        if route.startswith("/travelpayouts/"):
+            return "aviasales", 200, fixtures["aviasales"]
+        if route.startswith("/hotelbeds/"):
+            return "hotelbeds", 200, fixtures["hotelbeds"]
+        if route.startswith("/serpapi/"):
+            return "serpapi", 200, fixtures["serpapi"]
+        if route.endswith("/responses"):
+            return "openai_responses", 200, self._responses_reply(body)
+        if route.endswith("/chat/completions"):
+            return "openai_chat", 200, self._chat_reply(body)
+        return "unknown", 404, {"error": f"no stand-in for {method} {route}"}
+
+    def _responses_reply(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        texts = self._fixtures["llm_texts"]
+        usage = {"input_tokens": 640, "output_tokens": 280, "total_tokens": 920}
+        base = {
+            "id": "resp_bench",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model", "gpt-4.1-mini"),
+            "status": "completed",
+            "usage": usage,
+        }
+        if body.get("tools"):
+            prompt = json.dumps(body.get("input"))
+            # The first line listing dates is the segment being planned.
+            dates = DATE_RE.findall(prompt.split("For each date")[0])
+            days = [{"date": d, "city": "Paris", "summary": texts["segment_summary"]} for d in dates]
+            output = {
+                "type": "function_call",
+                "id": "fc_bench",
+                "call_id": "call_bench",
+                "name": body["tools"][0]["name"],
+                "arguments": json.dumps({"days": days}),
+                "status": "completed",
+            }
+        else:
+            output = {
+                "type": "message",
+                "id": "msg_bench",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": texts["cover_letter"], "annotations": []}],
+            }
+        return {**base, "output": [output]}
+
+    def _chat_reply(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        texts = self._fixtures["llm_texts"]
+        prompt = json.dumps(body.get("messages", [])).lower()
+        text = texts["cover_letter"] if "cover letter" in prompt else texts["itinerary_table"]
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 850, "completion_tokens": 320, "total_tokens": 1170},
+        }
@@ -4,7 +4,8 @@ import { ChangeEvent, FormEvent, useEffect, useMemo, useState } from "react";
 import {
   VPAgentRequest,
   VPAgentResponse,
-  createVisaPack,
+  VPAgentStreamEvent,
+  streamVisaPack,
   DestinationInput,
 } from "@/lib/api";
 
@@ -312,8 +313,37 @@ export default function Home() {
         destinations[0]?.city,
     };
 
+    const applyEvent = (prev: VPAgentResponse | null, event: VPAgentStreamEvent): VPAgentResponse => {
+      const base: VPAgentResponse = prev ?? {
+        trip_start_date: payload.trip_start_date,
+        trip_end_date: "",
+        total_nights: 0,
+        destinations: payload.destinations,
+        outbound_flights: [],
+        return_flights: [],
+        hotels_by_city: {},
+        insurance_options: [],
+        cover_letter: "",
+        itinerary_table: "",
+        preview_markdown: "",
+      };
+      switch (event.event) {
+        case "cover_letter_token":
+          return { ...base, cover_letter: base.cover_letter + event.data.content };
+        case "itinerary_token":
+          return { ...base, itinerary_table: base.itinerary_table + event.data.content };
+        case "error":
+          return base;
+        default:
+          return { ...base, ...event.data };
+      }
+    };
+
     try {
-      const response = await createVisaPack(payload);
+      setResult(null);
+      const response = await streamVisaPack(payload, (event) =>
+        setResult((prev) => applyEvent(prev, event)),
+      );
       setResult(response);
     } catch (err) {
       setError(err instanceof Error ? err.message : "Unknown error");
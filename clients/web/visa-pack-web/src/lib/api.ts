@@ -58,6 +58,7 @@ export interface VPAgentResponse {
   cover_letter: string;
   itinerary_table: string;
   preview_markdown: string;
+  error?: string | null;
 }
 
 const DEFAULT_API_BASE_URL = 'http://localhost:8000';
@@ -79,3 +80,72 @@ export async function createVisaPack(
 
   return response.json();
 }
+
+export type VPAgentStreamEvent =
+  | { event: 'flights'; data: Pick<VPAgentResponse, 'outbound_flights' | 'return_flights'> }
+  | { event: 'hotels'; data: Pick<VPAgentResponse, 'hotels_by_city'> }
+  | { event: 'insurance'; data: Pick<VPAgentResponse, 'insurance_options'> }
+  | { event: 'cover_letter_token' | 'itinerary_token'; data: { content: string } }
+  | { event: 'documents'; data: Pick<VPAgentResponse, 'cover_letter' | 'itinerary_table'> }
+  | { event: 'preview'; data: Pick<VPAgentResponse, 'preview_markdown'> }
+  | { event: 'complete'; data: VPAgentResponse }
+  | { event: 'error'; data: { detail: string } };
+
+/**
+ * Stream a visa pack over Server-Sent Events from `/visa-pack/agent/stream`.
+ * `onEvent` fires for every section/token as it arrives; the promise resolves
+ * with the final pack from the `complete` event.
+ */
+export async function streamVisaPack(
+  payload: VPAgentRequest,
+  onEvent: (event: VPAgentStreamEvent) => void,
+  baseUrl = process.env.NEXT_PUBLIC_API_BASE_URL ?? DEFAULT_API_BASE_URL,
+): Promise<VPAgentResponse> {
+  const response = await fetch(`${baseUrl}/visa-pack/agent/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(payload),
+  });
+
+  if (!response.ok || !response.body) {
+    const message = await response.text();
+    throw new Error(`API error (${response.status}): ${message}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let final: VPAgentResponse | null = null;
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let eventName = 'message';
+      let data = '';
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event: ')) eventName = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      const event = { event: eventName, data: JSON.parse(data) } as VPAgentStreamEvent;
+      if (event.event === 'error') {
+        throw new Error(`API error: ${event.data.detail}`);
+      }
+      if (event.event === 'complete') {
+        final = event.data;
+      }
+      onEvent(event);
+    }
+  }
+
+  if (!final) {
+    throw new Error('Stream ended before the visa pack was complete.');
+  }
+  return final;
+}
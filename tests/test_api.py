@@ -0,0 +1,180 @@
+"""Tests for the FastAPI endpoints."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import httpx
+import openai
+import pytest
+from fastapi.testclient import TestClient
+
+from vp_generator import api, instrumentation
+from vp_generator.langgraph_agent import build_initial_state
+from vp_generator.services.circuit_breaker import get_breaker, reset_breakers
+
+AGENT_PAYLOAD = {
+    "travelers": [{"name": "Priya Sharma", "nationality": "Indian", "residence_country": "UAE"}],
+    "departure_city": "Dubai",
+    "trip_start_date": "2025-12-05",
+    "destinations": [{"country": "France", "city": "Paris", "nights": 5}],
+}
+
+
+def _parse_sse(body: str):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.parametrize(
+    "failure, detail",
+    [
+        (RuntimeError("LLM unavailable"), "LLM unavailable"),
+        (
+            openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1")),
+            "APIConnectionError: Connection error.",
+        ),
+    ],
+)
+def test_stream_endpoint_frames_events_as_sse(failure, detail):
+    async def _fake_stream(data, *, thread_id=None):
+        assert data["num_travelers"] == 1
+        yield "flights", {"outbound_flights": [], "return_flights": []}
+        yield "cover_letter_token", {"content": "Dear"}
+        raise failure
+
+    with patch.object(api, "astream_vpagent", _fake_stream), TestClient(api.app) as client:
+        response = client.post("/visa-pack/agent/stream", json=AGENT_PAYLOAD)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert _parse_sse(response.text) == [
+        ("flights", {"outbound_flights": [], "return_flights": []}),
+        ("cover_letter_token", {"content": "Dear"}),
+        ("error", {"detail": detail}),
+    ]
+
+
+def test_stream_endpoint_rejects_empty_destinations():
+    with TestClient(api.app) as client:
+        response = client.post("/visa-pack/agent/stream", json={**AGENT_PAYLOAD, "destinations": []})
+    assert response.status_code == 400
+
+
+def test_diagnostics_reports_breaker_states():
+    get_breaker("hotelbeds").record_failure()
+    with TestClient(api.app) as client:
+        response = client.get("/diagnostics")
+    reset_breakers()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["circuit_breakers"]["hotelbeds"]["state"] == "closed"
+    assert body["circuit_breakers"]["hotelbeds"]["consecutive_failures"] == 1
+    assert "provider_latency" in body and "search_cache" in body and "llm_cache" in body
+
+
+def test_agent_endpoint_adds_timings_only_when_requested():
+    async def _fake_run(data, *, thread_id=None):
+        with instrumentation.timed_node("flight_research"):
+            pass
+        return build_initial_state(data)
+
+    with patch.object(api, "arun_vpagent", _fake_run), TestClient(api.app) as client:
+        plain = client.post("/visa-pack/agent", json=AGENT_PAYLOAD).json()
+        timed = client.post("/visa-pack/agent?timings=true", json=AGENT_PAYLOAD).json()
+
+    assert "timings" not in plain
+    assert [n["node"] for n in timed["timings"]["nodes"]] == ["flight_research"]
+
+
+def test_batch_endpoint_returns_results_and_errors_in_input_order():
+    seen = {}
+
+    async def _fake_batch(payloads, *, concurrency=None, thread_prefix="vpbatch"):
+        seen["count"], seen["concurrency"] = len(payloads), concurrency
+        return [build_initial_state(payloads[0]), RuntimeError("LLM unavailable")], {
+            "groups": 1,
+            "unique": 4,
+            "shared": 4,
+        }
+
+    body = [AGENT_PAYLOAD, {**AGENT_PAYLOAD, "destinations": []}, AGENT_PAYLOAD]
+    with patch.object(api, "arun_vpagent_batch", _fake_batch), TestClient(api.app) as client:
+        response = client.post("/visa-packs/batch?concurrency=3", json=body)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert seen == {"count": 2, "concurrency": 3}
+    assert (data["count"], data["succeeded"], data["failed"]) == (3, 1, 2)
+    assert data["searches"]["shared"] == 4
+    results = data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["ok"] and results[0]["pack"]["destinations"][0]["city"] == "Paris"
+    assert results[1]["error"] == {"status_code": 400, "detail": "At least one destination is required."}
+    assert results[2]["error"] == {"status_code": 500, "detail": "LLM unavailable"}
+    # Packs that reached the agent name their run so they can be resumed.
+    assert results[2]["thread_id"].endswith("-1") and "thread_id" not in results[1]
+
+
+def test_batch_endpoint_reports_a_malformed_pack_without_failing_the_batch():
+    async def _fake_batch(payloads, *, concurrency=None, thread_prefix="vpbatch"):
+        return [build_initial_state(payload) for payload in payloads], {
+            "groups": 1,
+            "unique": 4,
+            "shared": 4,
+        }
+
+    bad = {**AGENT_PAYLOAD, "trip_start_date": "05/12/2025"}
+    body = [AGENT_PAYLOAD, bad, AGENT_PAYLOAD]
+    with patch.object(api, "arun_vpagent_batch", _fake_batch), TestClient(api.app) as client:
+        response = client.post("/visa-packs/batch", json=body)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["index"], r["ok"]) for r in results] == [(0, True), (1, False), (2, True)]
+    error = results[1]["error"]
+    assert error["status_code"] == 422
+    assert [e["loc"] for e in error["detail"]] == [["trip_start_date"]]
+    assert "thread_id" not in results[1] and results[2]["thread_id"].endswith("-1")
+
+
+def test_batch_endpoint_rejects_empty_batches():
+    with TestClient(api.app) as client:
+        assert client.post("/visa-packs/batch", json=[]).status_code == 400
+
+
+def test_agent_endpoint_returns_thread_id_and_resume_continues_the_run():
+    threads = []
+
+    async def _failing_run(data, *, thread_id=None):
+        threads.append(thread_id)
+        # An SDK error, as the writer re-raises it; not a RuntimeError.
+        raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1"))
+
+    async def _fake_resume(thread_id):
+        threads.append(thread_id)
+        return build_initial_state({**AGENT_PAYLOAD, "num_travelers": 1})
+
+    with patch.object(api, "arun_vpagent", _failing_run), patch.object(
+        api, "aresume_vpagent", _fake_resume
+    ), TestClient(api.app) as client:
+        failed = client.post("/visa-pack/agent", json=AGENT_PAYLOAD)
+        thread_id = failed.headers[api.THREAD_HEADER]
+        resumed = client.post(f"/visa-pack/agent/{thread_id}/resume")
+
+    assert failed.status_code == 500
+    assert "APIConnectionError" in failed.json()["detail"]
+    assert resumed.status_code == 200
+    assert resumed.json()["thread_id"] == thread_id == threads[0] == threads[1]
+    assert resumed.headers[api.THREAD_HEADER] == thread_id
+
+
+def test_resume_endpoint_returns_404_for_unknown_threads():
+    with TestClient(api.app) as client:
+        response = client.post("/visa-pack/agent/vpagent-unknown/resume")
+    assert response.status_code == 404
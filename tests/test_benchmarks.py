@@ -0,0 +1,65 @@
+"""Smoke tests for the offline benchmark harness."""
+
+from __future__ import annotations
+
+from benchmarks.harness import percentile, run_benchmarks
+from benchmarks.run import compare
+
+
+def test_percentile_uses_nearest_rank():
+    samples = [float(v) for v in range(1, 101)]
+
+    assert percentile(samples, 0.50) == 50.0
+    assert percentile(samples, 0.95) == 95.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_scenarios_run_against_stand_in_providers():
+    report = run_benchmarks(
+        ["pipeline", "agent"], requests=2, concurrency=2, warmup=0, latency_scale=0
+    )
+
+    for name in ("pipeline", "agent"):
+        row = report["results"][name]
+        assert row["errors"] == 0
+        assert row["p50_ms"] > 0
+    hits = report["provider_hits"]
+    assert hits["exa"] and hits["openai_responses"] and hits["openai_chat"]
+    assert "unknown" not in hits
+
+
+def test_compare_flags_p95_and_throughput_regressions():
+    baseline = {"results": {"agent": {"p95_ms": 100.0, "throughput_rps": 10.0, "p50_ms": 50.0}}}
+    current = {"results": {"agent": {"p95_ms": 130.0, "throughput_rps": 9.5, "p50_ms": 90.0}}}
+
+    regressions = compare(current, baseline, max_regression=0.2)
+
+    assert regressions == ["agent p95_ms +30.0%"]
+
+
+def test_micro_corpus_parses_and_measures():
+    from benchmarks.micro import build_corpus, run_micro
+
+    corpus = {name: (func, args) for name, func, args in build_corpus(text_size=2_000)}
+    func, args = corpus["extract_price/large_text"]
+    assert func(*args) == 199.0
+    func, args = corpus["build_flights/text_only_large"]
+    assert [option["stops"] for option in func(*args)][:1] == [0]
+
+    report = run_micro("extract_rating", repeat=1, number=5, text_size=2_000)
+
+    assert set(report["results"]) == {"extract_rating/short", "extract_rating/large_text"}
+    for row in report["results"].values():
+        assert row["ns_per_op"] > 0
+        assert row["alloc_peak_bytes"] >= 0
+
+
+def test_soak_samples_rss_and_keeps_the_saver_bounded():
+    from benchmarks.soak import run_soak
+
+    report = run_soak(runs=6, warmup=2, concurrency=2, sample_every=3, max_threads=3)
+
+    assert report["errors"] == 0
+    assert [sample["runs"] for sample in report["samples"]] == [0, 3, 6]
+    assert report["stored"]["threads"] == 3
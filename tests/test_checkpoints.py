@@ -0,0 +1,162 @@
+"""Tests for the bounded VPAgent checkpoint savers."""
+
+from __future__ import annotations
+
+import gc
+import os
+import tracemalloc
+from typing import TypedDict
+from unittest.mock import patch
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from vp_generator import checkpoints, langgraph_agent
+from vp_generator.checkpoints import BoundedMemorySaver, SQLiteCheckpointSaver
+
+
+class _State(TypedDict):
+    count: int
+    text: str
+
+
+def _graph(saver):
+    builder = StateGraph(_State)
+    builder.add_node("double", lambda state: {"count": state["count"] * 2})
+    builder.add_node("label", lambda state: {"text": f"count={state['count']}"})
+    builder.add_edge(START, "double")
+    builder.add_edge("double", "label")
+    builder.add_edge("label", END)
+    return builder.compile(checkpointer=saver)
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_saver_evicts_least_recently_used_threads():
+    saver = BoundedMemorySaver(max_threads=2, ttl=None)
+    app = _graph(saver)
+    for thread_id in ("a", "b"):
+        app.invoke({"count": 1, "text": ""}, _config(thread_id))
+    app.get_state(_config("a"))  # "a" is now more recent than "b"
+    app.invoke({"count": 3, "text": ""}, _config("c"))
+
+    assert saver.stats() == {"threads": 2, "evictions": 1}
+    assert app.get_state(_config("a")).values["count"] == 2
+    assert app.get_state(_config("c")).values["text"] == "count=6"
+    assert all(key[0] != "b" for key in list(saver.blobs) + list(saver.writes))
+    assert "b" not in saver.storage
+
+
+def test_memory_saver_expires_idle_threads():
+    clock = _Clock()
+    saver = BoundedMemorySaver(max_threads=100, ttl=60, clock=clock)
+    app = _graph(saver)
+    app.invoke({"count": 1, "text": ""}, _config("old"))
+    clock.now = 61
+    app.invoke({"count": 1, "text": ""}, _config("new"))
+
+    assert saver.stats() == {"threads": 1, "evictions": 1}
+    assert not saver.storage.get("old")
+
+
+def test_sqlite_saver_compacts_and_survives_reopen(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    saver = SQLiteCheckpointSaver(path)
+    _graph(saver).invoke({"count": 2, "text": ""}, _config("trip"))
+    # Only the latest checkpoint of the thread is kept.
+    assert saver.stats() == {"threads": 1, "checkpoints": 1}
+    saver.close()
+
+    reopened = SQLiteCheckpointSaver(path)
+    state = _graph(reopened).get_state(_config("trip"))
+    assert state.values == {"count": 4, "text": "count=4"}
+    assert state.next == ()
+    assert [item.config["configurable"]["thread_id"] for item in reopened.list(None)] == ["trip"]
+
+    reopened.delete_thread("trip")
+    assert reopened.get_tuple(_config("trip")) is None
+
+
+def test_sqlite_saver_purges_idle_threads(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite3"), ttl=60, purge_interval=0)
+    app = _graph(saver)
+    app.invoke({"count": 1, "text": ""}, _config("old"))
+    with saver._conn:
+        saver._conn.execute("UPDATE checkpoints SET updated_at = updated_at - 120")
+    # The next write purges threads idle for longer than the TTL.
+    app.invoke({"count": 1, "text": ""}, _config("new"))
+    assert saver.get_tuple(_config("old")) is None
+    assert saver.stats() == {"threads": 1, "checkpoints": 1}
+    assert saver.purge_expired() == 0
+
+
+def test_checkpointer_from_env(tmp_path):
+    with patch.dict(os.environ, {"VP_AGENT_CHECKPOINTER": "memory", "VP_AGENT_CHECKPOINT_MAX_THREADS": "7"}):
+        saver = checkpoints.checkpointer_from_env()
+    assert isinstance(saver, BoundedMemorySaver) and saver.max_threads == 7
+
+    env = {"VP_AGENT_CHECKPOINTER": "sqlite", "VP_AGENT_CHECKPOINT_PATH": str(tmp_path / "cp.db")}
+    with patch.dict(os.environ, env):
+        saver = checkpoints.checkpointer_from_env()
+    assert isinstance(saver, SQLiteCheckpointSaver)
+    saver.close()
+
+    with patch.dict(os.environ, {"VP_AGENT_CHECKPOINTER": "postgres"}):
+        with pytest.raises(ValueError):
+            checkpoints.checkpointer_from_env()
+
+
+def _fake_results(query, num_results=8, summary=None, kind="general"):
+    return [{"title": query[:20], "url": "https://example.com", "content": "4-star from €120, nonstop 7h"}]
+
+
+class _FakeLLM:
+    def batch(self, inputs, config=None, return_exceptions=False):
+        return [type("Reply", (), {"content": "Generated text " * 200})() for _ in inputs]
+
+
+def test_agent_memory_stays_flat_across_many_runs():
+    # Plain functions rather than mocks: mocks record every call and would grow.
+    saver = BoundedMemorySaver(max_threads=10)
+    checkpoints.set_checkpointer(saver)
+    langgraph_agent._compiled_app.cache_clear()
+    payload = {
+        "travelers": [{"name": "Priya Sharma", "nationality": "Indian", "residence_country": "UAE"}],
+        "num_travelers": 1,
+        "departure_city": "Dubai",
+        "trip_start_date": "2025-12-05",
+        "destinations": [{"country": "France", "city": "Paris", "nights": 4}],
+    }
+    try:
+        with patch.object(langgraph_agent, "_agentic_results", _fake_results), patch.object(
+            langgraph_agent, "get_llm", lambda: _FakeLLM()
+        ):
+            tracemalloc.start()
+            try:
+                for i in range(10):
+                    langgraph_agent.run_vpagent(payload, thread_id=f"warmup-{i}")
+                gc.collect()
+                baseline, _ = tracemalloc.get_traced_memory()
+                for i in range(30):
+                    langgraph_agent.run_vpagent(payload, thread_id=f"run-{i}")
+                gc.collect()
+                current, _ = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+    finally:
+        checkpoints.set_checkpointer(None)
+        langgraph_agent._compiled_app.cache_clear()
+
+    assert saver.stats()["threads"] == 10
+    # An unbounded MemorySaver retains ~80 KB per run here (about 2.4 MB in total).
+    assert current - baseline < 512 * 1024
@@ -0,0 +1,127 @@
+"""Tests for the per-provider circuit breakers."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from prometheus_client import REGISTRY
+
+from vp_generator.services import circuit_breaker, exa_client
+from vp_generator.services.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail(breaker):
+    with pytest.raises(httpx.ConnectTimeout):
+        with breaker:
+            raise httpx.ConnectTimeout("timed out")
+
+
+def test_breaker_opens_after_consecutive_failures_and_half_opens_after_timeout():
+    clock = _Clock()
+    breaker = CircuitBreaker("serpapi", failure_threshold=3, reset_timeout=10, clock=clock)
+    _fail(breaker)
+    with breaker:
+        pass  # a success resets the streak
+    for _ in range(3):
+        _fail(breaker)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        with breaker:
+            pytest.fail("an open breaker must not run the call")
+
+    clock.now = 10
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()  # the single trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["rejected"] == 2
+
+
+def test_failed_trial_reopens_the_breaker():
+    clock = _Clock()
+    breaker = CircuitBreaker("amadeus", failure_threshold=1, reset_timeout=5, clock=clock)
+    _fail(breaker)
+    clock.now = 5
+    _fail(breaker)
+
+    snapshot = breaker.snapshot()
+    assert snapshot["state"] == OPEN
+    assert snapshot["retry_in_seconds"] == 5
+
+
+def test_cancelled_calls_are_not_provider_failures():
+    clock = _Clock()
+    breaker = CircuitBreaker("exa", failure_threshold=1, reset_timeout=5, clock=clock)
+    with pytest.raises(KeyboardInterrupt):
+        with breaker:
+            raise KeyboardInterrupt
+    assert breaker.state == CLOSED
+
+    _fail(breaker)
+    clock.now = 5
+    with pytest.raises(asyncio.CancelledError):
+        with breaker:  # the half-open trial is cancelled...
+            raise asyncio.CancelledError
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()  # ...so its slot is free for the next trial
+    assert breaker.snapshot()["failures"] == 1
+
+
+def test_cancelled_protected_call_records_no_error_metrics():
+    labels = {"provider": "tavily"}
+    before = REGISTRY.get_sample_value("vp_provider_errors_total", labels) or 0
+    failures = circuit_breaker.get_breaker("tavily").snapshot()["failures"]
+
+    async def _search():
+        with circuit_breaker.protect("tavily"):
+            await asyncio.sleep(10)
+
+    async def _cancel():
+        task = asyncio.create_task(_search())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_cancel())
+    assert circuit_breaker.get_breaker("tavily").snapshot()["failures"] == failures
+    assert (REGISTRY.get_sample_value("vp_provider_errors_total", labels) or 0) == before
+    circuit_breaker.reset_breakers()
+
+
+def test_open_exa_breaker_fails_fast_as_an_exa_error():
+    circuit_breaker.reset_breakers()
+    breaker = circuit_breaker.get_breaker("exa")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    with patch.object(exa_client, "EXA_API_KEY", "key"), patch.object(
+        exa_client, "get_http_client", side_effect=AssertionError("network used")
+    ):
+        started = time.perf_counter()
+        with pytest.raises(exa_client.ExaError):
+            exa_client.agentic_search("hotels in Paris")
+    assert time.perf_counter() - started < 0.05
+    circuit_breaker.reset_breakers()
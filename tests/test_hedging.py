@@ -0,0 +1,238 @@
+"""Tests for hedged provider racing."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+from unittest.mock import patch
+
+import pytest
+
+from vp_generator.config import Settings
+from vp_generator.models import FlightOption, TripRequest
+from vp_generator.services import flights, hotels
+from vp_generator.services.hedging import LatencyStats, first_non_empty, hedged_first, race_lost
+
+
+def _slow(value, delay, started=None):
+    def _call():
+        if started is not None:
+            started.append(value)
+        time.sleep(delay)
+        return [value] if value else []
+
+    return _call
+
+
+def _failing():
+    raise RuntimeError("upstream 503")
+
+
+def test_hedge_wins_when_primary_is_slow():
+    stats = LatencyStats()
+    started_at = time.monotonic()
+    name, results = hedged_first(
+        [("primary", _slow("a", 2.0)), ("backup", _slow("b", 0.05))],
+        hedge_delay=0.05,
+        stats=stats,
+    )
+
+    assert (name, results) == ("backup", ["b"])
+    assert time.monotonic() - started_at < 1.0
+
+
+def test_backup_is_not_started_when_primary_answers_within_the_delay():
+    started = []
+    name, results = hedged_first(
+        [("primary", _slow("a", 0.01, started)), ("backup", _slow("b", 0.01, started))],
+        hedge_delay=0.5,
+        stats=LatencyStats(),
+    )
+
+    assert (name, results) == ("primary", ["a"])
+    assert started == ["a"]
+
+
+def test_failed_primary_hands_over_without_waiting_for_the_hedge_delay():
+    started_at = time.monotonic()
+    name, results = hedged_first(
+        [("primary", _failing), ("empty", _slow(None, 0.01)), ("last", _slow("c", 0.01))],
+        hedge_delay=5.0,
+        stats=LatencyStats(),
+    )
+
+    assert (name, results) == ("last", ["c"])
+    assert time.monotonic() - started_at < 1.0
+
+
+def test_every_provider_failing_returns_nothing():
+    assert hedged_first([("a", _failing), ("b", _failing)], stats=LatencyStats()) == (None, [])
+
+
+def test_prefer_ranked_waits_for_the_primary_answer():
+    name, results = hedged_first(
+        [("primary", _slow("a", 0.2)), ("backup", _slow("b", 0.01))],
+        hedge_delay=0.0,
+        prefer_ranked=True,
+        stats=LatencyStats(),
+    )
+
+    assert (name, results) == ("primary", ["a"])
+
+
+def test_running_loser_stops_before_its_next_request():
+    requests = []
+
+    def _per_city():
+        for city in ["Paris", "Rome", "Milan", "Nice"]:
+            if race_lost():
+                break
+            requests.append(city)
+            time.sleep(0.1)
+        return []
+
+    stats = LatencyStats()
+    name, _ = hedged_first(
+        [("primary", _per_city), ("backup", _slow("b", 0.01))], hedge_delay=0.02, stats=stats
+    )
+    time.sleep(0.3)  # the loser finishes the request it was in, then gives up
+
+    assert name == "backup"
+    assert requests == ["Paris"]
+    assert "primary" not in stats.snapshot()  # stopping early is not a provider failure
+    assert not race_lost()
+
+
+def test_hedge_delay_follows_recorded_latency():
+    stats = LatencyStats(default_delay=2.0, min_delay=0.1, max_delay=5.0)
+    assert stats.hedge_delay("hotelbeds") == 2.0
+    for seconds in [0.3] * 9 + [4.0]:
+        stats.record("hotelbeds", seconds, ok=True)
+    stats.record("hotelbeds", 15.0, ok=False)
+
+    assert stats.hedge_delay("hotelbeds") == 4.0
+    snapshot = stats.snapshot()["hotelbeds"]
+    assert snapshot["calls"] == 11 and snapshot["failures"] == 1
+    assert snapshot["p50"] == 0.3
+
+
+def test_first_non_empty_is_a_serial_chain():
+    started = []
+    name, results = first_non_empty(
+        [("a", _slow(None, 0, started)), ("b", _slow("b", 0, started)), ("c", _slow("c", 0, started))],
+        stats=LatencyStats(),
+    )
+
+    assert (name, results) == ("b", ["b"])
+    assert started == [None, "b"]
+
+
+def _request():
+    return TripRequest(
+        nationality="Indian",
+        residence_country="India",
+        departure_city="Delhi",
+        destination_countries=["France"],
+        primary_destination_country="France",
+        start_date="2025-06-10",
+        end_date="2025-06-12",
+        purpose="tourism",
+        budget_band="medium",
+        travellers_count=1,
+        traveller_names=["Asha"],
+    )
+
+
+_SETTINGS = Settings(
+    openai_api_key="x",
+    hotelbeds_api_key="k",
+    hotelbeds_api_secret="s",
+    serpapi_key="serp",
+    hotel_hedge_delay=0.05,
+)
+
+
+def test_recommend_hotels_hands_over_as_soon_as_hotelbeds_comes_back_empty():
+    serp_option = replace(hotels._fallback_hotels(_request(), ["Paris"])[0], name="SerpApi pick")
+    with patch.object(hotels, "get_settings", return_value=_SETTINGS), patch.object(
+        hotels, "hotelbeds_search", side_effect=lambda *a: time.sleep(0.3) or []
+    ), patch.object(
+        hotels, "_serpapi_hotels", side_effect=lambda *a: _slow(serp_option, 0.2)()
+    ):
+        started_at = time.monotonic()
+        result = hotels.recommend_hotels(_request(), ["Paris"])
+
+    assert result == [serp_option]
+    # SerpApi started after the hedge delay, so its answer was ready when Hotelbeds gave up.
+    assert time.monotonic() - started_at < 0.45
+
+
+def test_recommend_hotels_prefers_hotelbeds_over_a_faster_backup():
+    beds_option = replace(hotels._fallback_hotels(_request(), ["Paris"])[0], name="Hotelbeds pick")
+    serp_option = replace(beds_option, name="SerpApi pick")
+    with patch.object(hotels, "get_settings", return_value=_SETTINGS), patch.object(
+        hotels, "hotelbeds_search", side_effect=lambda *a: _slow(beds_option, 0.3)()
+    ), patch.object(
+        hotels, "_serpapi_hotels", side_effect=lambda *a: _slow(serp_option, 0.01)()
+    ):
+        result = hotels.recommend_hotels(_request(), ["Paris"])
+
+    assert result == [beds_option]
+
+
+def test_recommend_hotels_rejects_unknown_mode():
+    with patch.object(
+        hotels, "get_settings", return_value=replace(_SETTINGS, hotel_provider_mode="bogus")
+    ):
+        with pytest.raises(ValueError):
+            hotels.recommend_hotels(_request(), ["Paris"])
+
+
+def _flight(airline):
+    return FlightOption(
+        label="Inbound Option",
+        airline=airline,
+        from_airport="DEL",
+        to_airport="CDG",
+        depart_datetime="2025-06-10T09:00",
+        arrive_datetime="2025-06-10T16:00",
+        price_in_inr=50_000,
+        booking_link="https://example.com",
+    )
+
+
+def _timed_flight_providers(avia, amadeus, delay=0.3):
+    def _avia(*args):
+        time.sleep(delay)
+        return avia
+
+    def _token():
+        time.sleep(delay)
+        return "token"
+
+    def _amadeus(*args):
+        time.sleep(delay)
+        return amadeus
+
+    return (
+        patch.object(flights, "get_settings", return_value=Settings(openai_api_key="x")),
+        patch.object(flights, "_fetch_aviasales", side_effect=_avia),
+        patch.object(flights, "get_amadeus_token", side_effect=_token),
+        patch.object(flights, "_fetch_amadeus", side_effect=_amadeus),
+    )
+
+
+@pytest.mark.parametrize(
+    "avia, expected",
+    [([_flight("Aviasales")], "Aviasales"), ([], "Amadeus")],
+)
+def test_recommend_flights_overlaps_both_providers(avia, expected):
+    patches = _timed_flight_providers(avia, [_flight("Amadeus")])
+    with patches[0], patches[1], patches[2], patches[3]:
+        started_at = time.monotonic()
+        result = flights.recommend_flights(_request())
+        elapsed = time.monotonic() - started_at
+
+    assert [f.airline for f in result] == [expected]
+    # Aviasales (0.3 s) overlaps Amadeus token + search (0.6 s); serial would take 0.9 s.
+    assert elapsed < 0.85
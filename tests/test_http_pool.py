@@ -0,0 +1,54 @@
+"""Tests for the shared provider HTTP client registry."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from vp_generator.services import http_pool
+
+
+def test_clients_are_shared_per_host():
+    try:
+        first = http_pool.get_http_client("https://api.exa.ai/search")
+        second = http_pool.get_http_client("https://API.exa.ai/other?q=1")
+        other = http_pool.get_http_client("https://serpapi.com/search")
+        assert first is second
+        assert first is not other
+    finally:
+        http_pool.close_http_clients()
+    assert first.is_closed and other.is_closed
+    assert http_pool.get_http_client("https://api.exa.ai/search") is not first
+    http_pool.close_http_clients()
+
+
+def test_async_clients_are_scoped_to_the_running_loop():
+    async def _open():
+        client = http_pool.get_async_http_client("https://api.exa.ai/search")
+        assert client is http_pool.get_async_http_client("https://api.exa.ai/x")
+        await http_pool.aclose_http_clients()
+        return client
+
+    first = asyncio.run(_open())
+    second = asyncio.run(_open())
+    assert first is not second
+    assert first.is_closed and second.is_closed
+
+
+def test_shutdown_closes_clients_of_other_running_loops():
+    worker = asyncio.new_event_loop()
+    thread = threading.Thread(target=worker.run_forever, daemon=True)
+    thread.start()
+    try:
+
+        async def _open():
+            return http_pool.get_async_http_client("https://api.exa.ai/search")
+
+        client = asyncio.run_coroutine_threadsafe(_open(), worker).result(5)
+        asyncio.run(http_pool.aclose_http_clients())
+        assert client.is_closed
+        assert worker not in http_pool._async_clients
+    finally:
+        worker.call_soon_threadsafe(worker.stop)
+        thread.join(5)
+        worker.close()
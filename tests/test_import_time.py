@@ -0,0 +1,51 @@
+"""Import-time budget for the API module (cold start and test collection)."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = (
+    "langgraph",
+    "langchain_core",
+    "langchain_anthropic",
+    "langchain_openai",
+    "langchain_community",
+    "openai",
+)
+IMPORT_BUDGET_SECONDS = 2.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import vp_generator.api
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": sorted(
+    name for name in sys.modules if name.split(".")[0] in %r
+)}))
+""" % (HEAVY_MODULES,)
+
+
+def _probe_import():
+    # Provider keys are stripped to prove the import does not need them.
+    env = {key: value for key, value in os.environ.items() if not key.endswith("_API_KEY")}
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=REPO_ROOT / "tests",
+        env={**env, "PYTHONPATH": str(REPO_ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_api_import_is_lazy_and_within_budget():
+    _probe_import()  # warm the bytecode cache so the budget measures a normal start
+    probe = _probe_import()
+    assert probe["loaded"] == []
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,77 @@
+"""Tests for VPAgent timing and tracing instrumentation."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from prometheus_client import REGISTRY
+
+from vp_generator import instrumentation, langgraph_agent
+from vp_generator.services import exa_client
+
+
+def _payload():
+    return {
+        "travelers": [{"name": "Priya Sharma", "nationality": "Indian", "residence_country": "UAE"}],
+        "num_travelers": 1,
+        "departure_city": "Dubai",
+        "trip_start_date": "2025-12-05",
+        "destinations": [{"country": "France", "city": "Paris", "nights": 4}],
+    }
+
+
+async def _afake_results(query, num_results=8, summary=None, kind="general"):
+    return [{"title": "Result", "url": "https://example.com", "content": "from €120 per night"}]
+
+
+def _node_count(node):
+    value = REGISTRY.get_sample_value(
+        "vp_agent_node_duration_seconds_count", {"node": node, "outcome": "ok"}
+    )
+    return value or 0
+
+
+def test_agent_run_records_nodes_and_llm_calls():
+    llm = GenericFakeChatModel(messages=iter(["Dear officer", "| Day 1 | Paris |"]))
+    before = _node_count("flight_research")
+    with patch.object(langgraph_agent, "_aagentic_results", side_effect=_afake_results), patch.object(
+        langgraph_agent, "get_llm", return_value=llm
+    ), instrumentation.collect_timings() as trace:
+        asyncio.run(langgraph_agent.arun_vpagent(_payload(), thread_id="test-timings"))
+
+    summary = trace.summary()
+    assert {n["node"] for n in summary["nodes"]} == {
+        "flight_research",
+        "hotel_research",
+        "insurance_research",
+        "document_generation",
+        "preview",
+        "final_output",
+    }
+    assert sorted(tuple(c["tags"]) for c in summary["llm_calls"]) == [("cover_letter",), ("itinerary",)]
+    assert all(c["status"] == "ok" and c["ms"] >= 0 for c in summary["llm_calls"])
+    assert _node_count("flight_research") == before + 1
+
+
+def test_exa_search_records_provider_status_and_bytes():
+    body = b'{"results": [{"title": "Hotel", "url": "https://example.com"}]}'
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    with patch.object(exa_client, "EXA_API_KEY", "key"), patch.object(
+        exa_client, "get_http_client", return_value=httpx.Client(transport=transport)
+    ), instrumentation.collect_timings() as trace:
+        exa_client.agentic_search("hotels in Paris")
+
+    [call] = trace.summary()["external_calls"]
+    assert call["provider"] == "exa"
+    assert call["query"] == "hotels in Paris"
+    assert call["status"] == "200"
+    assert call["bytes"] == len(body)
+
+
+def test_nothing_is_collected_outside_a_trace():
+    with instrumentation.timed_node("preview"):
+        pass
+    assert instrumentation.current_trace() is None
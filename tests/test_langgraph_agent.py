@@ -0,0 +1,634 @@
+"""Tests for the LangGraph VPAgent workflow."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+
+from vp_generator import langgraph_agent
+from vp_generator.langgraph_agent import (
+    RunNotFoundError,
+    arun_vpagent,
+    arun_vpagent_batch,
+    aresume_vpagent,
+    resume_vpagent,
+    run_vpagent,
+    summarize_response,
+)
+from vp_generator import checkpoints, llm_cache, search_cache
+from vp_generator.checkpoints import BoundedMemorySaver
+from vp_generator.llm_cache import LLMCache, bypass_llm_cache
+from vp_generator.search_cache import MemoryLRUTier, SearchCache, SingleFlight
+
+
+def _payload(**overrides):
+    data = {
+        "travelers": [
+            {"name": "Priya Sharma", "nationality": "Indian", "residence_country": "UAE"}
+        ],
+        "num_travelers": 1,
+        "departure_city": "Dubai",
+        "trip_start_date": "2025-12-05",
+        "destinations": [
+            {"country": "France", "city": "Paris", "nights": 5},
+            {"country": "Italy", "city": "Rome", "nights": 3},
+        ],
+        "trip_theme": "culture",
+    }
+    data.update(overrides)
+    return data
+
+
+def _fake_results(query, num_results=8, summary=None, kind="general"):
+    return [
+        {
+            "title": f"Result for {query[:20]}",
+            "url": "https://example.com",
+            "content": "4-star stay from €120 per night, nonstop 7h flight",
+        }
+    ]
+
+
+async def _afake_results(query, num_results=8, summary=None, kind="general"):
+    await asyncio.sleep(0)
+    return _fake_results(query, num_results, summary)
+
+
+class _FakeLLM:
+    def invoke(self, messages, config=None):
+        return SimpleNamespace(content="Generated text")
+
+    async def ainvoke(self, messages, config=None):
+        return self.invoke(messages)
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        return [self.invoke(messages) for messages in inputs]
+
+    async def abatch(self, inputs, config=None, return_exceptions=False):
+        return self.batch(inputs)
+
+
+@pytest.mark.parametrize("mode", ["parallel", "sequential"])
+def test_run_vpagent_modes_produce_same_sections(mode):
+    with patch.object(langgraph_agent, "_agentic_results", side_effect=_fake_results), patch.object(
+        langgraph_agent, "get_llm", return_value=_FakeLLM()
+    ), patch.dict(os.environ, {"VP_AGENT_RESEARCH_MODE": mode}):
+        state = run_vpagent(_payload(), thread_id=f"test-{mode}")
+
+    response = summarize_response(state)
+    assert response["outbound_flights"] and response["return_flights"]
+    assert list(response["hotels_by_city"]) == ["Paris", "Rome"]
+    assert response["insurance_options"]
+    assert response["cover_letter"] == "Generated text"
+    assert state["is_complete"]
+    # Each node appends exactly one status message.
+    assert len(state["messages"]) == 6
+
+
+def test_arun_vpagent_uses_async_search_path():
+    with patch.object(
+        langgraph_agent, "_aagentic_results", side_effect=_afake_results
+    ) as mock_search, patch.object(
+        langgraph_agent, "_agentic_results", side_effect=AssertionError("sync search used")
+    ), patch.object(langgraph_agent, "get_llm", return_value=_FakeLLM()):
+        state = asyncio.run(arun_vpagent(_payload(), thread_id="test-async"))
+
+    # Two flight legs, two hotel cities and one insurance search.
+    assert mock_search.call_count == 5
+    assert list(state["hotels_by_city"]) == ["Paris", "Rome"]
+    assert state["cover_letter"] == "Generated text"
+    assert state["is_complete"]
+
+
+def test_runs_without_a_thread_id_do_not_share_state():
+    with patch.object(langgraph_agent, "_agentic_results", side_effect=_fake_results), patch.object(
+        langgraph_agent, "get_llm", return_value=_FakeLLM()
+    ):
+        run_vpagent(_payload())
+        state = run_vpagent(_payload(destinations=[{"country": "Spain", "city": "Madrid", "nights": 4}]))
+
+    assert list(state["hotels_by_city"]) == ["Madrid"]
+    assert len(state["messages"]) == 6
+
+
+def test_parallel_mode_runs_research_nodes_concurrently():
+    # Flight, hotel (one city) and insurance research must all be in flight at
+    # once for the barrier to release; a sequential graph would time out.
+    barrier = threading.Barrier(3, timeout=5)
+
+    def _blocking_results(query, num_results=8, summary=None, kind="general"):
+        if "to Dubai" not in query:  # only the outbound flight leg joins the barrier
+            barrier.wait()
+        return _fake_results(query)
+
+    payload = _payload(destinations=[{"country": "France", "city": "Paris", "nights": 4}])
+    with patch.object(langgraph_agent, "_agentic_results", side_effect=_blocking_results), patch.object(
+        langgraph_agent, "get_llm", return_value=_FakeLLM()
+    ):
+        state = langgraph_agent.get_vpagent_app("parallel").invoke(
+            langgraph_agent.build_initial_state(payload),
+            config={"configurable": {"thread_id": "test-barrier"}},
+        )
+
+    assert state["hotels_by_city"]["Paris"]
+
+
+def test_unknown_research_mode_is_rejected():
+    with patch.dict(os.environ, {"VP_AGENT_RESEARCH_MODE": "bogus"}):
+        with pytest.raises(ValueError):
+            langgraph_agent.get_vpagent_app()
+
+
+def _hotel_state(cities):
+    destinations = [
+        {"country": "Europe", "city": city, "nights": 2, "check_in": "2025-12-05", "check_out": "2025-12-07"}
+        for city in cities
+    ]
+    return {"destinations": destinations, "trip_theme": "culture"}
+
+
+class _ConcurrencyProbe:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.active -= 1
+
+
+def test_hotel_researcher_caps_concurrency_and_keeps_order():
+    cities = ["Paris", "Rome", "Vienna", "Prague", "Madrid"]
+    probe = _ConcurrencyProbe()
+
+    def _slow_results(query, num_results=8, summary=None, kind="general"):
+        with probe:
+            # Earlier cities finish last to prove ordering does not follow completion.
+            delay = 0.05 * (len(cities) - next(i for i, c in enumerate(cities) if c in query))
+            threading.Event().wait(delay)
+        return _fake_results(query)
+
+    with patch.object(langgraph_agent, "_agentic_results", side_effect=_slow_results), patch.dict(
+        os.environ, {"VP_AGENT_HOTEL_CONCURRENCY": "2"}
+    ):
+        update = langgraph_agent.hotel_researcher(_hotel_state(cities))
+
+    assert list(update["hotels_by_city"]) == cities
+    assert probe.peak == 2
+
+
+def test_ahotel_researcher_caps_concurrency_and_keeps_order():
+    cities = ["Paris", "Rome", "Vienna", "Prague", "Madrid"]
+    probe = _ConcurrencyProbe()
+
+    async def _slow_results(query, num_results=8, summary=None, kind="general"):
+        with probe:
+            delay = 0.01 * (len(cities) - next(i for i, c in enumerate(cities) if c in query))
+            await asyncio.sleep(delay)
+        return _fake_results(query)
+
+    with patch.object(langgraph_agent, "_aagentic_results", side_effect=_slow_results), patch.dict(
+        os.environ, {"VP_AGENT_HOTEL_CONCURRENCY": "3"}
+    ):
+        update = asyncio.run(langgraph_agent.ahotel_researcher(_hotel_state(cities)))
+
+    assert list(update["hotels_by_city"]) == cities
+    assert probe.peak == 3
+
+
+def _flight_state():
+    payload = _payload(destinations=[{"country": "France", "city": "Paris", "nights": 4}])
+    return langgraph_agent.build_initial_state(payload)
+
+
+def test_flight_researcher_runs_legs_concurrently_with_timeout():
+    barrier = threading.Barrier(2, timeout=5)
+    release = threading.Event()
+
+    def _legs(query, num_results=8, summary=None, kind="general"):
+        barrier.wait()  # both legs must be in flight together
+        if "to Dubai" in query:
+            release.wait(5)  # the return leg hangs past the leg timeout
+        return _fake_results(query)
+
+    started = time.monotonic()
+    with patch.object(langgraph_agent, "_agentic_results", side_effect=_legs), patch.dict(
+        os.environ, {"VP_AGENT_FLIGHT_LEG_TIMEOUT": "0.2"}
+    ):
+        update = langgraph_agent.flight_researcher(_flight_state())
+    release.set()
+
+    assert time.monotonic() - started < 2
+    assert update["outbound_flights"]
+    assert update["return_flights"] == []
+
+
+def test_aflight_researcher_returns_partial_results_on_timeout():
+    async def _legs(query, num_results=8, summary=None, kind="general"):
+        if "to Dubai" in query:
+            await asyncio.sleep(5)
+        return _fake_results(query)
+
+    with patch.object(langgraph_agent, "_aagentic_results", side_effect=_legs), patch.dict(
+        os.environ, {"VP_AGENT_FLIGHT_LEG_TIMEOUT": "0.1"}
+    ):
+        update = asyncio.run(langgraph_agent.aflight_researcher(_flight_state()))
+
+    assert update["outbound_flights"]
+    assert update["return_flights"] == []
+
+
+def test_agentic_results_serves_repeat_queries_from_cache():
+    cache = SearchCache([MemoryLRUTier()])
+    with patch.object(langgraph_agent, "get_search_cache", return_value=cache), patch.object(
+        langgraph_agent, "_fetch_agentic_results", side_effect=lambda q, n, s: _fake_results(q)
+    ) as mock_fetch:
+        first = langgraph_agent._agentic_results("Hotels Paris  2025", kind="hotels")
+        second = langgraph_agent._agentic_results("hotels paris 2025", kind="hotels")
+
+    assert first == second
+    assert mock_fetch.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+
+class _ThreadRecordingSearchCache(SearchCache):
+    def __init__(self):
+        super().__init__([MemoryLRUTier()])
+        self.threads = set()
+
+    def get(self, key, kind="general"):
+        self.threads.add(threading.get_ident())
+        return super().get(key, kind)
+
+    def set(self, key, value, kind="general"):
+        self.threads.add(threading.get_ident())
+        super().set(key, value, kind)
+
+
+def test_async_search_keeps_cache_io_off_the_event_loop():
+    cache = _ThreadRecordingSearchCache()
+
+    async def _fetch(query, num_results, summary):
+        return _fake_results(query)
+
+    async def _search():
+        first = await langgraph_agent._aagentic_results("hotels paris", kind="hotels")
+        second = await langgraph_agent._aagentic_results("hotels paris", kind="hotels")
+        return first, second, threading.get_ident()
+
+    with patch.object(langgraph_agent, "_afetch_agentic_results", side_effect=_fetch), patch.object(
+        langgraph_agent, "get_search_cache", return_value=cache
+    ), patch.object(langgraph_agent, "get_single_flight", return_value=None):
+        first, second, loop_thread = asyncio.run(_search())
+
+    assert first == second and cache.stats()["hits"] == 1
+    assert cache.threads and loop_thread not in cache.threads
+
+
+def test_concurrent_identical_searches_share_one_request():
+    calls = []
+
+    async def _fetch(query, num_results, summary):
+        calls.append(query)
+        await asyncio.sleep(0.05)
+        return _fake_results(query)
+
+    async def _users():
+        return await asyncio.gather(
+            *(langgraph_agent._aagentic_results("hotels paris", kind="hotels") for _ in range(30))
+        )
+
+    flight = SingleFlight()
+    with patch.object(langgraph_agent, "_afetch_agentic_results", side_effect=_fetch), patch.object(
+        langgraph_agent, "get_search_cache", return_value=None
+    ), patch.object(search_cache, "_single_flight", flight):
+        results = asyncio.run(_users())
+
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+    assert flight.stats() == {"unique": 1, "shared": 29}
+
+
+def test_batch_runs_each_shared_search_once_and_keeps_order():
+    queries = []
+
+    async def _fetch(query, num_results, summary):
+        queries.append(query)
+        await asyncio.sleep(0.01)
+        return _fake_results(query)
+
+    paris = {"destinations": [{"country": "France", "city": "Paris", "nights": 5}]}
+    rome = {"destinations": [{"country": "Italy", "city": "Rome", "nights": 3}]}
+    payloads = [
+        _payload(**paris),
+        _payload(**rome),
+        _payload(**paris, travelers=[{"name": "Ravi Rao", "nationality": "Indian", "residence_country": "UAE"}]),
+        _payload(trip_start_date="not-a-date"),
+    ]
+    with patch.object(langgraph_agent, "_afetch_agentic_results", side_effect=_fetch), patch.object(
+        langgraph_agent, "get_search_cache", return_value=None
+    ), patch.object(langgraph_agent, "get_llm", return_value=_FakeLLM()):
+        outcomes, stats = asyncio.run(arun_vpagent_batch(payloads, concurrency=2))
+
+    assert [o["destinations"][0]["city"] for o in outcomes[:3]] == ["Paris", "Rome", "Paris"]
+    assert outcomes[2]["travelers"][0]["name"] == "Ravi Rao"
+    assert isinstance(outcomes[3], ValueError)
+    # Two flight legs, one hotel city and insurance per distinct trip.
+    assert len(queries) == stats["unique"] == 8
+    assert stats["shared"] == 4
+    assert stats["groups"] == 3
+
+
+def test_astream_vpagent_emits_sections_then_tokens_then_complete():
+    llm = GenericFakeChatModel(messages=iter(["Dear consular officer", "| Day 1 | Paris |"]))
+    payload = _payload(destinations=[{"country": "France", "city": "Paris", "nights": 4}])
+
+    async def _collect():
+        return [item async for item in langgraph_agent.astream_vpagent(payload, thread_id="test-stream")]
+
+    with patch.object(langgraph_agent, "_aagentic_results", side_effect=_afake_results), patch.object(
+        langgraph_agent, "get_llm", return_value=llm
+    ):
+        events = asyncio.run(_collect())
+
+    names = [name for name, _ in events]
+    assert set(names[:3]) == {"flights", "hotels", "insurance"}
+    assert names[-3:] == ["documents", "preview", "complete"]
+    cover = "".join(data["content"] for name, data in events if name == "cover_letter_token")
+    itinerary = "".join(data["content"] for name, data in events if name == "itinerary_token")
+    assert cover == "Dear consular officer"
+    assert itinerary == "| Day 1 | Paris |"
+    assert names.index("itinerary_token") < names.index("documents")
+    flights = dict(events)["flights"]
+    assert set(flights) == {"outbound_flights", "return_flights"}
+    complete = events[-1][1]
+    assert complete["cover_letter"] == cover
+    assert complete["hotels_by_city"]["Paris"]
+
+
+class _OneFailingLLM:
+    """Fails the cover letter call but answers the itinerary call."""
+
+    def __init__(self):
+        self.concurrent = threading.Barrier(2, timeout=5)
+
+    def invoke(self, messages, config=None):
+        self.concurrent.wait()  # both documents must be requested together
+        if "cover_letter" in config["tags"]:
+            raise RuntimeError("rate limited")
+        return SimpleNamespace(content="| Day 1 | Paris |")
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+        def _call(messages, cfg):
+            try:
+                return self.invoke(messages, cfg)
+            except Exception as exc:  # noqa: BLE001
+                if not return_exceptions:
+                    raise
+                return exc
+
+        with ContextThreadPoolExecutor(max_workers=len(inputs)) as pool:
+            return list(pool.map(_call, inputs, config))
+
+
+def test_itinerary_writer_keeps_the_document_that_succeeded():
+    state = langgraph_agent.build_initial_state(_payload())
+    with patch.object(langgraph_agent, "get_llm", return_value=_OneFailingLLM()):
+        update = langgraph_agent.itinerary_writer(state)
+
+    assert update["cover_letter"] == ""
+    assert update["itinerary_table"] == "| Day 1 | Paris |"
+    assert "Cover letter generation failed: rate limited" in update["error"]
+
+
+def test_itinerary_writer_raises_when_every_document_fails():
+    failing = GenericFakeChatModel(messages=iter([]))  # raises on every call
+    state = langgraph_agent.build_initial_state(_payload())
+    with patch.object(langgraph_agent, "get_llm", return_value=failing):
+        with pytest.raises(Exception):
+            langgraph_agent.itinerary_writer(state)
+
+
+class _NamedLLM(_FakeLLM):
+    model_name = "gpt-4o-mini"
+    temperature = 0.2
+
+    def __init__(self):
+        self.prompts = []
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        self.prompts.extend(messages[0].content for messages in inputs)
+        return [SimpleNamespace(content=f"Draft {len(self.prompts)}") for _ in inputs]
+
+
+def test_itinerary_writer_reuses_cached_documents_for_a_resubmitted_trip():
+    llm = _NamedLLM()
+    state = langgraph_agent.build_initial_state(_payload())
+    with patch.object(llm_cache, "_cache", LLMCache()), patch.object(
+        langgraph_agent, "get_llm", return_value=llm
+    ):
+        first = langgraph_agent.itinerary_writer(state)
+        again = asyncio.run(langgraph_agent.aitinerary_writer(state))
+        assert len(llm.prompts) == 2
+        with bypass_llm_cache():
+            regenerated = langgraph_agent.itinerary_writer(state)
+
+    assert (again["cover_letter"], again["itinerary_table"]) == (first["cover_letter"], first["itinerary_table"])
+    assert len(llm.prompts) == 4
+    assert regenerated["cover_letter"] != first["cover_letter"]
+
+
+class _ThreadRecordingCache(LLMCache):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, model, response):
+        self.threads.add(threading.get_ident())
+        super().set(key, model, response)
+
+
+def test_async_writer_keeps_cache_io_off_the_event_loop():
+    cache = _ThreadRecordingCache()
+    state = langgraph_agent.build_initial_state(_payload())
+
+    async def _write():
+        update = await langgraph_agent.aitinerary_writer(state)
+        return update, threading.get_ident()
+
+    with patch.object(llm_cache, "_cache", cache), patch.object(
+        langgraph_agent, "get_llm", return_value=_NamedLLM()
+    ):
+        update, loop_thread = asyncio.run(_write())
+
+    assert update["cover_letter"] and cache.stats()["entries"] == 2
+    assert cache.threads and loop_thread not in cache.threads
+
+
+class _DownLLM(_FakeLLM):
+    def batch(self, inputs, config=None, return_exceptions=False):
+        return [RuntimeError("LLM unavailable") for _ in inputs]
+
+    async def abatch(self, inputs, config=None, return_exceptions=False):
+        return self.batch(inputs)
+
+
+def test_resume_after_writer_failure_repeats_no_searches():
+    searches = []
+
+    async def _search(query, num_results=8, summary=None, kind="general"):
+        searches.append(query)
+        return await _afake_results(query)
+
+    with patch.object(langgraph_agent, "_aagentic_results", _search):
+        with patch.object(langgraph_agent, "get_llm", return_value=_DownLLM()):
+            with pytest.raises(RuntimeError):
+                asyncio.run(arun_vpagent(_payload(), thread_id="test-resume-writer"))
+        assert len(searches) == 5
+        with patch.object(langgraph_agent, "get_llm", return_value=_FakeLLM()):
+            state = asyncio.run(aresume_vpagent("test-resume-writer"))
+
+    assert len(searches) == 5
+    assert state["is_complete"] and state["cover_letter"] == "Generated text"
+    assert list(state["hotels_by_city"]) == ["Paris", "Rome"]
+    # A completed run is returned as is.
+    assert asyncio.run(aresume_vpagent("test-resume-writer"))["cover_letter"] == "Generated text"
+
+
+class _WritesSaver(BoundedMemorySaver):
+    """Sets ``saved`` once every node in ``nodes`` has had its writes stored."""
+
+    def __init__(self, nodes):
+        super().__init__()
+        self.waiting = set(nodes)
+        self.saved = threading.Event()
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        super().put_writes(config, writes, task_id, task_path)
+        self.waiting.discard(task_path.rsplit(", ", 1)[-1])  # "~__pregel_pull, <node>"
+        if not self.waiting:
+            self.saved.set()
+
+
+def test_resume_reruns_only_the_failed_research_node():
+    searches = []
+    hotels_down = [True]
+    saver = _WritesSaver({"flight_research", "insurance_research"})
+
+    def _search(query, num_results=8, summary=None, kind="general"):
+        searches.append(query)
+        if hotels_down[0] and "hotels" in query:
+            # Fail only once the flight and insurance results are checkpointed;
+            # siblings still running when a node fails are cancelled and rerun.
+            assert saver.saved.wait(timeout=10)
+            raise RuntimeError("hotel search failed")
+        return _fake_results(query)
+
+    checkpoints.set_checkpointer(saver)
+    langgraph_agent._compiled_app.cache_clear()
+    try:
+        with patch.object(langgraph_agent, "_agentic_results", _search), patch.object(
+            langgraph_agent, "get_llm", return_value=_FakeLLM()
+        ):
+            with pytest.raises(RuntimeError):
+                run_vpagent(_payload(), thread_id="test-resume-research")
+            hotels_down[0] = False
+            searches.clear()
+            state = resume_vpagent("test-resume-research")
+    finally:
+        checkpoints.set_checkpointer(None)
+        langgraph_agent._compiled_app.cache_clear()
+
+    # Flights and insurance finished in the failed step and are not searched again.
+    assert all("hotels" in query for query in searches) and len(searches) == 2
+    assert state["outbound_flights"] and state["insurance_options"]
+    assert state["is_complete"]
+
+
+class _CoverLetterDownLLM(_FakeLLM):
+    def batch(self, inputs, config=None, return_exceptions=False):
+        return [
+            RuntimeError("rate limited")
+            if "cover_letter" in cfg["tags"]
+            else SimpleNamespace(content="| Day 1 |")
+            for cfg in config
+        ]
+
+
+class _RecordingLLM(_FakeLLM):
+    def __init__(self):
+        self.tags = []
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        self.tags.extend(tag for cfg in config for tag in cfg["tags"])
+        return super().batch(inputs)
+
+
+def test_resume_rewrites_only_the_document_that_failed():
+    llm = _RecordingLLM()
+    with patch.object(langgraph_agent, "_agentic_results", _fake_results):
+        with patch.object(langgraph_agent, "get_llm", return_value=_CoverLetterDownLLM()):
+            partial = run_vpagent(_payload(), thread_id="test-resume-document")
+        assert partial["cover_letter"] == "" and partial["is_complete"]
+        with patch.object(langgraph_agent, "get_llm", return_value=llm):
+            state = resume_vpagent("test-resume-document")
+            assert resume_vpagent("test-resume-document") == state  # now finished
+
+    assert llm.tags == ["cover_letter"]
+    assert state["cover_letter"] == "Generated text"
+    assert state["itinerary_table"] == "| Day 1 |"
+    assert state["error"] is None and state["is_complete"]
+
+
+def test_resume_survives_a_restart_with_the_sqlite_checkpointer(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+
+    def _use(saver):
+        checkpoints.set_checkpointer(saver)
+        langgraph_agent._compiled_app.cache_clear()
+        return saver
+
+    saver = _use(checkpoints.SQLiteCheckpointSaver(path))
+    try:
+        with patch.object(langgraph_agent, "_aagentic_results", side_effect=_afake_results):
+            with patch.object(langgraph_agent, "get_llm", return_value=_DownLLM()):
+                with pytest.raises(RuntimeError):
+                    asyncio.run(arun_vpagent(_payload(), thread_id="test-resume-restart"))
+            saver.close()
+            # A new worker: fresh saver on the same file, freshly compiled graph.
+            saver = _use(checkpoints.SQLiteCheckpointSaver(path))
+            with patch.object(langgraph_agent, "get_llm", return_value=_FakeLLM()), patch.object(
+                langgraph_agent, "_aagentic_results", side_effect=AssertionError("searched again")
+            ):
+                state = asyncio.run(aresume_vpagent("test-resume-restart"))
+    finally:
+        saver.close()
+        checkpoints.set_checkpointer(None)
+        langgraph_agent._compiled_app.cache_clear()
+
+    assert state["is_complete"] and state["itinerary_table"] == "Generated text"
+    assert len(state["messages"]) == 6
+
+
+def test_resume_of_unknown_thread_raises():
+    with pytest.raises(RunNotFoundError):
+        resume_vpagent("test-never-started")
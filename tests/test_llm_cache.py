@@ -0,0 +1,75 @@
+"""Tests for the LLM response cache."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from vp_generator import llm, llm_cache
+from vp_generator.config import Settings
+from vp_generator.llm_cache import LLMCache, bypass_llm_cache, llm_cache_bypassed, llm_cache_key
+
+
+def test_key_normalizes_whitespace_and_covers_model_settings():
+    key = llm_cache_key("gpt-4o-mini", 0.3, "Write a letter\n   for Priya")
+    assert key == llm_cache_key("gpt-4o-mini", 0.3, "  Write a letter for Priya\n")
+    assert key != llm_cache_key("gpt-4o", 0.3, "Write a letter for Priya")
+    assert key != llm_cache_key("gpt-4o-mini", 0.7, "Write a letter for Priya")
+    assert key != llm_cache_key("gpt-4o-mini", 0.3, "Write a letter for Priya", max_output_tokens=10)
+
+
+def test_cache_evicts_least_recently_used_entries_by_size():
+    cache = LLMCache(max_bytes=250)
+    cache.set("a", "m", "x" * 100)
+    cache.set("b", "m", "y" * 100)
+    assert cache.get("a") == "x" * 100  # "b" is now the least recently used
+    cache.set("c", "m", "z" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] == 200 and stats["evictions"] == 1
+    cache.set("huge", "m", "w" * 300)  # larger than the whole cache: not stored
+    assert cache.get("huge") is None
+
+
+def test_cache_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    LLMCache(path).set("key", "gpt-4o-mini", "Dear Consular Officer")
+    assert LLMCache(path).get("key") == "Dear Consular Officer"
+
+
+def test_bypass_is_scoped_to_the_block():
+    assert not llm_cache_bypassed()
+    with bypass_llm_cache():
+        assert llm_cache_bypassed()
+        with bypass_llm_cache(False):
+            assert not llm_cache_bypassed()
+    assert not llm_cache_bypassed()
+
+
+class _CountingClient:
+    def __init__(self):
+        self.calls = 0
+        self.responses = SimpleNamespace(create=self._create)
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        content = SimpleNamespace(text=f" Letter {self.calls} ")
+        return SimpleNamespace(output=[SimpleNamespace(content=[content])], usage=None)
+
+
+def test_llm_call_serves_repeated_prompts_from_cache():
+    client = _CountingClient()
+    settings = Settings(openai_api_key="test-key")
+    with patch.object(llm_cache, "_cache", LLMCache()), patch.object(
+        llm, "get_settings", return_value=settings
+    ), patch.object(llm, "get_client", return_value=client):
+        assert llm.llm_call("Cover letter for Priya") == "Letter 1"
+        assert llm.llm_call("Cover letter  for\nPriya") == "Letter 1"
+        assert client.calls == 1
+        with bypass_llm_cache():
+            assert llm.llm_call("Cover letter for Priya") == "Letter 2"
+        # The regenerated text replaces the cached one.
+        assert llm.llm_call("Cover letter for Priya") == "Letter 2"
+        assert client.calls == 2
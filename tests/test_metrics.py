@@ -0,0 +1,101 @@
+"""Tests for the Prometheus metrics layer and the /metrics endpoint."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from vp_generator import api, instrumentation, metrics, search_cache
+from vp_generator.search_cache import MemoryLRUTier, SearchCache, SingleFlight
+from vp_generator.services.circuit_breaker import protect, reset_breakers
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_endpoint_exposes_route_latency_and_provider_series():
+    labels = {"method": "GET", "route": "/health", "status": "2xx"}
+    before = _sample("vp_http_request_duration_seconds_count", labels)
+    with TestClient(api.app) as client:
+        client.get("/health")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert _sample("vp_http_request_duration_seconds_count", labels) == before + 1
+    body = response.text
+    assert "vp_http_requests_in_flight" in body
+    for provider in metrics.PROVIDERS:
+        assert f'vp_provider_call_duration_seconds_count{{outcome="ok",provider="{provider}"}}' in body
+
+
+def test_unknown_paths_share_one_route_label():
+    with TestClient(api.app) as client:
+        client.get("/no-such-page/123")
+        client.get("/no-such-page/456")
+    assert _sample(
+        "vp_http_request_duration_seconds_count",
+        {"method": "GET", "route": "unmatched", "status": "4xx"},
+    ) >= 2
+
+
+def test_protect_records_provider_errors():
+    before = _sample("vp_provider_errors_total", {"provider": "serpapi"})
+    with pytest.raises(TimeoutError):
+        with protect("serpapi"):
+            raise TimeoutError("read timed out")
+    reset_breakers()
+
+    assert _sample("vp_provider_errors_total", {"provider": "serpapi"}) == before + 1
+    assert _sample(
+        "vp_provider_call_duration_seconds_count", {"provider": "serpapi", "outcome": "error"}
+    ) >= 1
+
+
+def test_search_and_llm_latency_are_each_recorded_once():
+    labels = {"provider": "exa", "outcome": "ok"}
+    before = _sample("vp_provider_call_duration_seconds_count", labels)
+    with instrumentation.external_call("exa", "hotels in Paris") as call, protect("exa"):
+        call.bytes = 512
+    assert _sample("vp_provider_call_duration_seconds_count", labels) == before + 1
+
+    llm_labels = {"provider": "openai", "model": "gpt-test", "outcome": "ok"}
+    before = _sample("vp_llm_call_duration_seconds_count", llm_labels)
+    instrumentation.record_llm_call("gpt-test", 0.2, provider="openai", input_tokens=10)
+    assert _sample("vp_llm_call_duration_seconds_count", llm_labels) == before + 1
+
+    body = metrics.render_metrics()[0].decode()
+    assert "vpagent_" not in body
+    assert 'vp_provider_call_duration_seconds_count{outcome="ok",provider="openai"}' not in body
+
+
+def test_cache_hit_ratio_is_read_at_scrape_time():
+    cache = SearchCache([MemoryLRUTier()])
+    cache.set("k", [{"title": "x"}])
+    cache.get("k")
+    cache.get("k")
+    cache.get("missing")
+    with patch.object(search_cache, "_cache", cache):
+        assert _sample("vp_search_cache_hit_ratio", {}) == pytest.approx(2 / 3)
+        assert _sample("vp_search_cache_lookups_total", {"result": "miss"}) == 1
+        assert _sample("vp_search_cache_tier_hits_total", {"tier": "memory"}) == 2
+
+
+def test_single_flight_counts_are_read_at_scrape_time():
+    flight = SingleFlight()
+    flight.get_or_fetch("k", lambda: [{"title": "x"}])
+    flight.shared = 3
+    with patch.object(search_cache, "_single_flight", flight):
+        assert _sample("vp_search_singleflight_calls_total", {"outcome": "executed"}) == 1
+        assert _sample("vp_search_singleflight_calls_total", {"outcome": "coalesced"}) == 3
+        assert _sample("vp_search_singleflight_in_flight", {}) == 0
+
+
+def test_bound_children_are_reused():
+    children = metrics.BoundChildren(lambda *labels: object())
+    assert children.get("exa", "ok") is children.get("exa", "ok")
+    assert children.get("exa", "ok") is not children.get("exa", "error")
@@ -0,0 +1,98 @@
+"""Tests for the shared OAuth token manager."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from vp_generator.services.oauth import OAuthTokenManager
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_callers_share_a_single_fetch():
+    calls = []
+    gate = threading.Event()
+
+    def _fetch():
+        calls.append(1)
+        gate.wait(5)
+        return "token-1", 1800
+
+    manager = OAuthTokenManager(_fetch)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get_token())) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["token-1"] * 20
+
+
+def test_token_is_refreshed_ahead_of_expiry_in_the_background():
+    clock = _Clock()
+    tokens = iter([("token-1", 1000), ("token-2", 1000)])
+    manager = OAuthTokenManager(lambda: next(tokens), expiry_margin=60, refresh_ahead=300, clock=clock)
+    assert manager.get_token() == "token-1"
+
+    clock.now += 700  # 240 s of validity left: inside the refresh-ahead window
+    assert manager.get_token() == "token-1"  # callers are not blocked
+    manager._background.join(5)
+    assert manager.get_token() == "token-2"
+
+
+def test_short_lived_token_is_not_refreshed_on_every_call():
+    clock = _Clock()
+    calls = []
+
+    def _fetch():
+        calls.append(1)
+        return f"token-{len(calls)}", 120
+
+    manager = OAuthTokenManager(_fetch, expiry_margin=60, refresh_ahead=300, clock=clock)
+    assert manager.get_token() == "token-1"
+    for _ in range(4):
+        clock.now += 10
+        assert manager.get_token() == "token-1"
+    assert manager._background is None
+    assert len(calls) == 1
+
+    clock.now += 10  # past the first half of the 90 s this token is used for
+    assert manager.get_token() == "token-1"
+    manager._background.join(5)
+    assert len(calls) == 2
+    assert manager.get_token() == "token-2"
+    assert manager._background.is_alive() is False
+    assert len(calls) == 2
+
+
+def test_failed_fetch_backs_off_instead_of_retrying_every_call():
+    clock = _Clock()
+    calls = []
+
+    def _fetch():
+        calls.append(1)
+        return None
+
+    manager = OAuthTokenManager(_fetch, failure_backoff=5, clock=clock)
+    assert manager.get_token() is None
+    assert manager.get_token() is None
+    assert len(calls) == 1
+    clock.now += 6
+    manager.get_token()
+    assert len(calls) == 2
+
+
+def test_async_interface_returns_cached_token():
+    manager = OAuthTokenManager(lambda: ("token-1", 3600))
+    assert asyncio.run(manager.aget_token()) == "token-1"
+    assert asyncio.run(manager.aget_token()) == "token-1"
@@ -0,0 +1,84 @@
+"""Tests for the dependency-aware stage scheduler."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from vp_generator.models import TripPlan, TripRequest
+from vp_generator.pipeline import Stage, run_stages, validate_stages
+
+
+def _plan():
+    return TripPlan(
+        request=TripRequest(
+            nationality="Indian",
+            residence_country="India",
+            departure_city="Bengaluru (BLR)",
+            destination_countries=["France"],
+            primary_destination_country="France",
+            start_date="2025-06-10",
+            end_date="2025-06-12",
+            purpose="tourism",
+        )
+    )
+
+
+def test_independent_stages_run_concurrently_and_dependents_wait():
+    barrier = threading.Barrier(2, timeout=5)
+    order = []
+
+    def _parallel(name):
+        def _run(_plan):
+            barrier.wait()  # only releases if both independent stages overlap
+            order.append(name)
+
+        return _run
+
+    stages = [
+        Stage("join", lambda _plan: order.append("join"), inputs=("a", "b"), outputs=("c",)),
+        Stage("a", _parallel("a"), inputs=("request",), outputs=("a",)),
+        Stage("b", _parallel("b"), inputs=("request",), outputs=("b",)),
+    ]
+    plan = _plan()
+
+    timings = run_stages(plan, stages)
+
+    assert order[-1] == "join" and set(order[:2]) == {"a", "b"}
+    assert set(timings) == {"a", "b", "join"}
+    assert plan.stage_timings_ms == timings
+
+
+def test_stage_failure_is_raised_and_skips_dependents():
+    ran = []
+
+    def _boom(_plan):
+        raise RuntimeError("provider down")
+
+    stages = [
+        Stage("flights", _boom, outputs=("flights",)),
+        Stage("documents", lambda _plan: ran.append("documents"), inputs=("flights",)),
+    ]
+    with pytest.raises(RuntimeError, match="provider down"):
+        run_stages(_plan(), stages)
+    assert ran == []
+
+
+@pytest.mark.parametrize(
+    "stages, message",
+    [
+        ([Stage("a", print, inputs=("missing",))], "No stage produces"),
+        (
+            [
+                Stage("a", print, inputs=("y",), outputs=("x",)),
+                Stage("b", print, inputs=("x",), outputs=("y",)),
+            ],
+            "cycle",
+        ),
+        ([Stage("a", print, outputs=("x",)), Stage("b", print, outputs=("x",))], "produced by both"),
+    ],
+)
+def test_invalid_stage_graphs_are_rejected(stages, message):
+    with pytest.raises(ValueError, match=message):
+        validate_stages(stages)
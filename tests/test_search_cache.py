@@ -0,0 +1,164 @@
+"""Tests for the agentic search result cache."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from vp_generator.search_cache import (
+    MemoryLRUTier,
+    SQLiteTier,
+    SearchCache,
+    SearchMemo,
+    SingleFlight,
+    cache_key,
+)
+
+RESULTS = [{"title": "Hotel Lumiere", "url": "https://example.com", "content": "€120"}]
+
+
+def test_cache_key_normalizes_query_and_hashes_summary():
+    summary = {"query": "hotels", "schema": {"type": "object"}}
+    assert cache_key("Hotels  Paris\n2025", 8, summary) == cache_key("hotels paris 2025", 8, dict(summary))
+    assert cache_key("hotels paris", 8) != cache_key("hotels paris", 6)
+    assert cache_key("hotels paris", 8, summary) != cache_key("hotels paris", 8, {"query": "other"})
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryLRUTier(max_entries=2)
+    cache = SearchCache([tier])
+    cache.set("a", RESULTS)
+    cache.set("b", RESULTS)
+    assert cache.get("a") == RESULTS  # refresh "a" so "b" is the LRU entry
+    cache.set("c", RESULTS)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == RESULTS
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert stats["memory_evictions"] == 1 and stats["memory_size"] == 2
+
+
+def test_entries_expire_per_kind():
+    cache = SearchCache([MemoryLRUTier()], ttls={"flights": 10, "insurance": 1000})
+    with patch("vp_generator.search_cache.time.time", return_value=0):
+        cache.set("flight", RESULTS, kind="flights")
+        cache.set("insurance", RESULTS, kind="insurance")
+    with patch("vp_generator.search_cache.time.time", return_value=60):
+        assert cache.get("flight", "flights") is None
+        assert cache.get("insurance", "insurance") == RESULTS
+
+
+def test_empty_results_are_not_cached():
+    cache = SearchCache([MemoryLRUTier()])
+    cache.set("empty", [])
+    assert cache.get("empty") is None
+
+
+def test_disk_tier_survives_restart_and_promotes_to_memory(tmp_path):
+    path = str(tmp_path / "search.sqlite")
+    SearchCache([MemoryLRUTier(), SQLiteTier(path)]).set("k", RESULTS, kind="hotels")
+
+    memory = MemoryLRUTier()
+    restarted = SearchCache([memory, SQLiteTier(path)])
+    assert restarted.get("k", "hotels") == RESULTS
+    assert restarted.get("k", "hotels") == RESULTS
+    stats = restarted.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+
+def test_search_memo_shares_in_flight_and_finished_searches():
+    memo = SearchMemo()
+    calls = []
+
+    async def _fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return RESULTS
+
+    async def _run():
+        together = await asyncio.gather(*(memo.aget_or_fetch("k", _fetch) for _ in range(3)))
+        later = await memo.aget_or_fetch("k", _fetch)
+        return together, later
+
+    together, later = asyncio.run(_run())
+
+    assert together == [RESULTS] * 3 and later == RESULTS
+    assert len(calls) == 1
+    assert memo.stats() == {"unique": 1, "shared": 3}
+
+
+def test_search_memo_does_not_remember_failures():
+    memo = SearchMemo()
+
+    def _boom():
+        raise RuntimeError("search failed")
+
+    with pytest.raises(RuntimeError):
+        memo.get_or_fetch("k", _boom)
+
+    assert memo.get_or_fetch("k", lambda: RESULTS) == RESULTS
+    assert memo.stats()["unique"] == 2
+
+
+def test_single_flight_coalesces_concurrent_threads_then_forgets():
+    flight = SingleFlight()
+    calls = []
+    start = threading.Barrier(5)
+
+    def _fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return RESULTS
+
+    def _caller(out):
+        start.wait()
+        out.append(flight.get_or_fetch("k", _fetch))
+
+    results = []
+    threads = [threading.Thread(target=_caller, args=(results,)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [RESULTS] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"unique": 1, "shared": 4}
+    assert flight.in_flight() == 0
+    # Nothing is remembered once the call finishes; the search cache does that.
+    flight.get_or_fetch("k", _fetch)
+    assert len(calls) == 2
+
+
+def test_single_flight_survives_cancelled_callers():
+    flight = SingleFlight()
+    calls = []
+
+    async def _fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return RESULTS
+
+    async def _run():
+        # A waiter timing out must not cancel the shared call...
+        leader = asyncio.ensure_future(flight.aget_or_fetch("k", _fetch))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(flight.aget_or_fetch("k", _fetch), 0.01)
+        assert await leader == RESULTS
+
+        # ...and a cancelled leader hands the search over to its waiters.
+        leader = asyncio.ensure_future(flight.aget_or_fetch("j", _fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.aget_or_fetch("j", _fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(_run()) == RESULTS
+    assert len(calls) == 3
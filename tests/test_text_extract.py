@@ -0,0 +1,92 @@
+"""Tests for the single-pass search text extractor."""
+
+from __future__ import annotations
+
+import pytest
+
+from vp_generator.text_extract import extract_facts, extract_rating, price_eur, to_eur
+
+
+@pytest.mark.parametrize(
+    ("text", "amount", "currency", "eur"),
+    [
+        ("Nonstop 7h flight from €412.", 412.0, "EUR", 412.0),
+        ("Return fares from US$ 520", 520.0, "USD", 479.56),
+        ("Fares from $389 with one bag", 389.0, "USD", 358.74),
+        ("Rooms from £150 a night", 150.0, "GBP", 175.0),
+        ("Flights from Rs. 35,000 per person", 35000.0, "INR", 388.89),
+        ("Fares from ₹18,500", 18500.0, "INR", 205.56),
+        ("Flights with a short layover from 455 EUR.", 455.0, "EUR", 455.0),
+        ("Schengen cover of €30,000 from €1.25/day", 30000.0, "EUR", 30000.0),
+        ("Half board from €1.234,50 per stay", 1234.5, "EUR", 1234.5),
+        ("No prices here", 0.0, None, 0.0),
+    ],
+)
+def test_prices_are_normalised_to_eur(text, amount, currency, eur):
+    facts = extract_facts(text)
+
+    assert (facts.price, facts.currency, facts.price_eur) == (amount, currency, eur)
+    assert price_eur(text) == eur
+
+
+def test_leading_currency_beats_trailing_code():
+    text = "Fares from 455 EUR; premium cabins €1,290"
+
+    assert extract_facts(text).price_eur == 1290.0
+    assert price_eur(text) == 1290.0
+
+
+def test_all_fields_come_from_one_sweep():
+    facts = extract_facts(
+        "Hotel Rivoli | 4-star stay with breakfast. 1 stop via Istanbul, 11h total, fares from $389."
+    )
+
+    assert facts.star_rating == 4
+    assert facts.board_type == "Bed & Breakfast"
+    assert facts.stops == 1
+    assert facts.duration_hours == 11
+    assert facts.currency == "USD"
+
+
+@pytest.mark.parametrize(
+    ("text", "stops"),
+    [
+        ("2 stops, 18h", 2),
+        ("Direct flight, 6h 40m. 1 stop on the way back", 0),
+        ("Short layover in Doha", 1),
+        ("Great fares", 1),
+    ],
+)
+def test_stop_count(text, stops):
+    assert extract_facts(text).stops == stops
+
+
+def test_durations_ignore_words_starting_with_h():
+    assert extract_facts("10 hotels near 2 hours from the airport").duration_hours == 2
+    assert extract_facts("7h30m flight").duration_hours == 7
+
+
+def test_defaults_for_empty_text():
+    facts = extract_facts("")
+
+    assert (facts.price_eur, facts.star_rating, facts.stops, facts.duration_hours, facts.board_type) == (
+        0.0,
+        4,
+        1,
+        None,
+        "Room Only",
+    )
+
+
+@pytest.mark.parametrize(
+    ("value", "rating"),
+    [("4-star", 4), ("4.5/5", 4), ("3 star", 3), (4.6, 5), (None, 4), ("excellent", 4)],
+)
+def test_extract_rating(value, rating):
+    assert extract_rating(value) == rating
+
+
+def test_numeric_price_fields_are_taken_as_eur():
+    assert price_eur(412) == 412.0
+    assert price_eur(None) == 0.0
+    assert to_eur(100, "XYZ") == 100
@@ -2,14 +2,23 @@
 
 from __future__ import annotations
 
+import json
+import threading
+import time
+from types import SimpleNamespace
 from unittest.mock import patch
 
+from vp_generator import llm_cache
+from vp_generator.llm_cache import LLMCache, bypass_llm_cache
 from vp_generator.models import TripRequest, TripPlan, DayPlan
 from vp_generator.visa_pack import (
+    VISA_PACK_STAGES,
     apply_budget_band_to_plan,
     apply_rules_agent,
     generate_visa_pack,
+    plan_itinerary_agent,
 )
+from vp_generator.utils import make_date_list
 
 
 def _sample_request(**overrides):
@@ -58,4 +67,62 @@ def test_generate_visa_pack_with_stubbed_llm(mock_segment, _mock_llm):
     assert plan.flights
     assert plan.hotels
     assert plan.documents is not None
+    assert plan.documents.cover_letter == "Mock cover letter"
+    assert "Paris" in plan.documents.travel_itinerary_text
     assert not plan.validation_issues
+    assert set(plan.stage_timings_ms) == {stage.name for stage in VISA_PACK_STAGES}
+
+
+@patch("vp_generator.visa_pack.generate_itinerary_segment_structured")
+def test_plan_itinerary_agent_generates_segments_concurrently(mock_segment):
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_segment(trip_plan, segment_dates):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= 1
+        if "2025-06-09" in segment_dates:
+            raise RuntimeError("LLM unavailable")
+        return [DayPlan(date=d, city="Paris", summary="Plan") for d in reversed(segment_dates)]
+
+    mock_segment.side_effect = fake_segment
+    plan = TripPlan(request=_sample_request(start_date="2025-06-01", end_date="2025-06-30"))
+
+    plan_itinerary_agent(plan, max_workers=3)
+
+    assert mock_segment.call_count == 4
+    assert active["peak"] == 3
+    assert [day.date for day in plan.itinerary] == make_date_list("2025-06-01", "2025-06-30")
+    failed_segment = plan.itinerary[8:16]
+    assert all(day.summary == "Sightseeing and local exploration." for day in failed_segment)
+    assert all(day.city == "Paris" for day in plan.itinerary[:8] + plan.itinerary[16:])
+
+
+def test_regenerate_skips_the_segment_cache_in_worker_threads():
+    calls = []
+
+    def fake_response(**kwargs):
+        calls.append(1)
+        days = [{"date": "2025-06-01", "city": f"Paris {len(calls)}", "summary": "Plan"}]
+        tool_call = SimpleNamespace(
+            type="function_call", name="generate_itinerary_segment", arguments=json.dumps({"days": days})
+        )
+        return SimpleNamespace(output=[tool_call])
+
+    request = _sample_request(start_date="2025-06-01", end_date="2025-06-12")
+    with patch.object(llm_cache, "_cache", LLMCache()), patch(
+        "vp_generator.visa_pack.create_response", side_effect=fake_response
+    ):
+        plan_itinerary_agent(TripPlan(request=request))
+        assert len(calls) == 2  # two segments, both written to the cache
+        plan_itinerary_agent(TripPlan(request=request))
+        assert len(calls) == 2
+        with bypass_llm_cache():
+            plan = TripPlan(request=request)
+            plan_itinerary_agent(plan)
+        assert len(calls) == 4
+        assert plan.itinerary[0].city in {"Paris 3", "Paris 4"}
@@ -1,19 +1,45 @@
 """FastAPI application exposing the visa pack generator."""
 
+import json
+import logging
+from contextlib import asynccontextmanager
 from dataclasses import asdict
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
+from .instrumentation import maybe_collect_timings
+from .metrics import PROMETHEUS_AVAILABLE, RequestMetricsMiddleware, register_collectors, render_metrics
 from .models import TripRequest, TripPlan
-from .langgraph_agent import run_vpagent, summarize_response
+from .langgraph_agent import (
+    RunNotFoundError,
+    arun_vpagent,
+    arun_vpagent_batch,
+    aresume_vpagent,
+    astream_vpagent,
+    summarize_response,
+)
+from .llm_cache import bypass_llm_cache, get_llm_cache
+from .search_cache import get_search_cache, get_single_flight
+from .services.circuit_breaker import breaker_snapshot
+from .services.hedging import PROVIDER_LATENCY
+from .services.http_pool import aclose_http_clients
 from .visa_pack import generate_visa_pack
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    await aclose_http_clients()
 
-app = FastAPI(title="Visa Pack Generator", version="0.1.0")
+
+app = FastAPI(title="Visa Pack Generator", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +53,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestMetricsMiddleware)
+register_collectors()
 
 
 class TripRequestPayload(BaseModel):
@@ -76,18 +104,46 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus exposition of request, provider, cache and LLM metrics."""
+
+    if not PROMETHEUS_AVAILABLE:
+        return Response("prometheus-client is not installed\n", status_code=503, media_type="text/plain")
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
+@app.get("/diagnostics")
+def diagnostics() -> Dict[str, Any]:
+    """Circuit breaker states, provider latencies, search/LLM cache and coalescing counters."""
+
+    cache = get_search_cache()
+    single_flight = get_single_flight()
+    llm_cache = get_llm_cache()
+    return {
+        "circuit_breakers": breaker_snapshot(),
+        "provider_latency": PROVIDER_LATENCY.snapshot(),
+        "search_cache": cache.stats() if cache is not None else None,
+        "search_single_flight": single_flight.stats() if single_flight is not None else None,
+        "llm_cache": llm_cache.stats() if llm_cache is not None else None,
+    }
+
+
 @app.post("/visa-pack")
-def create_visa_pack(payload: TripRequestPayload) -> Dict[str, Any]:
+def create_visa_pack(payload: TripRequestPayload, regenerate: bool = False) -> Dict[str, Any]:
+    """Build a pack; ``?regenerate=true`` rewrites documents instead of reusing cached ones."""
+
     try:
         req = TripRequest(**payload.dict())
-        plan: TripPlan = generate_visa_pack(req)
+        with bypass_llm_cache(regenerate):
+            plan: TripPlan = generate_visa_pack(req)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     return asdict(plan)
 
 
-@app.post("/visa-pack/agent")
-def create_vpagent_pack(payload: VPAgentPayload) -> Dict[str, Any]:
+def _agent_payload(payload: VPAgentPayload) -> Dict[str, Any]:
     data = payload.model_dump()
     if not data["travelers"]:
         raise HTTPException(status_code=400, detail="At least one traveler is required.")
@@ -96,10 +152,173 @@ def create_vpagent_pack(payload: VPAgentPayload) -> Dict[str, Any]:
             status_code=400, detail="At least one destination is required."
         )
     data["num_travelers"] = len(data["travelers"])
+    return data
+
+
+# Every agent response names the run's thread so a failed run can be resumed.
+THREAD_HEADER = "X-VPAgent-Thread-Id"
+
+
+async def _await_run(run: Awaitable[Any], thread_id: str) -> Any:
+    headers = {THREAD_HEADER: thread_id}
     try:
-        state = run_vpagent(data, thread_id=f"vpagent-{uuid4()}")
+        return await run
+    except RunNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc), headers=headers) from exc
     except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+        raise HTTPException(status_code=400, detail=str(exc), headers=headers) from exc
     except RuntimeError as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-    return summarize_response(state)
+        raise HTTPException(status_code=500, detail=str(exc), headers=headers) from exc
+    except Exception as exc:  # noqa: BLE001 - e.g. an LLM SDK error; the run stays resumable
+        logger.exception("Agent run %s failed", thread_id)
+        detail = f"{type(exc).__name__}: {exc}"
+        raise HTTPException(status_code=500, detail=detail, headers=headers) from exc
+
+
+def _agent_body(state: Any, thread_id: str, trace: Any) -> Dict[str, Any]:
+    body = summarize_response(state)
+    body["thread_id"] = thread_id
+    if trace is not None:
+        body["timings"] = trace.summary()
+    return body
+
+
+@app.post("/visa-pack/agent")
+async def create_vpagent_pack(
+    payload: VPAgentPayload, response: Response, timings: bool = False, regenerate: bool = False
+) -> Dict[str, Any]:
+    """Run the agent; ``?timings=true`` adds per-node, search and LLM timings.
+
+    A trip submitted again gets its cover letter and itinerary from the LLM
+    cache; ``?regenerate=true`` asks the model for fresh ones.
+    """
+
+    data = _agent_payload(payload)
+    thread_id = f"vpagent-{uuid4()}"
+    response.headers[THREAD_HEADER] = thread_id
+    with maybe_collect_timings(timings) as trace, bypass_llm_cache(regenerate):
+        state = await _await_run(arun_vpagent(data, thread_id=thread_id), thread_id)
+    return _agent_body(state, thread_id, trace)
+
+
+@app.post("/visa-pack/agent/{thread_id}/resume")
+async def resume_vpagent_pack(
+    thread_id: str, response: Response, timings: bool = False
+) -> Dict[str, Any]:
+    """Continue a failed run from its last checkpoint; finished nodes are not rerun.
+
+    Returns the same body as /visa-pack/agent. A run that completed without
+    one of its documents writes that document again; any other completed run
+    is returned as is. An unknown (or expired) thread is a 404.
+    """
+
+    response.headers[THREAD_HEADER] = thread_id
+    with maybe_collect_timings(timings) as trace:
+        state = await _await_run(aresume_vpagent(thread_id), thread_id)
+    return _agent_body(state, thread_id, trace)
+
+
+MAX_BATCH_ITEMS = 500
+
+
+def _batch_error(exc: Exception) -> Dict[str, Any]:
+    if isinstance(exc, ValidationError):
+        return {"status_code": 422, "detail": exc.errors(include_url=False, include_context=False)}
+    if isinstance(exc, HTTPException):
+        return {"status_code": exc.status_code, "detail": exc.detail}
+    return {"status_code": 400 if isinstance(exc, ValueError) else 500, "detail": str(exc)}
+
+
+@app.post("/visa-packs/batch")
+async def create_vpagent_batch(
+    payloads: List[Dict[str, Any]],
+    concurrency: Optional[int] = Query(None, ge=1, le=32),
+    regenerate: bool = False,
+) -> Dict[str, Any]:
+    """Generate many packs in one call (e.g. a travel agency's group applications).
+
+    Packs that share a route and dates run each flight/hotel search once for
+    the whole batch. ``results`` follows the input order; each entry carries
+    either the same body as /visa-pack/agent under ``pack`` or an ``error``, and
+    the ``thread_id`` of its run for /visa-pack/agent/{thread_id}/resume. Each
+    pack is validated on its own, so a malformed one becomes a 422 ``error``
+    entry instead of failing the whole batch.
+    """
+    if not payloads:
+        raise HTTPException(status_code=400, detail="The batch is empty.")
+    if len(payloads) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=400, detail=f"A batch holds at most {MAX_BATCH_ITEMS} packs."
+        )
+    items: List[Optional[Dict[str, Any]]] = []
+    errors: Dict[int, Exception] = {}
+    for index, payload in enumerate(payloads):
+        try:
+            items.append(_agent_payload(VPAgentPayload.model_validate(payload)))
+        except (ValidationError, HTTPException) as exc:
+            items.append(None)
+            errors[index] = exc
+    valid = [index for index, item in enumerate(items) if item is not None]
+    thread_prefix = f"vpbatch-{uuid4()}"
+    with bypass_llm_cache(regenerate):
+        outcomes, searches = await arun_vpagent_batch(
+            [items[index] for index in valid],
+            concurrency=concurrency,
+            thread_prefix=thread_prefix,
+        )
+    states = dict(zip(valid, outcomes))
+    threads = {index: f"{thread_prefix}-{position}" for position, index in enumerate(valid)}
+
+    results: List[Dict[str, Any]] = []
+    for index in range(len(payloads)):
+        outcome = errors.get(index, states.get(index))
+        if isinstance(outcome, Exception):
+            result = {"index": index, "ok": False, "error": _batch_error(outcome)}
+        else:
+            result = {"index": index, "ok": True, "pack": summarize_response(outcome)}
+        if index in threads:
+            result["thread_id"] = threads[index]
+        results.append(result)
+    succeeded = sum(1 for result in results if result["ok"])
+    return {
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "searches": searches,
+        "results": results,
+    }
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/visa-pack/agent/stream")
+async def stream_vpagent_pack(payload: VPAgentPayload, regenerate: bool = False) -> StreamingResponse:
+    """Server-Sent Events variant of /visa-pack/agent.
+
+    Emits ``flights``, ``hotels`` and ``insurance`` as research finishes,
+    ``cover_letter_token``/``itinerary_token`` while the LLM writes, then
+    ``documents``, ``preview`` and a final ``complete`` event carrying the same
+    body as /visa-pack/agent. Failures are reported as an ``error`` event; the
+    run's thread is in the X-VPAgent-Thread-Id header.
+    """
+    data = _agent_payload(payload)
+    thread_id = f"vpagent-{uuid4()}"
+
+    async def _events() -> AsyncIterator[str]:
+        try:
+            with bypass_llm_cache(regenerate):
+                async for event, body in astream_vpagent(data, thread_id=thread_id):
+                    yield _sse(event, body)
+        except (ValueError, RuntimeError) as exc:
+            yield _sse("error", {"detail": str(exc)})
+        except Exception as exc:  # noqa: BLE001 - e.g. an LLM SDK error mid-stream
+            logger.exception("Agent stream %s failed", thread_id)
+            yield _sse("error", {"detail": f"{type(exc).__name__}: {exc}"})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", THREAD_HEADER: thread_id},
+    )
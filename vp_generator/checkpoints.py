@@ -0,0 +1,521 @@
+"""Bounded checkpoint savers for the VPAgent graph.
+
+Every API request runs the graph on a fresh ``thread_id``. LangGraph's stock
+``MemorySaver`` keeps every checkpoint of every thread for the life of the
+process, including the messages and the large Markdown preview, so memory grows
+with traffic. Two alternatives are provided, selected with
+``VP_AGENT_CHECKPOINTER``:
+
+* ``memory`` (default): :class:`BoundedMemorySaver`, which keeps at most
+  ``VP_AGENT_CHECKPOINT_MAX_THREADS`` threads in process. It evicts the least
+  recently used thread, and any thread idle for ``VP_AGENT_CHECKPOINT_TTL``
+  seconds.
+* ``sqlite``: :class:`SQLiteCheckpointSaver`, which writes checkpoints to
+  ``VP_AGENT_CHECKPOINT_PATH``. It keeps only the latest checkpoint of each
+  thread (compaction) and purges threads idle for longer than the TTL.
+  Checkpoints outlive the process and can be shared by workers on one host.
+
+This module imports LangGraph at import time; like the agent itself, import it
+lazily.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+DEFAULT_MAX_THREADS = 1000
+DEFAULT_TTL = 60 * 60.0
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """``InMemorySaver`` that drops whole threads by LRU order and idle time.
+
+    A thread counts as used when one of its checkpoints or writes is stored or
+    read. Evicting a thread removes its checkpoints, pending writes and channel
+    blobs. ``ttl=None`` disables the idle limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = DEFAULT_MAX_THREADS,
+        ttl: Optional[float] = DEFAULT_TTL,
+        serde: Optional[SerializerProtocol] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.max_threads = max(1, max_threads)
+        self.ttl = ttl
+        self.evictions = 0
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        # thread_id -> keys of ``self.writes`` / ``self.blobs``, so eviction
+        # does not scan every stored key.
+        self._write_keys: Dict[str, Set[Tuple[str, str, str]]] = {}
+        self._blob_keys: Dict[str, Set[Tuple[str, str, str, Any]]] = {}
+
+    def _touch(self, thread_id: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._last_used[thread_id] = now
+            self._last_used.move_to_end(thread_id)
+            self._evict(now, keep=thread_id)
+
+    def _evict(self, now: float, keep: str) -> None:
+        while self._last_used:
+            thread_id, last_used = next(iter(self._last_used.items()))
+            if thread_id == keep:
+                return
+            expired = self.ttl is not None and now - last_used > self.ttl
+            if not expired and len(self._last_used) <= self.max_threads:
+                return
+            self.delete_thread(thread_id)
+            self.evictions += 1
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        # ``storage`` is a defaultdict, so even a miss leaves an entry behind;
+        # touching the thread makes sure eviction cleans it up.
+        self._touch(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._blob_keys.setdefault(thread_id, set()).update(
+                (thread_id, checkpoint_ns, channel, version)
+                for channel, version in new_versions.items()
+            )
+        self._touch(thread_id)
+        return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._write_keys.setdefault(thread_id, set()).add(
+                (thread_id, configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"])
+            )
+        self._touch(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self.storage.pop(thread_id, None)
+            for key in self._write_keys.pop(thread_id, ()):
+                self.writes.pop(key, None)
+            for key in self._blob_keys.pop(thread_id, ()):
+                self.blobs.pop(key, None)
+            self._last_used.pop(thread_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"threads": len(self._last_used), "evictions": self.evictions}
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """Checkpoint saver backed by one SQLite file, compacted as it goes.
+
+    Each checkpoint row holds the whole serialized checkpoint, channel values
+    included. After a new checkpoint is stored, the thread's older checkpoints
+    are deleted, apart from the latest ``keep_last``, together with their
+    pending writes. The latest checkpoint is all LangGraph needs to read a
+    run's state or continue it.
+
+    Threads idle for longer than ``ttl`` seconds are purged at most once every
+    ``purge_interval`` seconds, as part of a write.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttl: Optional[float] = DEFAULT_TTL,
+        keep_last: int = 1,
+        purge_interval: float = 60.0,
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.path = path
+        self.ttl = ttl
+        self.keep_last = max(1, keep_last)
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+                "parent_id TEXT, type TEXT NOT NULL, checkpoint BLOB NOT NULL, "
+                "metadata_type TEXT NOT NULL, metadata BLOB NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS writes ("
+                "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+                "task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, "
+                "type TEXT NOT NULL, value BLOB NOT NULL, task_path TEXT NOT NULL, "
+                "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS checkpoints_updated_at ON checkpoints (updated_at)"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _tuple_from_row(self, row: Tuple[Any, ...]) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, blob, meta_type, meta = row
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((type_, blob)),
+            metadata=self.serde.loads_typed((meta_type, meta)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((w_type, value)))
+                for task_id, channel, w_type, value in writes
+            ],
+        )
+
+    _COLUMNS = (
+        "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, "
+        "metadata_type, metadata FROM checkpoints"
+    )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        params: Tuple[Any, ...] = (configurable["thread_id"], configurable.get("checkpoint_ns", ""))
+        query = f"{self._COLUMNS} WHERE thread_id = ? AND checkpoint_ns = ?"
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            return self._tuple_from_row(row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,  # noqa: A002 - LangGraph's signature
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses = []
+        params: Tuple[Any, ...] = ()
+        if config:
+            configurable = config["configurable"]
+            clauses.append("thread_id = ?")
+            params += (configurable["thread_id"],)
+            if configurable.get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params += (configurable["checkpoint_ns"],)
+            if get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params += (get_checkpoint_id(config),)
+        if before and get_checkpoint_id(before):
+            clauses.append("checkpoint_id < ?")
+            params += (get_checkpoint_id(before),)
+        query = self._COLUMNS
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            tuples = []
+            for row in rows:
+                if limit is not None and len(tuples) >= limit:
+                    break
+                item = self._tuple_from_row(row)
+                if filter and any(item.metadata.get(k) != v for k, v in filter.items()):
+                    continue
+                tuples.append(item)
+        yield from tuples
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        type_, blob = self.serde.dumps_typed(checkpoint)
+        meta_type, meta = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    configurable.get("checkpoint_id"),
+                    type_,
+                    blob,
+                    meta_type,
+                    meta,
+                    now,
+                ),
+            )
+            self._compact(thread_id, checkpoint_ns)
+            if self.ttl is not None and now >= self._next_purge:
+                self._next_purge = now + self.purge_interval
+                self._purge(now - self.ttl)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        key = (
+            configurable["thread_id"],
+            configurable.get("checkpoint_ns", ""),
+            configurable["checkpoint_id"],
+        )
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((*key, task_id, WRITES_IDX_MAP.get(channel, idx), channel, type_, blob, task_path))
+        # Special writes (errors, interrupts) replace an earlier one; ordinary
+        # writes are stored once, as InMemorySaver does.
+        with self._lock, self._conn:
+            for row in rows:
+                verb = "INSERT OR REPLACE" if row[4] < 0 else "INSERT OR IGNORE"
+                self._conn.execute(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    def _compact(self, thread_id: str, checkpoint_ns: str) -> None:
+        self._conn.execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ("
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT ?)",
+            (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.keep_last),
+        )
+        self._conn.execute(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ("
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?)",
+            (thread_id, checkpoint_ns, thread_id, checkpoint_ns),
+        )
+
+    def _purge(self, cutoff: float) -> int:
+        stale = [
+            thread_id
+            for (thread_id,) in self._conn.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(updated_at) < ?",
+                (cutoff,),
+            )
+        ]
+        for thread_id in stale:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+        return len(stale)
+
+    def purge_expired(self) -> int:
+        """Delete threads idle for longer than ``ttl``; returns how many."""
+
+        if self.ttl is None:
+            return 0
+        with self._lock, self._conn:
+            return self._purge(time.time() - self.ttl)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            threads, checkpoints = self._conn.execute(
+                "SELECT COUNT(DISTINCT thread_id), COUNT(*) FROM checkpoints"
+            ).fetchone()
+        return {"threads": threads, "checkpoints": checkpoints}
+
+    # ------------------------------------------------------------------
+    # Async variants: SQLite calls run on a worker thread.
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,  # noqa: A002 - LangGraph's signature
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # Same version format as InMemorySaver: zero-padded counter plus a
+        # random suffix, so versions sort correctly as strings.
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+# ---------------------------------------------------------------------------
+# Process-wide checkpointer
+# ---------------------------------------------------------------------------
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def checkpointer_from_env() -> BaseCheckpointSaver:
+    """Build the saver chosen by VP_AGENT_CHECKPOINTER (``memory`` or ``sqlite``)."""
+
+    kind = os.getenv("VP_AGENT_CHECKPOINTER", "memory").strip().lower()
+    ttl = _env_float("VP_AGENT_CHECKPOINT_TTL", DEFAULT_TTL)
+    ttl_or_none = ttl if ttl > 0 else None
+    if kind == "memory":
+        return BoundedMemorySaver(
+            max_threads=int(_env_float("VP_AGENT_CHECKPOINT_MAX_THREADS", DEFAULT_MAX_THREADS)),
+            ttl=ttl_or_none,
+        )
+    if kind == "sqlite":
+        path = os.getenv("VP_AGENT_CHECKPOINT_PATH") or "vpagent_checkpoints.sqlite3"
+        return SQLiteCheckpointSaver(path, ttl=ttl_or_none)
+    raise ValueError(f"Unknown VP_AGENT_CHECKPOINTER '{kind}'. Use 'memory' or 'sqlite'.")
+
+
+_UNSET = object()
+_checkpointer: object = _UNSET
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """Return the saver shared by every compiled VPAgent graph."""
+
+    global _checkpointer
+    if _checkpointer is _UNSET:
+        _checkpointer = checkpointer_from_env()
+    return _checkpointer  # type: ignore[return-value]
+
+
+def set_checkpointer(checkpointer: Optional[BaseCheckpointSaver]) -> None:
+    """Install a specific saver, or ``None`` to rebuild from the environment on next use.
+
+    Graphs compiled earlier keep their saver; clear the agent's compiled-app
+    cache after calling this.
+    """
+
+    global _checkpointer
+    _checkpointer = _UNSET if checkpointer is None else checkpointer
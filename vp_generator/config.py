@@ -28,6 +28,10 @@ class Settings:
     serpapi_key: Optional[str] = None
     hotelbeds_api_key: Optional[str] = None
     hotelbeds_api_secret: Optional[str] = None
+    hotel_provider_mode: str = "hedged"
+    hotel_hedge_delay: Optional[float] = None
+    flight_provider_mode: str = "hedged"
+    flight_hedge_delay: Optional[float] = 0.0
 
 
 @lru_cache(maxsize=1)
@@ -52,4 +56,17 @@ def get_settings() -> Settings:
         serpapi_key=os.getenv("SERPAPI_KEY"),
         hotelbeds_api_key=os.getenv("HOTELBEDS_API_KEY"),
         hotelbeds_api_secret=os.getenv("HOTELBEDS_API_SECRET"),
+        hotel_provider_mode=os.getenv("HOTEL_PROVIDER_MODE", "hedged").lower(),
+        hotel_hedge_delay=_optional_float(os.getenv("HOTEL_HEDGE_DELAY")),
+        flight_provider_mode=os.getenv("FLIGHT_PROVIDER_MODE", "hedged").lower(),
+        flight_hedge_delay=_optional_float(os.getenv("FLIGHT_HEDGE_DELAY", "0")),
     )
+
+
+def _optional_float(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,312 @@
+"""Timing and tracing for VPAgent runs.
+
+Three kinds of work are measured:
+
+* graph nodes (:func:`instrument_node`)
+* external search calls (:func:`external_call`)
+* LLM calls (:func:`llm_callback_handler`, a LangChain callback)
+
+Each measurement is sent to up to three sinks:
+
+* Prometheus metrics, when ``prometheus_client`` is installed. The families
+  live in :mod:`vp_generator.metrics`; search call latency is recorded there by
+  ``circuit_breaker.protect``, so only response sizes are added here.
+* OpenTelemetry spans, when ``opentelemetry-api`` is installed. Spans are
+  no-ops until an SDK/exporter is configured.
+* The per-run :class:`RunTrace` opened by :func:`collect_timings`. It backs the
+  opt-in ``timings`` key of the agent response.
+
+LangSmith is not involved.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from .metrics import observe_llm_call, observe_node, provider_metrics
+
+try:  # OpenTelemetry spans are optional (``pip install opentelemetry-api``).
+    from opentelemetry import trace as otel_trace
+
+    _tracer = otel_trace.get_tracer("vp_generator")
+except ImportError:  # pragma: no cover - depends on installed extras
+    _tracer = None
+
+
+MAX_QUERY_CHARS = 200
+
+
+class RunTrace:
+    """Measurements collected during one agent run."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.nodes: List[Dict[str, Any]] = []
+        self.external_calls: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, section: str, record: Dict[str, Any]) -> None:
+        # Nodes and their worker threads share one trace, so appends are locked.
+        with self._lock:
+            getattr(self, section).append(record)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            nodes = list(self.nodes)
+            external = list(self.external_calls)
+            llm = list(self.llm_calls)
+        return {
+            "total_ms": _ms(time.perf_counter() - self.started),
+            "nodes": nodes,
+            "external_calls": external,
+            "llm_calls": llm,
+            "totals": {
+                "external_ms": round(sum(c["ms"] for c in external), 3),
+                "llm_ms": round(sum(c["ms"] for c in llm), 3),
+                "input_tokens": sum(c.get("input_tokens") or 0 for c in llm),
+                "output_tokens": sum(c.get("output_tokens") or 0 for c in llm),
+            },
+        }
+
+
+_current_trace: ContextVar[Optional[RunTrace]] = ContextVar("vp_run_trace", default=None)
+
+
+def current_trace() -> Optional[RunTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def collect_timings() -> Iterator[RunTrace]:
+    """Collect a :class:`RunTrace` for everything run inside the block."""
+
+    trace = RunTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def maybe_collect_timings(enabled: bool) -> ContextManager[Optional[RunTrace]]:
+    return collect_timings() if enabled else nullcontext()
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _span(name: str, attributes: Dict[str, Any]) -> ContextManager[Any]:
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+# ---------------------------------------------------------------------------
+# Graph nodes
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def timed_node(name: str) -> Iterator[None]:
+    status = "ok"
+    started = time.perf_counter()
+    with _span(f"vpagent.node.{name}", {"vpagent.node": name}):
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            observe_node(name, seconds, ok=status == "ok")
+            trace = current_trace()
+            if trace is not None:
+                trace.add("nodes", {"node": name, "ms": _ms(seconds), "status": status})
+
+
+def instrument_node(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a sync or async graph node so every run is timed as ``name``."""
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def _async_node(state: Any) -> Any:
+            with timed_node(name):
+                return await func(state)
+
+        return _async_node
+
+    @functools.wraps(func)
+    def _node(state: Any) -> Any:
+        with timed_node(name):
+            return func(state)
+
+    return _node
+
+
+# ---------------------------------------------------------------------------
+# External calls
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class ExternalCall:
+    """Mutable record the caller fills in with the response status and size."""
+
+    provider: str
+    query: str
+    status: Any = None
+    bytes: int = 0
+
+
+@contextmanager
+def external_call(provider: str, query: str) -> Iterator[ExternalCall]:
+    """Trace one outbound call; an exception marks it ``error`` unless a status was set.
+
+    The call itself must run under ``circuit_breaker.protect``, which records
+    its latency in Prometheus.
+    """
+
+    call = ExternalCall(provider=provider, query=query[:MAX_QUERY_CHARS])
+    started = time.perf_counter()
+    with _span(
+        f"vpagent.external.{provider}",
+        {"vpagent.provider": provider, "vpagent.query": call.query},
+    ) as span:
+        try:
+            yield call
+        except BaseException:
+            call.status = call.status or "error"
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            status = str(call.status or "ok")
+            if span is not None:
+                span.set_attribute("vpagent.status", status)
+                span.set_attribute("vpagent.bytes", call.bytes)
+            provider_metrics(provider).bytes.inc(call.bytes)
+            trace = current_trace()
+            if trace is not None:
+                trace.add(
+                    "external_calls",
+                    {
+                        "provider": provider,
+                        "query": call.query,
+                        "status": status,
+                        "bytes": call.bytes,
+                        "ms": _ms(seconds),
+                    },
+                )
+
+
+# ---------------------------------------------------------------------------
+# LLM calls
+# ---------------------------------------------------------------------------
+
+
+def record_llm_call(
+    model: str,
+    seconds: float,
+    *,
+    provider: str,
+    status: str = "ok",
+    input_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None,
+    tags: Optional[List[str]] = None,
+    trace: Optional[RunTrace] = None,
+) -> None:
+    observe_llm_call(provider, model, seconds, status == "ok", input_tokens, output_tokens)
+    trace = trace or current_trace()
+    if trace is not None:
+        trace.add(
+            "llm_calls",
+            {
+                "model": model,
+                "tags": list(tags or []),
+                "status": status,
+                "ms": _ms(seconds),
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+            },
+        )
+
+
+def _token_usage(response: Any) -> tuple:
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens"), usage.get("output_tokens")
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+
+@functools.lru_cache(maxsize=1)
+def _handler_class() -> type:
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class LLMTimingHandler(BaseCallbackHandler):
+        """Records latency and token usage for every chat model call it sees."""
+
+        run_inline = True
+
+        def __init__(self, trace: Optional[RunTrace]) -> None:
+            self._trace = trace
+            self._lock = threading.Lock()
+            self._runs: Dict[UUID, tuple] = {}
+
+        def _start(self, serialized, run_id, tags, metadata) -> None:
+            metadata = metadata or {}
+            model = metadata.get("ls_model_name") or (serialized or {}).get("name") or "llm"
+            provider = metadata.get("ls_provider") or "llm"
+            with self._lock:
+                self._runs[run_id] = (time.perf_counter(), str(model), str(provider), tags)
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, tags=None, metadata=None, **kwargs):
+            self._start(serialized, run_id, tags, metadata)
+
+        def on_llm_start(self, serialized, prompts, *, run_id, tags=None, metadata=None, **kwargs):
+            self._start(serialized, run_id, tags, metadata)
+
+        def _finish(self, run_id, status, response=None) -> None:
+            with self._lock:
+                started = self._runs.pop(run_id, None)
+            if started is None:
+                return
+            began, model, provider, tags = started
+            seconds = time.perf_counter() - began
+            input_tokens, output_tokens = _token_usage(response) if response is not None else (None, None)
+            record_llm_call(
+                model,
+                seconds,
+                provider=provider,
+                status=status,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                tags=tags,
+                trace=self._trace,
+            )
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            self._finish(run_id, "ok", response)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._finish(run_id, "error")
+
+    return LLMTimingHandler
+
+
+def llm_callback_handler(trace: Optional[RunTrace] = None) -> Any:
+    """LangChain callback that feeds LLM latency/tokens into the active trace."""
+
+    return _handler_class()(trace or current_trace())
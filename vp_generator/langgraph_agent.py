@@ -2,30 +2,45 @@
 
 This module adapts the VPAgent workflow produced in LangChain Builder so it can be
 invoked programmatically inside our FastAPI app.
+
+The LangChain/LangGraph stack is imported, and the LLM/Tavily clients are built,
+on first use rather than at import time so the API, CLI and tests start fast and
+can be imported without provider keys.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 import operator
 import os
-import re
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
 from functools import lru_cache
-from typing import Annotated, Dict, List, Optional, TypedDict, Any
-
-from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import END, StateGraph
-
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, Tuple, TypedDict
+from uuid import uuid4
+
+from vp_generator.instrumentation import external_call, instrument_node, llm_callback_handler
+from vp_generator.llm_cache import get_llm_cache, llm_cache_bypassed, llm_cache_key
+from vp_generator.search_cache import (
+    cache_key,
+    current_search_memo,
+    get_search_cache,
+    get_single_flight,
+    search_memo,
+)
+from vp_generator.services.circuit_breaker import protect
 from vp_generator.services.exa_client import (
+    aagentic_search,
     agentic_search,
     has_exa_credentials,
     ExaError,
 )
+from vp_generator.text_extract import extract_facts, extract_rating, price_eur
+
+logger = logging.getLogger(__name__)
 
 # We intentionally import dotenv lazily; config.py already calls load_dotenv, but
 # importing here keeps this module self-contained when executed directly.
@@ -86,6 +101,16 @@ class InsuranceOption(TypedDict):
     booking_url: str
 
 
+def _last_value(_current: Any, update: Any) -> Any:
+    """Reducer that keeps the most recent write (parallel branches may all set it)."""
+    return update
+
+
+def _merge_dicts(current: Optional[Dict], update: Optional[Dict]) -> Dict:
+    """Reducer that merges per-key updates coming from parallel branches."""
+    return {**(current or {}), **(update or {})}
+
+
 class VPAgentState(TypedDict):
     messages: Annotated[List, operator.add]
     num_travelers: int
@@ -101,12 +126,12 @@ class VPAgentState(TypedDict):
     primary_destination_city: Optional[str]
     outbound_flights: List[FlightOption]
     return_flights: List[FlightOption]
-    hotels_by_city: Dict[str, List[HotelOption]]
+    hotels_by_city: Annotated[Dict[str, List[HotelOption]], _merge_dicts]
     insurance_options: List[InsuranceOption]
     cover_letter: str
     itinerary_table: str
     preview_markdown: str
-    current_step: str
+    current_step: Annotated[str, _last_value]
     needs_user_input: bool
     user_input_prompt: str
     is_complete: bool
@@ -170,10 +195,14 @@ def _init_llm():
     openai_key = os.getenv("OPENAI_API_KEY")
 
     def _anthropic():
+        from langchain_anthropic import ChatAnthropic
+
         model = os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-latest")
         return ChatAnthropic(model=model, temperature=0)
 
     def _openai():
+        from langchain_openai import ChatOpenAI
+
         model = os.getenv("OPENAI_MODEL", "gpt-4o")
         return ChatOpenAI(model=model, temperature=0)
 
@@ -192,19 +221,48 @@ def _init_llm():
     )
 
 
-LLM = _init_llm()
+@lru_cache(maxsize=1)
+def get_llm():
+    """Return the shared chat model, creating it on first use."""
+    return _init_llm()
+
+
+@lru_cache(maxsize=1)
+def get_tavily():
+    """Return the shared Tavily tool, creating it on first use."""
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
+    return TavilySearchResults(max_results=5)
+
 
-# Tavily requires an API key – instantiate lazily to provide nicer errors.
-TAVILY = TavilySearchResults(max_results=5)
+def _payload_size(results: Any) -> int:
+    return len(json.dumps(results, default=str).encode("utf-8"))
 
 
 def _search_with_tavily(query: str) -> List[Dict]:
-    try:
-        return TAVILY.invoke(query)
-    except Exception as exc:  # pragma: no cover - network failure
-        raise RuntimeError(
-            "Tavily search failed. Ensure TAVILY_API_KEY is set."
-        ) from exc
+    with external_call("tavily", query) as call:
+        try:
+            with protect("tavily"):
+                results = get_tavily().invoke(query)
+        except Exception as exc:  # pragma: no cover - network failure
+            raise RuntimeError(
+                "Tavily search failed. Ensure TAVILY_API_KEY is set."
+            ) from exc
+        call.bytes = _payload_size(results)
+        return results
+
+
+async def _asearch_with_tavily(query: str) -> List[Dict]:
+    with external_call("tavily", query) as call:
+        try:
+            with protect("tavily"):
+                results = await get_tavily().ainvoke(query)
+        except Exception as exc:  # pragma: no cover - network failure
+            raise RuntimeError(
+                "Tavily search failed. Ensure TAVILY_API_KEY is set."
+            ) from exc
+        call.bytes = _payload_size(results)
+        return results
 
 
 def _normalize_exa_results(results: List[Dict]) -> List[Dict]:
@@ -252,8 +310,8 @@ def _parse_structured_summary(summary: Any) -> Optional[Any]:
     return None
 
 
-def _agentic_results(
-    query: str, num_results: int = 8, summary: Optional[Dict[str, Any]] = None
+def _fetch_agentic_results(
+    query: str, num_results: int, summary: Optional[Dict[str, Any]]
 ) -> List[Dict]:
     if has_exa_credentials():
         try:
@@ -268,74 +326,102 @@ def _agentic_results(
     return _search_with_tavily(query)
 
 
-def _extract_price(text: str) -> float:
-    if not text:
-        return 0.0
-    match = re.search(r"(?:€|eur|\$|usd)\s?([\d.,]{2,7})", text, re.IGNORECASE)
-    if not match:
-        match = re.search(r"\b([\d]{2,5})(?:\s?(?:eur|usd))\b", text, re.IGNORECASE)
-    if match:
-        value = match.group(1).replace(",", "")
+async def _afetch_agentic_results(
+    query: str, num_results: int, summary: Optional[Dict[str, Any]]
+) -> List[Dict]:
+    if has_exa_credentials():
         try:
-            return float(value)
-        except ValueError:
-            return 0.0
-    return 0.0
+            exa_results = await aagentic_search(
+                query, num_results=num_results, summary=summary
+            )
+            normalized = _normalize_exa_results(exa_results)
+            if normalized:
+                return normalized
+        except ExaError:
+            pass
+    return await _asearch_with_tavily(query)
 
 
-def _price_from_string(value: Any) -> float:
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        return _extract_price(value)
-    return 0.0
+def _cached_agentic_results(
+    key: str, query: str, num_results: int, summary: Optional[Dict[str, Any]], kind: str
+) -> List[Dict]:
+    cache = get_search_cache()
+    if cache is not None:
+        cached = cache.get(key, kind)
+        if cached is not None:
+            return cached
+
+    def _fetch() -> List[Dict]:
+        results = _fetch_agentic_results(query, num_results, summary)
+        if cache is not None:
+            cache.set(key, results, kind)
+        return results
+
+    # Identical searches already in flight (e.g. other users planning the same
+    # week) are joined rather than repeated.
+    single_flight = get_single_flight()
+    if single_flight is None:
+        return _fetch()
+    return single_flight.get_or_fetch(key, _fetch)
+
+
+async def _acached_agentic_results(
+    key: str, query: str, num_results: int, summary: Optional[Dict[str, Any]], kind: str
+) -> List[Dict]:
+    # A disk tier (VP_SEARCH_CACHE_PATH) does blocking SQLite I/O, so cache
+    # reads and writes run in a worker thread rather than on the event loop.
+    cache = get_search_cache()
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key, kind)
+        if cached is not None:
+            return cached
+
+    async def _fetch() -> List[Dict]:
+        results = await _afetch_agentic_results(query, num_results, summary)
+        if cache is not None:
+            await asyncio.to_thread(cache.set, key, results, kind)
+        return results
+
+    single_flight = get_single_flight()
+    if single_flight is None:
+        return await _fetch()
+    return await single_flight.aget_or_fetch(key, _fetch)
 
 
-def _extract_rating(text: str) -> int:
-    match = re.search(r"(\d+(?:\.\d)?)\s*(?:[- ]?star|/5)", text, re.IGNORECASE)
-    if match:
-        try:
-            value = float(match.group(1))
-            return int(round(value))
-        except ValueError:
-            return 4
-    return 4
-
-
-def _board_type_from_text(text: str) -> str:
-    lowered = text.lower()
-    if "breakfast" in lowered:
-        return "Bed & Breakfast"
-    if "half board" in lowered:
-        return "Half Board"
-    if "full board" in lowered:
-        return "Full Board"
-    return "Room Only"
-
-
-def _infer_stop_count(text: str) -> int:
-    lowered = text.lower()
-    if any(token in lowered for token in ("nonstop", "non-stop", "direct flight")):
-        return 0
-    match = re.search(r"(\d+)\s*stop", lowered)
-    if match:
-        try:
-            return int(match.group(1))
-        except ValueError:
-            return 1
-    if "layover" in lowered:
-        return 1
-    return 1
+def _agentic_results(
+    query: str,
+    num_results: int = 8,
+    summary: Optional[Dict[str, Any]] = None,
+    kind: str = "general",
+) -> List[Dict]:
+    key = cache_key(query, num_results, summary)
+    memo = current_search_memo()
+    if memo is None:
+        return _cached_agentic_results(key, query, num_results, summary, kind)
+    return memo.get_or_fetch(
+        key, lambda: _cached_agentic_results(key, query, num_results, summary, kind)
+    )
 
 
-def _infer_duration_hours(text: str) -> Optional[int]:
-    match = re.search(r"(\d{1,2})\s*h", text.lower())
-    if match:
-        try:
-            return int(match.group(1))
-        except ValueError:
-            return None
-    return None
+async def _aagentic_results(
+    query: str,
+    num_results: int = 8,
+    summary: Optional[Dict[str, Any]] = None,
+    kind: str = "general",
+) -> List[Dict]:
+    key = cache_key(query, num_results, summary)
+    memo = current_search_memo()
+    if memo is None:
+        return await _acached_agentic_results(key, query, num_results, summary, kind)
+    return await memo.aget_or_fetch(
+        key, lambda: _acached_agentic_results(key, query, num_results, summary, kind)
+    )
+
+
+def _status_message(content: str):
+    from langchain_core.messages import AIMessage
+
+    return AIMessage(content=content)
 
 
 def _flight_summary_config(
@@ -424,7 +510,8 @@ def _hotel_summary_config(
 # ---------------------------------------------------------------------------
 
 
-def flight_researcher(state: VPAgentState) -> VPAgentState:
+def _flight_requests(state: VPAgentState) -> List[tuple[str, Dict[str, Any]]]:
+    """Return the (query, summary config) pairs for the outbound and return legs."""
     departure_city = state["departure_city"]
     first_dest = state["destinations"][0]
     last_dest = state["destinations"][-1]
@@ -439,112 +526,120 @@ def flight_researcher(state: VPAgentState) -> VPAgentState:
         f"best cheap flights {last_dest['city']} to {departure_city} "
         f"{end_date} nonstop or 1 stop booking"
     )
+    return [
+        (
+            outbound_query,
+            _flight_summary_config(departure_city, first_dest["city"], start_date),
+        ),
+        (
+            return_query,
+            _flight_summary_config(last_dest["city"], departure_city, end_date),
+        ),
+    ]
 
-    outbound_results = _agentic_results(
-        outbound_query,
-        num_results=8,
-        summary=_flight_summary_config(departure_city, first_dest["city"], start_date),
-    )
-    return_results = _agentic_results(
-        return_query,
-        num_results=8,
-        summary=_flight_summary_config(last_dest["city"], departure_city, end_date),
-    )
 
-    def _build_flights(results: List[Dict], target_date: str) -> List[FlightOption]:
-        candidates: List[tuple] = []
-        for result in results:
-            structured = _parse_structured_summary(result.get("structured_summary"))
-
-            rows: List[Dict[str, Any]] = []
-            if isinstance(structured, dict) and "flights" in structured:
-                maybe_list = structured["flights"]
-                if isinstance(maybe_list, list):
-                    rows = [row for row in maybe_list if isinstance(row, dict)]
-            elif isinstance(structured, list):
-                rows = [row for row in structured if isinstance(row, dict)]
-            else:
-                rows = []
-
-            if rows:
-                for row in rows:
-                    if not isinstance(row, dict):
-                        continue
-                    price = _price_from_string(
-                        row.get("price") or row.get("price_eur")
-                    )
-                    stops_value = row.get("stops")
-                    if isinstance(stops_value, (int, float)):
-                        stops = int(stops_value)
-                    elif isinstance(stops_value, str) and stops_value.isdigit():
-                        stops = int(stops_value)
-                    else:
-                        stops = 1
-                    duration_label = (
-                        row.get("duration")
-                        or row.get("flight_type")
-                        or row.get("cabin_class")
-                        or "See booking site"
-                    )
-                    option = FlightOption(
-                        airline=row.get("airline")
-                        or row.get("carrier")
-                        or "Flight option",
-                        flight_number=row.get("flight_number"),
-                        departure_time=row.get("departure_time")
-                        or row.get("departure_date")
-                        or target_date,
-                        arrival_time=row.get("arrival_time")
-                        or row.get("return_date")
-                        or target_date,
-                        duration=duration_label,
-                        stops=stops,
-                        price_eur=price,
-                        booking_url=row.get("booking_url", result.get("url", "")),
-                    )
-                    score = (stops, price or 9_999_999)
-                    candidates.append((score, option))
-                continue
-
-            text_blob = f"{result.get('title','')} {result.get('content','')}"
-            price = _extract_price(text_blob)
-            stops = _infer_stop_count(text_blob)
-            duration_hours = _infer_duration_hours(text_blob) or 99
-            duration_label = (
-                f"~{duration_hours}h travel time" if duration_hours != 99 else "See booking site"
-            )
-            option = FlightOption(
+def _build_flights(results: List[Dict], target_date: str) -> List[FlightOption]:
+    candidates: List[tuple] = []
+    for result in results:
+        structured = _parse_structured_summary(result.get("structured_summary"))
+
+        rows: List[Dict[str, Any]] = []
+        if isinstance(structured, dict) and "flights" in structured:
+            maybe_list = structured["flights"]
+            if isinstance(maybe_list, list):
+                rows = [row for row in maybe_list if isinstance(row, dict)]
+        elif isinstance(structured, list):
+            rows = [row for row in structured if isinstance(row, dict)]
+        else:
+            rows = []
+
+        if rows:
+            for row in rows:
+                if not isinstance(row, dict):
+                    continue
+                price = price_eur(row.get("price") or row.get("price_eur"))
+                stops_value = row.get("stops")
+                if isinstance(stops_value, (int, float)):
+                    stops = int(stops_value)
+                elif isinstance(stops_value, str) and stops_value.isdigit():
+                    stops = int(stops_value)
+                else:
+                    stops = 1
+                duration_label = (
+                    row.get("duration")
+                    or row.get("flight_type")
+                    or row.get("cabin_class")
+                    or "See booking site"
+                )
+                option = FlightOption(
+                    airline=row.get("airline")
+                    or row.get("carrier")
+                    or "Flight option",
+                    flight_number=row.get("flight_number"),
+                    departure_time=row.get("departure_time")
+                    or row.get("departure_date")
+                    or target_date,
+                    arrival_time=row.get("arrival_time")
+                    or row.get("return_date")
+                    or target_date,
+                    duration=duration_label,
+                    stops=stops,
+                    price_eur=price,
+                    booking_url=row.get("booking_url", result.get("url", "")),
+                )
+                score = (stops, price or 9_999_999)
+                candidates.append((score, option))
+            continue
+
+        facts = extract_facts(f"{result.get('title','')} {result.get('content','')}")
+        price = facts.price_eur
+        stops = facts.stops
+        duration_hours = facts.duration_hours or 99
+        duration_label = (
+            f"~{duration_hours}h travel time" if duration_hours != 99 else "See booking site"
+        )
+        option = FlightOption(
+            airline=result.get("title", "Flight option"),
+            flight_number=None,
+            departure_time=target_date,
+            arrival_time=target_date,
+            duration=duration_label,
+            stops=stops,
+            price_eur=price,
+            booking_url=result.get("url", ""),
+        )
+        score = (stops, duration_hours, price or 9_999_999)
+        candidates.append((score, option))
+    candidates.sort(key=lambda item: item[0])
+    ranked = [item[1] for item in candidates[:3]]
+    if ranked:
+        return ranked
+    fallback: List[FlightOption] = []
+    for result in results[:3]:
+        text_blob = f"{result.get('title','')} {result.get('content','')}"
+        fallback.append(
+            FlightOption(
                 airline=result.get("title", "Flight option"),
                 flight_number=None,
                 departure_time=target_date,
                 arrival_time=target_date,
-                duration=duration_label,
-                stops=stops,
-                price_eur=price,
+                duration="See booking site",
+                stops=1,
+                price_eur=price_eur(text_blob),
                 booking_url=result.get("url", ""),
             )
-            score = (stops, duration_hours, price or 9_999_999)
-            candidates.append((score, option))
-        candidates.sort(key=lambda item: item[0])
-        ranked = [item[1] for item in candidates[:3]]
-        if ranked:
-            return ranked
-        fallback: List[FlightOption] = []
-        for result in results[:3]:
-            text_blob = f"{result.get('title','')} {result.get('content','')}"
-            fallback.append(
-                FlightOption(
-                    airline=result.get("title", "Flight option"),
-                    flight_number=None,
-                    departure_time=target_date,
-                    arrival_time=target_date,
-                    duration="See booking site",
-                    stops=1,
-                    price_eur=_extract_price(text_blob),
-                    booking_url=result.get("url", ""),
-                )
-            )
-        return fallback
+        )
+    return fallback
+
+
+def _flight_update(
+    state: VPAgentState, outbound_results: List[Dict], return_results: List[Dict]
+) -> Dict[str, Any]:
+    departure_city = state["departure_city"]
+    first_dest = state["destinations"][0]
+    last_dest = state["destinations"][-1]
+    start_date = state["trip_start_date"]
+    end_date = state["trip_end_date"]
 
     outbound_flights = _build_flights(outbound_results, start_date)
     return_flights = _build_flights(return_results, end_date)
@@ -556,130 +651,237 @@ Prioritized shortest + cheapest options:
 - Return: {last_dest['city']} → {departure_city} on {end_date}
 """
     return {
-        **state,
         "outbound_flights": outbound_flights,
         "return_flights": return_flights,
         "current_step": "hotel_research",
-        "messages": state.get("messages", []) + [AIMessage(content=status_msg)],
+        "messages": [_status_message(status_msg)],
     }
 
 
-def hotel_researcher(state: VPAgentState) -> VPAgentState:
-    hotels_by_city: Dict[str, List[HotelOption]] = {}
-    theme = state.get("trip_theme") or ""
+def _flight_leg_timeout() -> float:
+    """Seconds each flight leg may take (VP_AGENT_FLIGHT_LEG_TIMEOUT, default 40)."""
+    try:
+        return max(0.0, float(os.getenv("VP_AGENT_FLIGHT_LEG_TIMEOUT", "40")))
+    except ValueError:
+        return 40.0
+
+
+def flight_researcher(state: VPAgentState) -> Dict[str, Any]:
+    from langchain_core.runnables.config import ContextThreadPoolExecutor
 
-    for dest in state["destinations"]:
-        query = (
-            f"well rated affordable hotels {dest['city']} {dest['country']} "
-            f"{dest['check_in']} {dest['nights']} nights booking {theme}"
+    requests = _flight_requests(state)
+    deadline = time.monotonic() + _flight_leg_timeout()
+    pool = ContextThreadPoolExecutor(max_workers=len(requests))
+    futures = [
+        pool.submit(
+            _agentic_results, query, num_results=8, summary=summary, kind="flights"
+        )
+        for query, summary in requests
+    ]
+    legs: List[List[Dict]] = []
+    try:
+        for (query, _), future in zip(requests, futures):
+            try:
+                legs.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                logger.warning("Flight search timed out; returning partial results: %s", query)
+                legs.append([])
+    finally:
+        # Do not wait for a timed-out leg; its thread finishes in the background.
+        pool.shutdown(wait=False, cancel_futures=True)
+    outbound_results, return_results = legs
+    return _flight_update(state, outbound_results, return_results)
+
+
+async def _aflight_leg(query: str, summary: Dict[str, Any], timeout: float) -> List[Dict]:
+    try:
+        return await asyncio.wait_for(
+            _aagentic_results(query, num_results=8, summary=summary, kind="flights"),
+            timeout,
         )
-        results = _agentic_results(
-            query,
-            num_results=8,
-            summary=_hotel_summary_config(
-                dest["city"], dest["country"], dest["check_in"], dest["check_out"]
-            ),
+    except asyncio.TimeoutError:
+        logger.warning("Flight search timed out; returning partial results: %s", query)
+        return []
+
+
+async def aflight_researcher(state: VPAgentState) -> Dict[str, Any]:
+    timeout = _flight_leg_timeout()
+    outbound_results, return_results = await asyncio.gather(
+        *(_aflight_leg(query, summary, timeout) for query, summary in _flight_requests(state))
+    )
+    return _flight_update(state, outbound_results, return_results)
+
+
+def _hotel_request(dest: DestinationInfo, theme: str) -> tuple[str, Dict[str, Any]]:
+    query = (
+        f"well rated affordable hotels {dest['city']} {dest['country']} "
+        f"{dest['check_in']} {dest['nights']} nights booking {theme}"
+    )
+    summary = _hotel_summary_config(
+        dest["city"], dest["country"], dest["check_in"], dest["check_out"]
+    )
+    return query, summary
+
+
+def _build_hotels(results: List[Dict], dest: DestinationInfo) -> List[HotelOption]:
+    candidates: List[tuple] = []
+    for result in results:
+        structured = _parse_structured_summary(result.get("structured_summary"))
+        rows: List[Dict[str, Any]] = []
+        if isinstance(structured, dict) and "hotels" in structured:
+            rows = [row for row in structured["hotels"] if isinstance(row, dict)]
+        elif isinstance(structured, list):
+            rows = [row for row in structured if isinstance(row, dict)]
+
+        if rows:
+            for row in rows:
+                nightly = price_eur(row.get("nightly_rate") or row.get("price"))
+                rating_text = (
+                    row.get("star_rating")
+                    or row.get("rating")
+                    or row.get("guest_rating")
+                    or ""
+                )
+                rating = extract_rating(rating_text)
+                entry = HotelOption(
+                    name=row.get("name", f"Hotel in {dest['city']}"),
+                    address=row.get("neighborhood_or_location", dest["city"]),
+                    star_rating=rating,
+                    nightly_rate_eur=nightly,
+                    total_cost_eur=nightly * dest["nights"]
+                    if nightly
+                    else 0.0,
+                    board_type=row.get("key_features", ""),
+                    guest_rating=None,
+                    booking_url=row.get("booking_url", result.get("url", "")),
+                )
+                score = (nightly or 9_999_999, -rating)
+                candidates.append((score, entry))
+            continue
+
+        facts = extract_facts(f"{result.get('title','')} {result.get('content','')}")
+        nightly = facts.price_eur
+        rating = facts.star_rating
+        if rating < 3:
+            continue
+        entry = HotelOption(
+            name=result.get("title", f"Hotel in {dest['city']}"),
+            address=dest["city"],
+            star_rating=rating,
+            nightly_rate_eur=nightly,
+            total_cost_eur=nightly * dest["nights"] if nightly else 0.0,
+            board_type=facts.board_type,
+            guest_rating=None,
+            booking_url=result.get("url", ""),
         )
-        candidates: List[tuple] = []
-        for result in results:
-            structured = _parse_structured_summary(result.get("structured_summary"))
-            rows: List[Dict[str, Any]] = []
-            if isinstance(structured, dict) and "hotels" in structured:
-                rows = [row for row in structured["hotels"] if isinstance(row, dict)]
-            elif isinstance(structured, list):
-                rows = [row for row in structured if isinstance(row, dict)]
-
-            if rows:
-                for row in rows:
-                    nightly = _price_from_string(
-                        row.get("nightly_rate") or row.get("price")
-                    )
-                    rating_text = (
-                        row.get("star_rating")
-                        or row.get("rating")
-                        or row.get("guest_rating")
-                        or ""
-                    )
-                    rating = _extract_rating(rating_text)
-                    entry = HotelOption(
-                        name=row.get("name", f"Hotel in {dest['city']}"),
-                        address=row.get("neighborhood_or_location", dest["city"]),
-                        star_rating=rating,
-                        nightly_rate_eur=nightly,
-                        total_cost_eur=nightly * dest["nights"]
-                        if nightly
-                        else 0.0,
-                        board_type=row.get("key_features", ""),
-                        guest_rating=None,
-                        booking_url=row.get("booking_url", result.get("url", "")),
-                    )
-                    score = (nightly or 9_999_999, -rating)
-                    candidates.append((score, entry))
-                continue
-
-            text_blob = f"{result.get('title','')} {result.get('content','')}"
-            nightly = _extract_price(text_blob)
-            rating = _extract_rating(text_blob)
-            if rating < 3:
-                continue
-            entry = HotelOption(
-                name=result.get("title", f"Hotel in {dest['city']}"),
-                address=dest["city"],
-                star_rating=rating,
-                nightly_rate_eur=nightly,
-                total_cost_eur=nightly * dest["nights"] if nightly else 0.0,
-                board_type=_board_type_from_text(text_blob),
-                guest_rating=None,
-                booking_url=result.get("url", ""),
-            )
-            score = (nightly or 9_999_999, -rating)
-            candidates.append((score, entry))
-        candidates.sort(key=lambda item: item[0])
-        ranked = [item[1] for item in candidates[:2]]
-        if not ranked:
-            fallback: List[HotelOption] = []
-            for result in results[:2]:
-                text_blob = f"{result.get('title','')} {result.get('content','')}"
-                nightly = _extract_price(text_blob)
-                fallback.append(
-                    HotelOption(
-                        name=result.get("title", f"Hotel in {dest['city']}"),
-                        address=dest["city"],
-                        star_rating=_extract_rating(text_blob),
-                        nightly_rate_eur=nightly,
-                        total_cost_eur=nightly * dest["nights"] if nightly else 0.0,
-                        board_type=_board_type_from_text(text_blob),
-                        guest_rating=None,
-                        booking_url=result.get("url", ""),
-                    )
+        score = (nightly or 9_999_999, -rating)
+        candidates.append((score, entry))
+    candidates.sort(key=lambda item: item[0])
+    ranked = [item[1] for item in candidates[:2]]
+    if not ranked:
+        fallback: List[HotelOption] = []
+        for result in results[:2]:
+            facts = extract_facts(f"{result.get('title','')} {result.get('content','')}")
+            nightly = facts.price_eur
+            fallback.append(
+                HotelOption(
+                    name=result.get("title", f"Hotel in {dest['city']}"),
+                    address=dest["city"],
+                    star_rating=facts.star_rating,
+                    nightly_rate_eur=nightly,
+                    total_cost_eur=nightly * dest["nights"] if nightly else 0.0,
+                    board_type=facts.board_type,
+                    guest_rating=None,
+                    booking_url=result.get("url", ""),
                 )
-            ranked = fallback
-        hotels_by_city[dest["city"]] = ranked
+            )
+        ranked = fallback
+    return ranked
+
 
+def _hotel_update(hotels_by_city: Dict[str, List[HotelOption]]) -> Dict[str, Any]:
     msg = f"🏨 **Hotel Research Complete** for {', '.join(hotels_by_city.keys())}"
     return {
-        **state,
         "hotels_by_city": hotels_by_city,
         "current_step": "insurance_research",
-        "messages": state.get("messages", []) + [AIMessage(content=msg)],
+        "messages": [_status_message(msg)],
     }
 
 
-def insurance_researcher(state: VPAgentState) -> VPAgentState:
+def _hotel_concurrency() -> int:
+    """Max simultaneous per-city searches (VP_AGENT_HOTEL_CONCURRENCY, default 4)."""
+    try:
+        return max(1, int(os.getenv("VP_AGENT_HOTEL_CONCURRENCY", "4")))
+    except ValueError:
+        return 4
+
+
+def _search_hotels_for(dest: DestinationInfo, theme: str) -> List[HotelOption]:
+    query, summary = _hotel_request(dest, theme)
+    results = _agentic_results(query, num_results=8, summary=summary, kind="hotels")
+    return _build_hotels(results, dest)
+
+
+async def _asearch_hotels_for(
+    dest: DestinationInfo, theme: str, limit: asyncio.Semaphore
+) -> List[HotelOption]:
+    query, summary = _hotel_request(dest, theme)
+    async with limit:
+        results = await _aagentic_results(
+            query, num_results=8, summary=summary, kind="hotels"
+        )
+    return _build_hotels(results, dest)
+
+
+def hotel_researcher(state: VPAgentState) -> Dict[str, Any]:
+    from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+    destinations = state["destinations"]
+    theme = state.get("trip_theme") or ""
+
+    workers = min(_hotel_concurrency(), len(destinations)) or 1
+    with ContextThreadPoolExecutor(max_workers=workers) as pool:
+        # ``map`` yields in submission order, keeping hotels_by_city in trip order.
+        ranked = list(
+            pool.map(_search_hotels_for, destinations, [theme] * len(destinations))
+        )
+    hotels_by_city: Dict[str, List[HotelOption]] = {}
+    for dest, hotels in zip(destinations, ranked):
+        hotels_by_city[dest["city"]] = hotels
+    return _hotel_update(hotels_by_city)
+
+
+async def ahotel_researcher(state: VPAgentState) -> Dict[str, Any]:
+    destinations = state["destinations"]
+    theme = state.get("trip_theme") or ""
+
+    limit = asyncio.Semaphore(_hotel_concurrency())
+    ranked = await asyncio.gather(
+        *(_asearch_hotels_for(dest, theme, limit) for dest in destinations)
+    )
+    hotels_by_city: Dict[str, List[HotelOption]] = {}
+    for dest, hotels in zip(destinations, ranked):
+        hotels_by_city[dest["city"]] = hotels
+    return _hotel_update(hotels_by_city)
+
+
+def _insurance_query(state: VPAgentState) -> str:
     traveler_country = state["travelers"][0]["residence_country"]
     trip_duration = state["total_nights"]
-    query = (
+    return (
         f"Schengen visa travel insurance {traveler_country} Europe "
         f"{trip_duration} days €30000 coverage"
     )
-    results = _agentic_results(query, num_results=6)
+
+
+def _insurance_update(results: List[Dict]) -> Dict[str, Any]:
     insurance_options: List[InsuranceOption] = []
     for result in results[:3]:
         insurance_options.append(
             InsuranceOption(
                 provider=result.get("title", "Insurance Provider"),
                 coverage_eur=30000,
-                price_per_person_eur=_extract_price(str(result.get("content", ""))),
+                price_per_person_eur=price_eur(str(result.get("content", ""))),
                 features=[
                     "Medical coverage",
                     "Trip cancellation",
@@ -690,14 +892,26 @@ def insurance_researcher(state: VPAgentState) -> VPAgentState:
         )
     msg = "🛡️ **Insurance Research Complete** – Identified compliant plans."
     return {
-        **state,
         "insurance_options": insurance_options,
         "current_step": "document_generation",
-        "messages": state.get("messages", []) + [AIMessage(content=msg)],
+        "messages": [_status_message(msg)],
     }
 
 
-def itinerary_writer(state: VPAgentState) -> VPAgentState:
+def insurance_researcher(state: VPAgentState) -> Dict[str, Any]:
+    results = _agentic_results(_insurance_query(state), num_results=6, kind="insurance")
+    return _insurance_update(results)
+
+
+async def ainsurance_researcher(state: VPAgentState) -> Dict[str, Any]:
+    results = await _aagentic_results(
+        _insurance_query(state), num_results=6, kind="insurance"
+    )
+    return _insurance_update(results)
+
+
+def _writer_prompts(state: VPAgentState) -> tuple[str, str]:
+    """Return the cover letter and itinerary prompts for the document writer."""
     travelers = state["travelers"]
     traveler_names = ", ".join(t["name"] for t in travelers)
     nationality = travelers[0]["nationality"]
@@ -731,8 +945,6 @@ Formatting rules:
 - Conclude with traveler names only—no signature/contact sections for now.
 - Core sections: greeting, visit purpose, itinerary highlights, funding/ties to home, closing request.
 """
-    cover_letter = LLM.invoke([HumanMessage(content=cover_prompt)]).content
-
     itinerary_prompt = f"""
 Generate a day-by-day itinerary table in Markdown with columns Date | Location | Planned Activities.
 Trip Theme: {state.get('trip_theme', 'Culture & History')}
@@ -741,19 +953,142 @@ Dates and destinations:
 
 Include flights on arrival/departure days, use real attractions, keep activities concise.
 """
-    itinerary_table = LLM.invoke([HumanMessage(content=itinerary_prompt)]).content
+    return cover_prompt, itinerary_prompt
+
+
+# One entry per document the writer produces: (state key, LLM call tag, label).
+WRITER_DOCUMENTS = (
+    ("cover_letter", "cover_letter", "Cover letter"),
+    ("itinerary_table", "itinerary", "Itinerary"),
+)
+
+
+def _writer_batch(state: VPAgentState):
+    """Return the batched LLM inputs and per-call configs for the document writer."""
+    from langchain_core.messages import HumanMessage
+
+    prompts = _writer_prompts(state)
+    inputs = [[HumanMessage(content=prompt)] for prompt in prompts]
+    configs = [{"tags": [tag]} for _, tag, _ in WRITER_DOCUMENTS]
+    return inputs, configs
+
+
+def _written_documents(state: VPAgentState) -> List[Any]:
+    """Documents an earlier attempt already wrote; None where one is still missing."""
+    from langchain_core.messages import AIMessage
+
+    return [
+        AIMessage(content=state[key]) if state.get(key) else None for key, _, _ in WRITER_DOCUMENTS
+    ]
+
+
+def _writer_update(outputs: List[Any]) -> Dict[str, Any]:
+    """Fold batch outputs into state, keeping whichever documents succeeded."""
+    update: Dict[str, Any] = {}
+    failures: List[str] = []
+    for (key, _, label), output in zip(WRITER_DOCUMENTS, outputs):
+        if isinstance(output, Exception):
+            logger.warning("%s generation failed: %s", label, output)
+            failures.append(f"{label} generation failed: {output}")
+            update[key] = ""
+        else:
+            update[key] = output.content
+    if len(failures) == len(outputs):
+        raise next(output for output in outputs if isinstance(output, Exception))
 
     msg = "📄 **Documentation Generated** (cover letter + itinerary)."
-    return {
-        **state,
-        "cover_letter": cover_letter,
-        "itinerary_table": itinerary_table,
-        "current_step": "preview",
-        "messages": state.get("messages", []) + [AIMessage(content=msg)],
-    }
+    if failures:
+        msg = "📄 **Documentation Partially Generated** – " + "; ".join(failures)
+    update.update(
+        {
+            "current_step": "preview",
+            "error": "; ".join(failures) or None,
+            "messages": [_status_message(msg)],
+        }
+    )
+    return update
 
 
-def preview_generator(state: VPAgentState) -> VPAgentState:
+def _llm_identity(llm: Any) -> Optional[Tuple[str, Optional[float]]]:
+    """Return (model, temperature) for cache keys, or None if the model is unnamed."""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+    if not isinstance(model, str):
+        return None
+    temperature = getattr(llm, "temperature", None)
+    return model, temperature if isinstance(temperature, (int, float)) else None
+
+
+def _writer_cached(llm: Any, inputs: List[Any]) -> Tuple[List[Optional[str]], List[Any]]:
+    """Return per-document cache keys and cached outputs (None where a call is needed)."""
+    from langchain_core.messages import AIMessage
+
+    cache = get_llm_cache()
+    identity = _llm_identity(llm)
+    if cache is None or identity is None:
+        return [None] * len(inputs), [None] * len(inputs)
+    keys: List[Optional[str]] = [
+        llm_cache_key(*identity, messages[0].content) for messages in inputs
+    ]
+    if llm_cache_bypassed():
+        return keys, [None] * len(inputs)
+    texts = [cache.get(key) for key in keys]
+    return keys, [AIMessage(content=text) if text is not None else None for text in texts]
+
+
+def _writer_store(llm: Any, keys: List[Optional[str]], missing: List[int], outputs: List[Any]) -> None:
+    """Cache the freshly generated documents; failures and empty replies are skipped."""
+    cache = get_llm_cache()
+    identity = _llm_identity(llm)
+    if cache is None or identity is None:
+        return
+    for i in missing:
+        content = getattr(outputs[i], "content", None)
+        if keys[i] and isinstance(content, str) and content:
+            cache.set(keys[i], identity[0], content)
+
+
+def itinerary_writer(state: VPAgentState) -> Dict[str, Any]:
+    # The two prompts are independent, so the chat model's batch API runs them
+    # concurrently; return_exceptions keeps one failure from losing the other.
+    # Documents already in state (a resumed run) or in the LLM cache (a
+    # resubmitted trip) skip the call.
+    inputs, configs = _writer_batch(state)
+    llm = get_llm()
+    keys, cached = _writer_cached(llm, inputs)
+    outputs = [written or hit for written, hit in zip(_written_documents(state), cached)]
+    missing = [i for i, output in enumerate(outputs) if output is None]
+    if missing:
+        fresh = llm.batch(
+            [inputs[i] for i in missing],
+            config=[configs[i] for i in missing],
+            return_exceptions=True,
+        )
+        for i, output in zip(missing, fresh):
+            outputs[i] = output
+        _writer_store(llm, keys, missing, outputs)
+    return _writer_update(outputs)
+
+
+async def aitinerary_writer(state: VPAgentState) -> Dict[str, Any]:
+    # The cache is SQLite (possibly on disk), so its reads and writes run off the loop.
+    inputs, configs = _writer_batch(state)
+    llm = get_llm()
+    keys, cached = await asyncio.to_thread(_writer_cached, llm, inputs)
+    outputs = [written or hit for written, hit in zip(_written_documents(state), cached)]
+    missing = [i for i, output in enumerate(outputs) if output is None]
+    if missing:
+        fresh = await llm.abatch(
+            [inputs[i] for i in missing],
+            config=[configs[i] for i in missing],
+            return_exceptions=True,
+        )
+        for i, output in zip(missing, fresh):
+            outputs[i] = output
+        await asyncio.to_thread(_writer_store, llm, keys, missing, outputs)
+    return _writer_update(outputs)
+
+
+def preview_generator(state: VPAgentState) -> Dict[str, Any]:
     travelers = ", ".join(t["name"] for t in state["travelers"])
     flights_section = "### ✈️ Flights\n"
     flights_section += "\n".join(
@@ -798,22 +1133,20 @@ def preview_generator(state: VPAgentState) -> VPAgentState:
 """
     msg = "👀 Preview generated."
     return {
-        **state,
         "preview_markdown": preview,
         "current_step": "final_output",
-        "messages": state.get("messages", []) + [AIMessage(content=msg)],
+        "messages": [_status_message(msg)],
     }
 
 
-def final_output(state: VPAgentState) -> VPAgentState:
+def final_output(state: VPAgentState) -> Dict[str, Any]:
     completion_msg = (
         "✅ Visa Pack Approved – download cover letter + itinerary from this response."
     )
     return {
-        **state,
         "is_complete": True,
         "current_step": "complete",
-        "messages": state.get("messages", []) + [AIMessage(content=completion_msg)],
+        "messages": [_status_message(completion_msg)],
     }
 
 
@@ -822,29 +1155,70 @@ def final_output(state: VPAgentState) -> VPAgentState:
 # ---------------------------------------------------------------------------
 
 
-def _build_graph():
+RESEARCH_NODES = ("flight_research", "hotel_research", "insurance_research")
+
+
+def _research_mode() -> str:
+    """Return ``parallel`` (default) or ``sequential`` from VP_AGENT_RESEARCH_MODE."""
+    mode = os.getenv("VP_AGENT_RESEARCH_MODE", "parallel").strip().lower()
+    if mode not in {"parallel", "sequential"}:
+        raise ValueError(
+            f"Unknown VP_AGENT_RESEARCH_MODE '{mode}'. Use 'parallel' or 'sequential'."
+        )
+    return mode
+
+
+def _build_graph(mode: str = "parallel"):
+    from langchain_core.runnables import RunnableLambda
+    from langgraph.graph import END, START, StateGraph
+
+    from vp_generator.checkpoints import get_checkpointer
+
+    def _node(name: str, func, afunc=None):
+        # I/O-bound nodes carry an async twin so ``ainvoke`` never blocks the loop.
+        if afunc is None:
+            return instrument_node(name, func)
+        return RunnableLambda(instrument_node(name, func), afunc=instrument_node(name, afunc))
+
     workflow = StateGraph(VPAgentState)
-    workflow.add_node("flight_research", flight_researcher)
-    workflow.add_node("hotel_research", hotel_researcher)
-    workflow.add_node("insurance_research", insurance_researcher)
-    workflow.add_node("document_generation", itinerary_writer)
-    workflow.add_node("preview", preview_generator)
-    workflow.add_node("final_output", final_output)
-
-    workflow.set_entry_point("flight_research")
-    workflow.add_edge("flight_research", "hotel_research")
-    workflow.add_edge("hotel_research", "insurance_research")
-    workflow.add_edge("insurance_research", "document_generation")
+    workflow.add_node("flight_research", _node("flight_research", flight_researcher, aflight_researcher))
+    workflow.add_node("hotel_research", _node("hotel_research", hotel_researcher, ahotel_researcher))
+    workflow.add_node(
+        "insurance_research",
+        _node("insurance_research", insurance_researcher, ainsurance_researcher),
+    )
+    workflow.add_node(
+        "document_generation", _node("document_generation", itinerary_writer, aitinerary_writer)
+    )
+    workflow.add_node("preview", _node("preview", preview_generator))
+    workflow.add_node("final_output", _node("final_output", final_output))
+
+    if mode == "sequential":
+        workflow.add_edge(START, "flight_research")
+        workflow.add_edge("flight_research", "hotel_research")
+        workflow.add_edge("hotel_research", "insurance_research")
+        workflow.add_edge("insurance_research", "document_generation")
+    else:
+        # The research nodes read disjoint inputs and write disjoint keys, so
+        # they fan out from START and join before document generation.
+        for node in RESEARCH_NODES:
+            workflow.add_edge(START, node)
+        workflow.add_edge(list(RESEARCH_NODES), "document_generation")
     workflow.add_edge("document_generation", "preview")
     workflow.add_edge("preview", "final_output")
     workflow.add_edge("final_output", END)
-    memory = MemorySaver()
-    return workflow.compile(checkpointer=memory)
+    # A bounded saver (see vp_generator.checkpoints): each request has its own
+    # thread, so an unbounded MemorySaver would grow with traffic.
+    return workflow.compile(checkpointer=get_checkpointer())
 
 
-@lru_cache(maxsize=1)
-def get_vpagent_app():
-    return _build_graph()
+@lru_cache(maxsize=2)
+def _compiled_app(mode: str):
+    return _build_graph(mode)
+
+
+def get_vpagent_app(mode: Optional[str] = None):
+    return _compiled_app(mode or _research_mode())
 
 
 def build_initial_state(payload: Dict) -> VPAgentState:
@@ -897,14 +1271,195 @@ def build_initial_state(payload: Dict) -> VPAgentState:
     }
 
 
+def _run_config(thread_id: Optional[str]) -> Dict[str, Any]:
+    # A call without a thread gets a fresh one: the state reducers would
+    # otherwise merge its hotels and messages into the previous run's.
+    # The callback is inherited by every LLM call inside the graph.
+    return {
+        "configurable": {"thread_id": thread_id or f"vpagent-{uuid4()}"},
+        "callbacks": [llm_callback_handler()],
+    }
+
+
 def run_vpagent(payload: Dict, *, thread_id: Optional[str] = None) -> VPAgentState:
     initial_state = build_initial_state(payload)
     app = get_vpagent_app()
-    config = {"configurable": {"thread_id": thread_id or "vpagent-run"}}
+    config = _run_config(thread_id)
     final_state: VPAgentState = app.invoke(initial_state, config=config)
     return final_state
 
 
+async def arun_vpagent(
+    payload: Dict, *, thread_id: Optional[str] = None
+) -> VPAgentState:
+    """Async variant of :func:`run_vpagent` that awaits every network call."""
+    initial_state = build_initial_state(payload)
+    app = get_vpagent_app()
+    config = _run_config(thread_id)
+    final_state: VPAgentState = await app.ainvoke(initial_state, config=config)
+    return final_state
+
+
+class RunNotFoundError(LookupError):
+    """No checkpoint exists for the thread a caller asked to resume."""
+
+
+def _resume_input(snapshot: Any) -> Any:
+    """Graph input that continues ``snapshot``: None resumes from the checkpoint."""
+    from langgraph.types import Command
+
+    if snapshot.next:
+        return None
+    # The run finished with a document missing: write just that one again.
+    return Command(goto="document_generation")
+
+
+def _run_finished(snapshot: Any) -> bool:
+    values = snapshot.values
+    return not snapshot.next and all(values.get(key) for key, _, _ in WRITER_DOCUMENTS)
+
+
+def resume_vpagent(thread_id: str) -> VPAgentState:
+    """Continue a failed or interrupted run from its last checkpoint.
+
+    Nodes that already finished are not run again, so a retry after an LLM
+    error in ``document_generation`` repeats no searches. Research nodes that
+    finished before a sibling failed are kept too; ones the failure cancelled
+    mid-search are rerun. A run that completed with a document missing (one of
+    the two LLM calls failed) reruns the writer for that document only; any
+    other completed run is returned unchanged.
+    """
+    app = get_vpagent_app()
+    config = _run_config(thread_id)
+    snapshot = app.get_state(config)
+    if not snapshot.values:
+        raise RunNotFoundError(f"No run found for thread '{thread_id}'.")
+    if _run_finished(snapshot):
+        return snapshot.values
+    final_state: VPAgentState = app.invoke(_resume_input(snapshot), config=config)
+    return final_state
+
+
+async def aresume_vpagent(thread_id: str) -> VPAgentState:
+    """Async variant of :func:`resume_vpagent`."""
+    app = get_vpagent_app()
+    config = _run_config(thread_id)
+    snapshot = await app.aget_state(config)
+    if not snapshot.values:
+        raise RunNotFoundError(f"No run found for thread '{thread_id}'.")
+    if _run_finished(snapshot):
+        return snapshot.values
+    final_state: VPAgentState = await app.ainvoke(_resume_input(snapshot), config=config)
+    return final_state
+
+
+def _batch_concurrency() -> int:
+    """Packs generated at once per batch (VP_AGENT_BATCH_CONCURRENCY, default 4)."""
+    try:
+        return max(1, int(os.getenv("VP_AGENT_BATCH_CONCURRENCY", "4")))
+    except ValueError:
+        return 4
+
+
+def batch_group_key(payload: Dict) -> Tuple:
+    """Packs with the same key share their flight and hotel searches."""
+    return (
+        str(payload.get("departure_city", "")).strip().lower(),
+        payload.get("trip_start_date"),
+        tuple(
+            (str(dest.get("city", "")).strip().lower(), dest.get("nights"))
+            for dest in payload.get("destinations") or ()
+        ),
+    )
+
+
+async def arun_vpagent_batch(
+    payloads: List[Dict],
+    *,
+    concurrency: Optional[int] = None,
+    thread_prefix: str = "vpbatch",
+) -> Tuple[List[Any], Dict[str, int]]:
+    """Run many packs with bounded concurrency, running each distinct search once.
+
+    Packs are started group by group (see :func:`batch_group_key`) so that the
+    ones sharing searches run side by side, with at most ``concurrency`` in
+    flight. Returns one entry per payload in input order, either the final
+    state or the exception that pack raised, plus search-sharing stats.
+    Pack ``i`` runs on thread ``f"{thread_prefix}-{i}"``, so a failed pack can
+    be resumed with :func:`aresume_vpagent`.
+    """
+    limit = asyncio.Semaphore(concurrency or _batch_concurrency())
+    groups: Dict[Tuple, List[int]] = {}
+    for index, payload in enumerate(payloads):
+        groups.setdefault(batch_group_key(payload), []).append(index)
+    outcomes: List[Any] = [None] * len(payloads)
+
+    async def _run(index: int) -> None:
+        async with limit:
+            try:
+                outcomes[index] = await arun_vpagent(
+                    payloads[index], thread_id=f"{thread_prefix}-{index}"
+                )
+            except Exception as exc:  # noqa: BLE001 - reported per item
+                outcomes[index] = exc
+
+    with search_memo() as memo:
+        await asyncio.gather(*(_run(index) for members in groups.values() for index in members))
+    return outcomes, {"groups": len(groups), **memo.stats()}
+
+
+# Node name -> (SSE event, state keys streamed once the node finishes).
+STREAM_SECTIONS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "flight_research": ("flights", ("outbound_flights", "return_flights")),
+    "hotel_research": ("hotels", ("hotels_by_city",)),
+    "insurance_research": ("insurance", ("insurance_options",)),
+    "document_generation": ("documents", ("cover_letter", "itinerary_table")),
+    "preview": ("preview", ("preview_markdown",)),
+}
+# LLM call tag -> SSE event carrying its streamed tokens.
+TOKEN_EVENTS = {"cover_letter": "cover_letter_token", "itinerary": "itinerary_token"}
+
+
+def _chunk_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):  # Anthropic-style content blocks
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return ""
+
+
+async def astream_vpagent(
+    payload: Dict, *, thread_id: Optional[str] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(event, data)`` pairs as the graph runs, ending with ``complete``.
+
+    Research sections are emitted as each node finishes; cover letter and
+    itinerary tokens are emitted while the LLM generates them.
+    """
+    initial_state = build_initial_state(payload)
+    app = get_vpagent_app()
+    config = _run_config(thread_id)
+    async for mode, chunk in app.astream(
+        initial_state, config=config, stream_mode=["updates", "messages"]
+    ):
+        if mode == "messages":
+            message, metadata = chunk
+            text = _chunk_text(message.content)
+            for tag in metadata.get("tags") or ():
+                if tag in TOKEN_EVENTS and text:
+                    yield TOKEN_EVENTS[tag], {"content": text}
+            continue
+        for node, update in chunk.items():
+            if node in STREAM_SECTIONS and update:
+                event, keys = STREAM_SECTIONS[node]
+                yield event, {key: update[key] for key in keys if key in update}
+    snapshot = await app.aget_state(config)
+    yield "complete", summarize_response(snapshot.values)
+
+
 def summarize_response(state: VPAgentState) -> Dict[str, object]:
     return {
         "trip_start_date": state["trip_start_date"],
@@ -920,4 +1475,5 @@ def summarize_response(state: VPAgentState) -> Dict[str, object]:
         "cover_letter": state.get("cover_letter", ""),
         "itinerary_table": state.get("itinerary_table", ""),
         "preview_markdown": state.get("preview_markdown", ""),
+        "error": state.get("error"),
     }
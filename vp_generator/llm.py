@@ -1,33 +1,73 @@
 """OpenAI client helpers."""
 
-from typing import Optional
-
-from openai import OpenAI
+import time
+from typing import TYPE_CHECKING, Any, Optional
 
 from .config import get_settings
+from .instrumentation import record_llm_call
+from .llm_cache import get_llm_cache, llm_cache_bypassed, llm_cache_key
+
+if TYPE_CHECKING:  # the SDK is imported on first use to keep start-up fast
+    from openai import OpenAI
 
 
-_client: Optional[OpenAI] = None
+_client: Optional["OpenAI"] = None
 
 
-def get_client() -> OpenAI:
+def get_client() -> "OpenAI":
     """Provide a singleton OpenAI client."""
 
     global _client
     if _client is None:
+        from openai import OpenAI
+
         settings = get_settings()
         _client = OpenAI(api_key=settings.openai_api_key)
     return _client
 
 
 def llm_call(prompt: str, model: Optional[str] = None, max_output_tokens: Optional[int] = None) -> str:
-    """Call the Responses API with sane defaults."""
+    """Call the Responses API with sane defaults; repeated prompts come from the LLM cache."""
 
     settings = get_settings()
+    model = model or settings.openai_model
+    max_output_tokens = max_output_tokens or settings.max_output_tokens
+    cache = get_llm_cache()
+    key = llm_cache_key(model, None, prompt, max_output_tokens=max_output_tokens)
+    if cache is not None and not llm_cache_bypassed():
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    response = create_response(model=model, input=prompt, max_output_tokens=max_output_tokens)
+    text = response.output[0].content[0].text.strip()
+    if cache is not None and text:
+        cache.set(key, model, text)
+    return text
+
+
+def create_response(*, model: str, **kwargs: Any) -> Any:
+    """``client.responses.create`` with its latency, tokens and errors recorded."""
+
     client = get_client()
-    response = client.responses.create(
-        model=model or settings.openai_model,
-        input=prompt,
-        max_output_tokens=max_output_tokens or settings.max_output_tokens,
+    started = time.perf_counter()
+    try:
+        response = client.responses.create(model=model, **kwargs)
+    except Exception:
+        record_llm_call(model, time.perf_counter() - started, provider="openai", status="error")
+        raise
+    record_usage(model, response, time.perf_counter() - started)
+    return response
+
+
+def record_usage(model: str, response: Any, seconds: float) -> None:
+    """Feed a Responses API call's latency and token usage into the LLM metrics."""
+
+    usage = getattr(response, "usage", None)
+    record_llm_call(
+        model,
+        seconds,
+        provider="openai",
+        input_tokens=getattr(usage, "input_tokens", None),
+        output_tokens=getattr(usage, "output_tokens", None),
     )
-    return response.output[0].content[0].text.strip()
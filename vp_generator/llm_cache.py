@@ -0,0 +1,166 @@
+"""Cache for LLM-written documents (cover letters and itinerary tables).
+
+Given the same model settings, a document depends only on its prompt. A user
+who resubmits the same trip (e.g. after a page refresh) therefore gets the
+earlier text back without a model call. Entries are keyed on the model,
+temperature and prompt; runs of whitespace in the prompt are collapsed first,
+so indentation does not change the key. They are stored in SQLite, on disk when
+``VP_LLM_CACHE_PATH`` is set and in process memory otherwise. The in-memory
+default is per worker and does not survive a restart; set the path to share
+hits across workers and restarts. Once the stored text exceeds
+``VP_LLM_CACHE_MAX_MB``, the least recently used entries are evicted.
+
+:func:`bypass_llm_cache` skips lookups for one request (the API's
+``?regenerate=true``); the regenerated text then replaces the cached one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split())
+
+
+def llm_cache_key(model: str, temperature: Optional[float], prompt: str, **params: Any) -> str:
+    """Key for one completion; ``params`` holds any other setting that shapes the output."""
+
+    raw = json.dumps(
+        [model, temperature, normalize_prompt(prompt), params], sort_keys=True, default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite store of completions, bounded by total text size (LRU eviction)."""
+
+    def __init__(self, path: str = ":memory:", max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key)
+                )
+            self._counters["hits"] += 1
+        return row[0]
+
+    def set(self, key: str, model: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, size, time.time()),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        # Totals are read from the table, so workers sharing one file agree.
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM llm_cache ORDER BY last_used LIMIT 16"
+            ).fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                total -= size
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+            return {**self._counters, "entries": entries, "bytes": size}
+
+
+_bypass: ContextVar[bool] = ContextVar("vp_llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache(enabled: bool = True) -> Iterator[None]:
+    """Within the block (and tasks it starts), regenerate instead of reading the cache."""
+
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def llm_cache_bypassed() -> bool:
+    return _bypass.get()
+
+
+_UNSET = object()
+_cache: object = _UNSET
+
+
+def _build_from_env() -> Optional[LLMCache]:
+    if os.getenv("VP_LLM_CACHE_ENABLED", "true").lower() in {"0", "false", "no", "off"}:
+        return None
+    try:
+        max_mb = float(os.getenv("VP_LLM_CACHE_MAX_MB", "64"))
+    except ValueError:
+        max_mb = 64.0
+    return LLMCache(os.getenv("VP_LLM_CACHE_PATH") or ":memory:", int(max_mb * 1024 * 1024))
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide cache, built from VP_LLM_CACHE_* on first use.
+
+    ``None`` means caching is disabled (VP_LLM_CACHE_ENABLED=false).
+    """
+
+    global _cache
+    if _cache is _UNSET:
+        _cache = _build_from_env()
+    return _cache  # type: ignore[return-value]
+
+
+def set_llm_cache(cache: Optional[LLMCache]) -> None:
+    """Install a custom cache, or ``None`` to disable caching."""
+
+    global _cache
+    _cache = cache
@@ -0,0 +1,331 @@
+"""Prometheus metrics served on ``GET /metrics``.
+
+This module owns every metric family, all under the ``vp_`` prefix. Each
+latency is recorded once: provider calls by :func:`provider_call` (wrapped
+around every request by ``circuit_breaker.protect``), LLM calls by
+:func:`observe_llm_call` and graph nodes by :func:`observe_node`.
+:mod:`vp_generator.instrumentation` adds spans and per-run timings on top and
+calls into these helpers for the Prometheus side.
+
+Everything here stays on in production, so the hot path does as little as
+possible:
+
+* Labelled children are bound once per label set and cached (:class:`BoundChildren`).
+  A request does not rebuild label sets.
+* Search cache and circuit breaker figures are read only when Prometheus
+  scrapes, by a custom collector. They add nothing to request handling.
+
+When ``prometheus_client`` is not installed every helper is a no-op and
+``/metrics`` answers 503.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on installed extras
+    PROMETHEUS_AVAILABLE = False
+
+# Providers whose children are bound up front; others are bound on first use.
+# LLM providers (OpenAI, Anthropic) are recorded per model in vp_llm_*.
+PROVIDERS = (
+    "exa",
+    "tavily",
+    "amadeus",
+    "aviasales",
+    "hotelbeds",
+    "serpapi",
+    "rapidapi",
+)
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+class BoundChildren:
+    """Cache of a metric's labelled children, created once per label tuple."""
+
+    def __init__(self, factory: Callable[..., Any]) -> None:
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, *labels: str) -> Any:
+        child = self._children.get(labels)
+        if child is None:
+            with self._lock:
+                child = self._children.get(labels)
+                if child is None:
+                    child = self._factory(*labels)
+                    self._children[labels] = child
+        return child
+
+
+class _NoopChild:
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+
+_NOOP = _NoopChild()
+
+
+def _children(metric: Any) -> BoundChildren:
+    if metric is None:
+        return BoundChildren(lambda *labels: _NOOP)
+    return BoundChildren(metric.labels)
+
+
+if PROMETHEUS_AVAILABLE:
+    REQUEST_SECONDS = Histogram(
+        "vp_http_request_duration_seconds",
+        "HTTP request latency by route.",
+        ["method", "route", "status"],
+    )
+    IN_FLIGHT = Gauge("vp_http_requests_in_flight", "HTTP requests currently being served.")
+    PROVIDER_SECONDS = Histogram(
+        "vp_provider_call_duration_seconds",
+        "Latency of calls to external providers.",
+        ["provider", "outcome"],
+    )
+    PROVIDER_ERRORS = Counter(
+        "vp_provider_errors", "Failed calls to external providers.", ["provider"]
+    )
+    PROVIDER_BYTES = Counter(
+        "vp_provider_response_bytes", "Bytes received from external providers.", ["provider"]
+    )
+    LLM_SECONDS = Histogram(
+        "vp_llm_call_duration_seconds", "Latency of LLM calls.", ["provider", "model", "outcome"]
+    )
+    LLM_TOKENS = Counter(
+        "vp_llm_tokens", "LLM tokens consumed, by direction.", ["provider", "model", "direction"]
+    )
+    NODE_SECONDS = Histogram(
+        "vp_agent_node_duration_seconds", "Wall time per VPAgent graph node.", ["node", "outcome"]
+    )
+else:  # pragma: no cover - depends on installed extras
+    REQUEST_SECONDS = IN_FLIGHT = PROVIDER_SECONDS = PROVIDER_ERRORS = PROVIDER_BYTES = None
+    LLM_SECONDS = LLM_TOKENS = NODE_SECONDS = None
+
+_request_children = _children(REQUEST_SECONDS)
+_provider_seconds = _children(PROVIDER_SECONDS)
+_provider_errors = _children(PROVIDER_ERRORS)
+_provider_bytes = _children(PROVIDER_BYTES)
+_llm_seconds = _children(LLM_SECONDS)
+_llm_tokens = _children(LLM_TOKENS)
+_node_seconds = _children(NODE_SECONDS)
+_in_flight = IN_FLIGHT if IN_FLIGHT is not None else _NOOP
+
+
+class ProviderMetrics:
+    """Pre-bound latency, error and response size children for one provider."""
+
+    def __init__(self, provider: str) -> None:
+        self.ok = _provider_seconds.get(provider, "ok")
+        self.error = _provider_seconds.get(provider, "error")
+        self.errors = _provider_errors.get(provider)
+        self.bytes = _provider_bytes.get(provider)
+
+    def observe(self, seconds: float, ok: bool) -> None:
+        if ok:
+            self.ok.observe(seconds)
+        else:
+            self.error.observe(seconds)
+            self.errors.inc()
+
+
+_provider_metrics = BoundChildren(ProviderMetrics)
+for _provider in PROVIDERS:
+    _provider_metrics.get(_provider)
+
+
+def provider_metrics(provider: str) -> ProviderMetrics:
+    return _provider_metrics.get(provider)
+
+
+@contextmanager
+def provider_call(provider: str) -> Iterator[None]:
+    """Time one call to ``provider``; an exception counts as an error.
+
+    Cancellation and other ``BaseException`` subclasses are not recorded at all.
+    """
+
+    metrics = provider_metrics(provider)
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.observe(time.perf_counter() - started, ok=False)
+        raise
+    metrics.observe(time.perf_counter() - started, ok=True)
+
+
+def observe_llm_call(
+    provider: str,
+    model: str,
+    seconds: float,
+    ok: bool,
+    input_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None,
+) -> None:
+    _llm_seconds.get(provider, model, "ok" if ok else "error").observe(seconds)
+    if input_tokens:
+        _llm_tokens.get(provider, model, "input").inc(input_tokens)
+    if output_tokens:
+        _llm_tokens.get(provider, model, "output").inc(output_tokens)
+
+
+def observe_node(node: str, seconds: float, ok: bool) -> None:
+    _node_seconds.get(node, "ok" if ok else "error").observe(seconds)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests.
+
+    Routes are labelled by their template (``/visa-pack/agent``) rather than
+    the raw path, so label cardinality stays fixed.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def _send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _in_flight.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            status_class = STATUS_CLASSES[min(max(status // 100, 1), 5) - 1]
+            _request_children.get(scope["method"], route, status_class).observe(
+                time.perf_counter() - started
+            )
+
+
+class _ScrapeTimeCollector:
+    """Reads search/LLM cache, single-flight and circuit breaker state when Prometheus scrapes."""
+
+    def collect(self) -> Iterator[Any]:
+        from .llm_cache import get_llm_cache
+        from .search_cache import get_search_cache, get_single_flight
+        from .services.circuit_breaker import breaker_snapshot
+
+        cache = get_search_cache()
+        if cache is not None:
+            stats = cache.stats()
+            lookups = CounterMetricFamily(
+                "vp_search_cache_lookups", "Search cache lookups by result.", labels=["result"]
+            )
+            lookups.add_metric(["hit"], stats["hits"])
+            lookups.add_metric(["miss"], stats["misses"])
+            yield lookups
+            total = stats["hits"] + stats["misses"]
+            yield GaugeMetricFamily(
+                "vp_search_cache_hit_ratio",
+                "Share of search lookups served from cache since start-up.",
+                value=stats["hits"] / total if total else 0.0,
+            )
+            tier_hits = CounterMetricFamily(
+                "vp_search_cache_tier_hits", "Search cache hits by tier.", labels=["tier"]
+            )
+            for key, value in stats.items():
+                if key.endswith("_hits") and key != "hits":
+                    tier_hits.add_metric([key[: -len("_hits")]], value)
+            yield tier_hits
+            if "memory_size" in stats:
+                yield GaugeMetricFamily(
+                    "vp_search_cache_memory_entries",
+                    "Entries held in the in-process tier.",
+                    value=stats["memory_size"],
+                )
+
+        single_flight = get_single_flight()
+        if single_flight is not None:
+            stats = single_flight.stats()
+            calls = CounterMetricFamily(
+                "vp_search_singleflight_calls",
+                "Search calls that ran (executed) or joined an identical in-flight search (coalesced).",
+                labels=["outcome"],
+            )
+            calls.add_metric(["executed"], stats["unique"])
+            calls.add_metric(["coalesced"], stats["shared"])
+            yield calls
+            yield GaugeMetricFamily(
+                "vp_search_singleflight_in_flight",
+                "Distinct searches currently in flight.",
+                value=single_flight.in_flight(),
+            )
+
+        llm_cache = get_llm_cache()
+        if llm_cache is not None:
+            stats = llm_cache.stats()
+            lookups = CounterMetricFamily(
+                "vp_llm_cache_lookups", "LLM response cache lookups by result.", labels=["result"]
+            )
+            lookups.add_metric(["hit"], stats["hits"])
+            lookups.add_metric(["miss"], stats["misses"])
+            yield lookups
+            yield CounterMetricFamily(
+                "vp_llm_cache_evictions",
+                "LLM responses evicted to stay under VP_LLM_CACHE_MAX_MB.",
+                value=stats["evictions"],
+            )
+            yield GaugeMetricFamily(
+                "vp_llm_cache_bytes", "Size of the cached LLM responses.", value=stats["bytes"]
+            )
+
+        state = GaugeMetricFamily(
+            "vp_circuit_breaker_open",
+            "1 while a provider's breaker is open or half-open.",
+            labels=["provider", "state"],
+        )
+        for provider, snapshot in breaker_snapshot().items():
+            state.add_metric(
+                [provider, snapshot["state"]], 0.0 if snapshot["state"] == "closed" else 1.0
+            )
+        yield state
+
+
+_collector_lock = threading.Lock()
+_collector: Optional[_ScrapeTimeCollector] = None
+
+
+def register_collectors() -> None:
+    """Register the scrape-time collector once per process."""
+
+    global _collector
+    if not PROMETHEUS_AVAILABLE:
+        return
+    with _collector_lock:
+        if _collector is None:
+            _collector = _ScrapeTimeCollector()
+            REGISTRY.register(_collector)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the exposition body and content type for ``/metrics``."""
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
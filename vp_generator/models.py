@@ -98,6 +98,7 @@ class TripPlan:
     validation_issues: List[str] = field(default_factory=list)
     budget_per_person_min_inr: Optional[int] = None
     budget_per_person_max_inr: Optional[int] = None
+    stage_timings_ms: Dict[str, float] = field(default_factory=dict)
 
 
 def trip_plan_to_dict(plan: TripPlan) -> Dict[str, Any]:
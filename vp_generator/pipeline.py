@@ -0,0 +1,102 @@
+"""Dependency-aware stage scheduler for the legacy visa pack pipeline."""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence, Set, Tuple
+
+from .models import TripPlan
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline step and the plan resources it reads and writes."""
+
+    name: str
+    func: Callable[[TripPlan], None]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+
+def validate_stages(stages: Sequence[Stage], provided: Iterable[str] = ("request",)) -> None:
+    """Reject duplicate names, unproduced inputs, doubly produced outputs and cycles."""
+
+    names: Set[str] = set()
+    producers: Dict[str, str] = {}
+    for stage in stages:
+        if stage.name in names:
+            raise ValueError(f"Duplicate stage name '{stage.name}'.")
+        names.add(stage.name)
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(
+                    f"'{output}' is produced by both '{producers[output]}' and '{stage.name}'."
+                )
+            producers[output] = stage.name
+
+    available = set(provided)
+    missing = {i for s in stages for i in s.inputs if i not in producers and i not in available}
+    if missing:
+        raise ValueError(f"No stage produces required input(s): {sorted(missing)}.")
+    pending = list(stages)
+    while pending:
+        ready = [s for s in pending if all(i in available for i in s.inputs)]
+        if not ready:
+            raise ValueError(
+                f"Stage dependencies form a cycle: {sorted(s.name for s in pending)}."
+            )
+        for stage in ready:
+            available.update(stage.outputs)
+            pending.remove(stage)
+
+
+def run_stages(
+    trip_plan: TripPlan,
+    stages: Sequence[Stage],
+    max_workers: int = 4,
+    provided: Iterable[str] = ("request",),
+) -> Dict[str, float]:
+    """Run ``stages`` as soon as their inputs exist, independent ones concurrently.
+
+    Per-stage wall times (milliseconds) are recorded on ``trip_plan.stage_timings_ms``.
+    The first stage failure cancels stages that have not started and is re-raised.
+    """
+
+    validate_stages(stages, provided)
+    available = set(provided)
+    pending: List[Stage] = list(stages)
+    running: Dict[Future, Stage] = {}
+    timings: Dict[str, float] = {}
+
+    def _timed(stage: Stage) -> float:
+        started = time.perf_counter()
+        stage.func(trip_plan)
+        return (time.perf_counter() - started) * 1000
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        try:
+            while pending or running:
+                for stage in [s for s in pending if all(i in available for i in s.inputs)]:
+                    pending.remove(stage)
+                    # Stages see the caller's context (e.g. the LLM cache bypass).
+                    running[pool.submit(contextvars.copy_context().run, _timed, stage)] = stage
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    timings[stage.name] = round(future.result(), 3)
+                    available.update(stage.outputs)
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+        finally:
+            trip_plan.stage_timings_ms.update(timings)
+    logger.debug("Stage timings (ms): %s", timings)
+    return timings
@@ -0,0 +1,408 @@
+"""Cache for agentic (Exa/Tavily) search results.
+
+Results are keyed on the normalized query, the requested result count and a
+hash of the summary schema. Lookups go through an in-process LRU tier first and
+an optional SQLite tier second; entries expire after a TTL chosen per result
+kind, so volatile flight prices age out faster than insurance listings.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+SearchResults = List[Dict[str, Any]]
+
+DEFAULT_TTLS: Dict[str, float] = {
+    "flights": 15 * 60,
+    "hotels": 6 * 60 * 60,
+    "insurance": 24 * 60 * 60,
+    "general": 60 * 60,
+}
+
+
+class CacheTier(Protocol):
+    """Storage backend used by :class:`SearchCache`."""
+
+    name: str
+
+    def get(self, key: str) -> Optional[SearchResults]:
+        ...
+
+    def set(self, key: str, value: SearchResults, ttl: float) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+
+class MemoryLRUTier:
+    """Bounded in-process tier with least-recently-used eviction."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, SearchResults]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[SearchResults]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: SearchResults, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteTier:
+    """Optional on-disk tier so warm results survive restarts and are shared by workers."""
+
+    name = "disk"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[SearchResults]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, payload FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            expires_at, payload = row
+            if expires_at <= time.time():
+                with self._conn:
+                    self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                return None
+        return json.loads(payload)
+
+    def set(self, key: str, value: SearchResults, ttl: float) -> None:
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, expires_at, payload) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, payload),
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM search_cache")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def cache_key(query: str, num_results: int, summary: Optional[Dict[str, Any]] = None) -> str:
+    summary_hash = ""
+    if summary:
+        summary_hash = hashlib.sha256(
+            json.dumps(summary, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+    raw = f"{normalize_query(query)}\x1f{num_results}\x1f{summary_hash}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """Tiered search result cache with per-kind TTLs and hit/miss counters."""
+
+    def __init__(
+        self,
+        tiers: Sequence[CacheTier],
+        ttls: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.tiers = list(tiers)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0}
+        for tier in self.tiers:
+            self._counters[f"{tier.name}_hits"] = 0
+
+    def ttl_for(self, kind: str) -> float:
+        return self.ttls.get(kind, self.ttls["general"])
+
+    def get(self, key: str, kind: str = "general") -> Optional[SearchResults]:
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is None:
+                continue
+            self._count("hits", f"{tier.name}_hits")
+            # Promote into the faster tiers so the next lookup stays in process.
+            for faster in self.tiers[:index]:
+                faster.set(key, value, self.ttl_for(kind))
+            return value
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: SearchResults, kind: str = "general") -> None:
+        if not value:
+            return
+        ttl = self.ttl_for(kind)
+        for tier in self.tiers:
+            tier.set(key, value, ttl)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+        for tier in self.tiers:
+            if isinstance(tier, MemoryLRUTier):
+                stats["memory_size"] = len(tier)
+                stats["memory_evictions"] = tier.evictions
+        return stats
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._counters[name] += 1
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+_UNSET = object()
+_cache: object = _UNSET
+
+
+def _build_from_env() -> Optional[SearchCache]:
+    if os.getenv("VP_SEARCH_CACHE_ENABLED", "true").lower() in {"0", "false", "no", "off"}:
+        return None
+    tiers: List[CacheTier] = [
+        MemoryLRUTier(max_entries=int(_env_float("VP_SEARCH_CACHE_SIZE", 512)))
+    ]
+    disk_path = os.getenv("VP_SEARCH_CACHE_PATH")
+    if disk_path:
+        tiers.append(SQLiteTier(disk_path))
+    ttls = {
+        kind: _env_float(f"VP_SEARCH_CACHE_TTL_{kind.upper()}", default)
+        for kind, default in DEFAULT_TTLS.items()
+    }
+    return SearchCache(tiers, ttls=ttls)
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Return the process-wide cache, built from VP_SEARCH_CACHE_* on first use.
+
+    ``None`` means caching is disabled (VP_SEARCH_CACHE_ENABLED=false).
+    """
+
+    global _cache
+    if _cache is _UNSET:
+        _cache = _build_from_env()
+    return _cache  # type: ignore[return-value]
+
+
+def set_search_cache(cache: Optional[SearchCache]) -> None:
+    """Install a custom cache (e.g. with different tiers), or ``None`` to disable it."""
+
+    global _cache
+    _cache = cache
+
+
+# ---------------------------------------------------------------------------
+# Single-flight coalescing and the batch-scoped memo
+# ---------------------------------------------------------------------------
+
+
+class SingleFlight:
+    """Coalesce concurrent identical searches onto one in-flight call.
+
+    The first caller for a key runs the search. Callers arriving while it is in
+    flight, from any thread or event loop, wait on the same future instead of
+    issuing their own request. Errors are shared with those waiters. If the
+    leading caller is cancelled (e.g. a flight leg timing out), the waiters
+    retry rather than inheriting the cancellation.
+    """
+
+    #: Keep finished results for later callers (see :class:`SearchMemo`).
+    remember = False
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, "Future[SearchResults]"] = {}
+        self.unique = 0
+        self.shared = 0
+
+    def _claim(self, key: str) -> Tuple["Future[SearchResults]", bool]:
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            self._entries[key] = future
+            self.unique += 1
+            return future, True
+
+    def _release(self, key: str, future: "Future[SearchResults]") -> None:
+        with self._lock:
+            if self._entries.get(key) is future:
+                del self._entries[key]
+
+    def _succeed(self, key: str, future: "Future[SearchResults]", results: SearchResults) -> None:
+        if not self.remember:
+            self._release(key, future)
+        future.set_result(results)
+
+    def _fail(self, key: str, future: "Future[SearchResults]", exc: BaseException) -> None:
+        self._release(key, future)
+        if isinstance(exc, Exception):
+            future.set_exception(exc)
+        else:
+            future.cancel()  # the leader was cancelled; waiters retry
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], SearchResults]) -> SearchResults:
+        while True:
+            future, owner = self._claim(key)
+            if owner:
+                break
+            try:
+                return future.result()
+            except CancelledError:
+                continue
+        try:
+            results = fetch()
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+        self._succeed(key, future, results)
+        return results
+
+    async def aget_or_fetch(
+        self, key: str, fetch: Callable[[], Awaitable[SearchResults]]
+    ) -> SearchResults:
+        while True:
+            future, owner = self._claim(key)
+            if owner:
+                break
+            try:
+                # Shielded so a waiter's own cancellation never cancels the shared call.
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+        try:
+            results = await fetch()
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+        self._succeed(key, future, results)
+        return results
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(1 for future in self._entries.values() if not future.done())
+
+    def stats(self) -> Dict[str, int]:
+        """``unique`` searches were run; ``shared`` calls reused one of them."""
+
+        with self._lock:
+            return {"unique": self.unique, "shared": self.shared}
+
+
+class SearchMemo(SingleFlight):
+    """Run each distinct search once for the lifetime of the memo.
+
+    Used for batch requests: packs that share a route and dates issue identical
+    searches, often at the same moment. Besides coalescing in-flight calls, the
+    memo keeps every successful result, so callers arriving after a search has
+    finished reuse it too. Failed searches are not remembered.
+    """
+
+    remember = True
+
+
+_active_memo: ContextVar[Optional[SearchMemo]] = ContextVar("vp_search_memo", default=None)
+
+
+def current_search_memo() -> Optional[SearchMemo]:
+    return _active_memo.get()
+
+
+@contextmanager
+def search_memo(memo: Optional[SearchMemo] = None) -> Iterator[SearchMemo]:
+    """Share searches made inside the block (including graph nodes and their threads)."""
+
+    memo = memo or SearchMemo()
+    token = _active_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _active_memo.reset(token)
+
+
+_single_flight: object = _UNSET
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Process-wide coalescer for identical concurrent searches.
+
+    ``None`` when disabled with VP_SEARCH_SINGLE_FLIGHT=false.
+    """
+
+    global _single_flight
+    if _single_flight is _UNSET:
+        enabled = os.getenv("VP_SEARCH_SINGLE_FLIGHT", "true").lower() not in {"0", "false", "no", "off"}
+        _single_flight = SingleFlight() if enabled else None
+    return _single_flight  # type: ignore[return-value]
+
+
+def set_single_flight(single_flight: Optional[SingleFlight]) -> None:
+    global _single_flight
+    _single_flight = single_flight
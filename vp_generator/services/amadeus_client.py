@@ -2,46 +2,56 @@
 
 from __future__ import annotations
 
-import time
 from datetime import date, timedelta
-from typing import Optional
-
-import httpx
+from typing import Optional, Tuple
 
 from ..config import get_settings
+from .circuit_breaker import protect
+from .http_pool import get_http_client
+from .oauth import OAuthTokenManager
 
 TOKEN_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
 
-_cache: dict[str, float | str] = {"token": "", "expires": 0.0}
+
+def _fetch_amadeus_token() -> Optional[Tuple[str, float]]:
+    settings = get_settings()
+    with protect("amadeus"):
+        resp = get_http_client(TOKEN_URL).post(
+            TOKEN_URL,
+            data={
+                "grant_type": "client_credentials",
+                "client_id": settings.amadeus_api_key,
+                "client_secret": settings.amadeus_api_secret,
+            },
+            timeout=10.0,
+        )
+        resp.raise_for_status()
+    payload = resp.json()
+    return payload.get("access_token", ""), float(payload.get("expires_in", 0))
+
+
+_tokens = OAuthTokenManager(_fetch_amadeus_token, expiry_margin=60.0, refresh_ahead=300.0)
+
+
+def _has_credentials() -> bool:
+    settings = get_settings()
+    return bool(settings.amadeus_api_key and settings.amadeus_api_secret)
 
 
 def get_amadeus_token() -> Optional[str]:
     """Return a cached bearer token or fetch a new one."""
 
-    settings = get_settings()
-    if not settings.amadeus_api_key or not settings.amadeus_api_secret:
+    if not _has_credentials():
         return None
+    return _tokens.get_token()
 
-    if _cache["token"] and time.time() < _cache["expires"]:
-        return _cache["token"]  # type: ignore[return-value]
 
-    try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.post(
-                TOKEN_URL,
-                data={
-                    "grant_type": "client_credentials",
-                    "client_id": settings.amadeus_api_key,
-                    "client_secret": settings.amadeus_api_secret,
-                },
-            )
-            resp.raise_for_status()
-            payload = resp.json()
-            _cache["token"] = payload.get("access_token", "")
-            _cache["expires"] = time.time() + int(payload.get("expires_in", 0)) - 60
-            return _cache["token"]  # type: ignore[return-value]
-    except Exception:
+async def aget_amadeus_token() -> Optional[str]:
+    """Async variant of :func:`get_amadeus_token`."""
+
+    if not _has_credentials():
         return None
+    return await _tokens.aget_token()
 
 
 def convert_to_inr(amount: float, currency: str) -> float:
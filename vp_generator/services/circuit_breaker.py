@@ -0,0 +1,190 @@
+"""Per-provider circuit breakers for outbound API calls.
+
+Each external service gets a named breaker. Wrap the network call in it::
+
+    with protect("serpapi"):
+        resp = client.get(...)
+        resp.raise_for_status()
+
+After ``failure_threshold`` consecutive failures the breaker opens, and
+entering it raises :class:`CircuitOpenError` straight away. Callers already
+catch provider errors, so they go directly to their fallback path instead of
+waiting out the HTTP timeout. Once ``reset_timeout`` has passed, one trial call
+is let through (half-open). If it succeeds the breaker closes; if it fails the
+breaker opens again.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from ..metrics import provider_call
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker guarding one external service."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._counters = {"successes": 0, "failures": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """Reserve a call, raising :class:`CircuitOpenError` if none is allowed."""
+
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                return
+            if state != CLOSED:
+                self._counters["rejected"] += 1
+                raise CircuitOpenError(f"Circuit for {self.name} is open; skipping the call.")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counters["successes"] += 1
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._trials = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._counters["failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._trials = 0
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial slot whose call ended without an outcome."""
+
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._trials = 0
+
+    def __enter__(self) -> "CircuitBreaker":
+        self.before_call()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.record_success()
+        elif issubclass(exc_type, Exception):
+            self.record_failure()
+        else:
+            # Cancellation (a hedged loser, a deadline) or shutdown says nothing
+            # about the provider's health.
+            self.release_trial()
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_in: Optional[float] = None
+            if state == OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (self._clock() - self._opened_at)), 3)
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_in_seconds": retry_in,
+                **self._counters,
+            }
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``name``, configured from VP_BREAKER_*."""
+
+    breaker = _breakers.get(name)
+    if breaker is not None:
+        return breaker
+    with _lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=max(1, int(_env_number("VP_BREAKER_FAILURE_THRESHOLD", 5))),
+                reset_timeout=_env_number("VP_BREAKER_RESET_TIMEOUT", 30.0),
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+@contextmanager
+def protect(provider: str) -> Iterator[CircuitBreaker]:
+    """Run the block under ``provider``'s breaker and record its call metrics."""
+
+    breaker = get_breaker(provider)
+    with breaker, provider_call(provider):
+        yield breaker
+
+
+def breaker_snapshot() -> Dict[str, Dict[str, Any]]:
+    """State and counters of every breaker created so far, keyed by provider."""
+
+    with _lock:
+        breakers = dict(_breakers)
+    return {name: breakers[name].snapshot() for name in sorted(breakers)}
+
+
+def reset_breakers() -> None:
+    with _lock:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        breaker.reset()
@@ -7,6 +7,10 @@ from typing import Any, Dict, List, Optional
 
 import httpx
 
+from ..instrumentation import external_call
+from .circuit_breaker import CircuitOpenError, protect
+from .http_pool import get_async_http_client, get_http_client
+
 
 EXA_API_KEY = os.getenv("EXA_API_KEY")
 EXA_SEARCH_URL = os.getenv("EXA_SEARCH_URL", "https://api.exa.ai/search")
@@ -20,15 +24,12 @@ def has_exa_credentials() -> bool:
     return bool(EXA_API_KEY)
 
 
-def agentic_search(
+def _search_payload(
     query: str,
-    *,
-    num_results: int = 8,
-    summary: Optional[Dict[str, Any]] = None,
-    search_type: str = "auto",
-) -> List[Dict[str, Any]]:
-    """Call Exa's search endpoint with the agentic mode."""
-
+    num_results: int,
+    summary: Optional[Dict[str, Any]],
+    search_type: str,
+) -> Dict[str, Any]:
     if not EXA_API_KEY:
         raise ExaError(
             "EXA_API_KEY is not configured. Set it in the environment or .env file."
@@ -43,19 +44,67 @@ def agentic_search(
 
     if summary:
         payload["contents"] = {"summary": summary}
+    return payload
 
-    headers = {"x-api-key": EXA_API_KEY}
-
-    try:
-        response = httpx.post(
-            EXA_SEARCH_URL, json=payload, headers=headers, timeout=30.0
-        )
-        response.raise_for_status()
-    except httpx.HTTPError as exc:
-        raise ExaError(f"Exa search failed: {exc}") from exc
 
+def _parse_results(response: httpx.Response) -> List[Dict[str, Any]]:
     data = response.json()
     results = data.get("results", [])
     if not isinstance(results, list):
         return []
     return results
+
+
+def agentic_search(
+    query: str,
+    *,
+    num_results: int = 8,
+    summary: Optional[Dict[str, Any]] = None,
+    search_type: str = "auto",
+) -> List[Dict[str, Any]]:
+    """Call Exa's search endpoint with the agentic mode."""
+
+    payload = _search_payload(query, num_results, summary, search_type)
+    headers = {"x-api-key": EXA_API_KEY}
+
+    with external_call("exa", query) as call:
+        try:
+            with protect("exa"):
+                response = get_http_client(EXA_SEARCH_URL).post(
+                    EXA_SEARCH_URL, json=payload, headers=headers, timeout=30.0
+                )
+                call.status = response.status_code
+                response.raise_for_status()
+        except (httpx.HTTPError, CircuitOpenError) as exc:
+            raise ExaError(f"Exa search failed: {exc}") from exc
+        call.bytes = len(response.content)
+
+    return _parse_results(response)
+
+
+async def aagentic_search(
+    query: str,
+    *,
+    num_results: int = 8,
+    summary: Optional[Dict[str, Any]] = None,
+    search_type: str = "auto",
+) -> List[Dict[str, Any]]:
+    """Async variant of :func:`agentic_search` built on ``httpx.AsyncClient``."""
+
+    payload = _search_payload(query, num_results, summary, search_type)
+    headers = {"x-api-key": EXA_API_KEY}
+
+    with external_call("exa", query) as call:
+        try:
+            with protect("exa"):
+                client = get_async_http_client(EXA_SEARCH_URL)
+                response = await client.post(
+                    EXA_SEARCH_URL, json=payload, headers=headers, timeout=30.0
+                )
+                call.status = response.status_code
+                response.raise_for_status()
+        except (httpx.HTTPError, CircuitOpenError) as exc:
+            raise ExaError(f"Exa search failed: {exc}") from exc
+        call.bytes = len(response.content)
+
+    return _parse_results(response)
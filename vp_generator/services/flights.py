@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import re
+from functools import partial
 from typing import Dict, List
 
-import httpx
-
 from ..models import TripRequest, FlightOption
 from ..config import get_settings
 from .amadeus_client import clamp_dates_for_amadeus, convert_to_inr, get_amadeus_token
+from .circuit_breaker import protect
+from .hedging import Provider, first_non_empty, hedged_first, race_lost
+from .http_pool import get_http_client
 
 
 AMADEUS_FLIGHTS_URL = "https://test.api.amadeus.com/v2/shopping/flight-offers"
@@ -54,16 +56,38 @@ def recommend_flights(request: TripRequest) -> List[FlightOption]:
         request.destination_countries[0].lower(), "CDG"
     )
 
-    avia_options = _fetch_aviasales(settings.travelpayouts_token, settings.aviasales_partner_id, origin, destination)
-    if avia_options:
-        return avia_options
+    providers: List[Provider] = [
+        (
+            "aviasales",
+            partial(
+                _fetch_aviasales,
+                settings.travelpayouts_token,
+                settings.aviasales_partner_id,
+                origin,
+                destination,
+            ),
+        ),
+        ("amadeus", partial(_amadeus_flights, origin, destination, request)),
+    ]
+    mode = settings.flight_provider_mode
+    if mode == "serial":
+        _, flights = first_non_empty(providers)
+    elif mode == "hedged":
+        # Aviasales still wins whenever it has offers; racing Amadeus (token
+        # fetch included) alongside it only removes the wait when it has none.
+        _, flights = hedged_first(
+            providers, hedge_delay=settings.flight_hedge_delay, prefer_ranked=True
+        )
+    else:
+        raise ValueError(f"Unknown FLIGHT_PROVIDER_MODE '{mode}'; use 'hedged' or 'serial'.")
+    return flights or _fallback_recommendations(request)
 
+
+def _amadeus_flights(origin: str, destination: str, request: TripRequest) -> List[FlightOption]:
     token = get_amadeus_token()
-    if token:
-        amadeus_options = _fetch_amadeus(token, origin, destination, request)
-        if amadeus_options:
-            return amadeus_options
-    return _fallback_recommendations(request)
+    if not token or race_lost():
+        return []
+    return _fetch_amadeus(token, origin, destination, request)
 
 
 def _fetch_aviasales(token: str | None, marker: str | None, origin: str, destination: str) -> List[FlightOption]:
@@ -77,10 +101,10 @@ def _fetch_aviasales(token: str | None, marker: str | None, origin: str, destina
         "currency": "INR",
     }
     try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.get(AVIASALES_URL, params=params)
+        with protect("aviasales"):
+            resp = get_http_client(AVIASALES_URL).get(AVIASALES_URL, params=params, timeout=10.0)
             resp.raise_for_status()
-            payload = resp.json()
+        payload = resp.json()
     except Exception:
         return []
 
@@ -134,11 +158,16 @@ def _fetch_amadeus(token: str, origin: str, destination: str, request: TripReque
         "currencyCode": "INR",
     }
     try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.get(AMADEUS_FLIGHTS_URL, params=params, headers={"Authorization": f"Bearer {token}"})
+        with protect("amadeus"):
+            resp = get_http_client(AMADEUS_FLIGHTS_URL).get(
+                AMADEUS_FLIGHTS_URL,
+                params=params,
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=10.0,
+            )
             resp.raise_for_status()
-            data = resp.json().get("data", [])
-            return _parse_flight_offers(data, origin, destination)
+        data = resp.json().get("data", [])
+        return _parse_flight_offers(data, origin, destination)
     except Exception:
         return []
 
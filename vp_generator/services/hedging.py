@@ -0,0 +1,220 @@
+"""Hedged requests across ranked providers that can answer the same query.
+
+Providers are listed best-first. The primary starts immediately; each backup
+starts once the provider before it has been running for its usual latency (or
+as soon as it fails or comes back empty). The first non-empty answer wins and
+the remaining calls are abandoned.
+
+Providers that have not started by then are never run. Blocking HTTP calls
+cannot be interrupted, so a provider already running is told its race is over
+instead: :func:`race_lost` turns true, and providers that make several requests
+(one per city, token then search) check it before each and stop early. A loser
+therefore holds its worker thread for at most the request it is in, bounded by
+that request's own timeout.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+Provider = Tuple[str, Callable[[], List[T]]]
+
+
+class LatencyStats:
+    """Rolling per-provider latencies used to decide when to start a hedge."""
+
+    def __init__(
+        self,
+        window: int = 50,
+        quantile: float = 0.9,
+        default_delay: float = 2.0,
+        min_delay: float = 0.05,
+        max_delay: float = 10.0,
+    ) -> None:
+        self.window = window
+        self.quantile = quantile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._calls: Dict[str, int] = {}
+        self._failures: Dict[str, int] = {}
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._calls[name] = self._calls.get(name, 0) + 1
+            if ok:
+                self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            else:
+                self._failures[name] = self._failures.get(name, 0) + 1
+
+    def percentile(self, name: str, quantile: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(quantile * len(samples)))]
+
+    def hedge_delay(self, name: str) -> float:
+        """How long to give ``name`` before starting the next provider."""
+
+        observed = self.percentile(name, self.quantile)
+        if observed is None:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, observed))
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        with self._lock:
+            names = sorted(self._calls)
+            counts = {n: (self._calls[n], self._failures.get(n, 0)) for n in names}
+        return {
+            name: {
+                "calls": calls,
+                "failures": failures,
+                "p50": self.percentile(name, 0.5),
+                "p90": self.percentile(name, 0.9),
+                "hedge_delay": self.hedge_delay(name),
+            }
+            for name, (calls, failures) in counts.items()
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._calls.clear()
+            self._failures.clear()
+
+
+PROVIDER_LATENCY = LatencyStats()
+
+
+_race_over: ContextVar[Optional[threading.Event]] = ContextVar("vp_hedge_race_over", default=None)
+
+
+def race_lost() -> bool:
+    """True once the hedged race this provider call belongs to has been decided."""
+
+    event = _race_over.get()
+    return event is not None and event.is_set()
+
+
+def _timed_call(name: str, call: Callable[[], List[T]], stats: LatencyStats) -> List[T]:
+    started = time.perf_counter()
+    try:
+        results = call() or []
+    except Exception as exc:  # noqa: BLE001 - a failing provider must not sink the race
+        logger.warning("Provider %s failed: %s", name, exc)
+        results = []
+    if results or not race_lost():  # a loser that stopped early did not fail
+        stats.record(name, time.perf_counter() - started, ok=bool(results))
+    return results
+
+
+def _raced_call(
+    race_over: threading.Event, name: str, call: Callable[[], List[T]], stats: LatencyStats
+) -> List[T]:
+    token = _race_over.set(race_over)
+    try:
+        return _timed_call(name, call, stats)
+    finally:
+        _race_over.reset(token)
+
+
+def first_non_empty(
+    providers: Sequence[Provider], stats: Optional[LatencyStats] = None
+) -> Tuple[Optional[str], List[T]]:
+    """Serial fallback chain: call providers in order until one returns results."""
+
+    stats = stats or PROVIDER_LATENCY
+    for name, call in providers:
+        results = _timed_call(name, call, stats)
+        if results:
+            return name, results
+    return None, []
+
+
+def hedged_first(
+    providers: Sequence[Provider],
+    *,
+    hedge_delay: Optional[float] = None,
+    timeout: Optional[float] = None,
+    prefer_ranked: bool = False,
+    stats: Optional[LatencyStats] = None,
+) -> Tuple[Optional[str], List[T]]:
+    """Race ``providers`` with staggered starts and return ``(name, results)``.
+
+    ``hedge_delay`` fixes the stagger; by default it is each provider's recent
+    p90 latency. When several answers land together the higher-ranked one wins.
+    With ``prefer_ranked`` a lower-ranked answer is held back until every
+    provider ranked above it has come back empty, so the race only saves time.
+    Returns ``(None, [])`` if every provider fails or ``timeout`` elapses.
+    """
+
+    stats = stats or PROVIDER_LATENCY
+    if len(providers) <= 1:
+        return first_non_empty(providers, stats)
+
+    pool = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix="hedge")
+    race_over = threading.Event()
+    running: Dict[Future, int] = {}
+    answers: Dict[int, List[T]] = {}
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    next_index = 0
+    next_start = 0.0
+
+    def _best() -> Optional[int]:
+        return min(answers) if answers else None
+
+    def _launch() -> None:
+        nonlocal next_index, next_start
+        name, call = providers[next_index]
+        running[pool.submit(_raced_call, race_over, name, call, stats)] = next_index
+        next_index += 1
+        delay = hedge_delay if hedge_delay is not None else stats.hedge_delay(name)
+        next_start = time.monotonic() + delay
+
+    try:
+        _launch()
+        while running:
+            now = time.monotonic()
+            wait_for: Optional[float] = None
+            if next_index < len(providers):
+                wait_for = max(0.0, next_start - now)
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    break
+                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+            done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index = running.pop(future)
+                results = future.result()
+                if results:
+                    answers[index] = results
+            best = _best()
+            if best is not None and (
+                not prefer_ranked or not any(index < best for index in running.values())
+            ):
+                return providers[best][0], answers[best]
+            # A provider that came back empty hands over immediately; otherwise
+            # the next one starts when the current hedge delay has passed.
+            if next_index < len(providers) and (done or time.monotonic() >= next_start):
+                _launch()
+        best = _best()
+        if best is not None:
+            return providers[best][0], answers[best]
+        return None, []
+    finally:
+        race_over.set()
+        pool.shutdown(wait=False, cancel_futures=True)
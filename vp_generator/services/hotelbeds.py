@@ -6,10 +6,10 @@ import hashlib
 import time
 from typing import Dict, List
 
-import httpx
-
 from ..config import get_settings
 from ..models import HotelOption, TripRequest
+from .circuit_breaker import protect
+from .http_pool import get_http_client
 
 HOTELBEDS_TEST_ENDPOINT = "https://api.test.hotelbeds.com/hotel-api/1.0/hotels"
 DESTINATION_CODES: Dict[str, str] = {
@@ -79,10 +79,12 @@ def search_hotels(request: TripRequest, cities: List[str]) -> List[HotelOption]:
     }
 
     try:
-        with httpx.Client(timeout=15.0) as client:
-            resp = client.post(HOTELBEDS_TEST_ENDPOINT, json=payload, headers=headers)
+        with protect("hotelbeds"):
+            resp = get_http_client(HOTELBEDS_TEST_ENDPOINT).post(
+                HOTELBEDS_TEST_ENDPOINT, json=payload, headers=headers, timeout=15.0
+            )
             resp.raise_for_status()
-            data = resp.json()
+        data = resp.json()
     except Exception:
         return []
 
@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 from datetime import date, timedelta
+from functools import partial
 from typing import Iterable, List, Optional
 
-import httpx
-
 from ..config import get_settings
 from ..models import TripRequest, HotelOption
+from .circuit_breaker import protect
+from .hedging import Provider, first_non_empty, hedged_first, race_lost
 from .hotelbeds import search_hotels as hotelbeds_search
+from .http_pool import get_http_client
 
 DEFAULT_RAPIDAPI_HOST = "booking-com15.p.rapidapi.com"
 SEARCH_DEST_ENDPOINT = "/api/v1/hotels/searchDestination"
@@ -25,32 +27,43 @@ def recommend_hotels(request: TripRequest, cities: Iterable[str]) -> List[HotelO
     if not unique_cities and request.destination_countries:
         unique_cities = [request.destination_countries[0]]
 
-    hotelbeds_hotels: List[HotelOption] = []
-    if settings.hotelbeds_api_key and settings.hotelbeds_api_secret:
-        hotelbeds_hotels = hotelbeds_search(request, unique_cities)
-    if hotelbeds_hotels:
-        return hotelbeds_hotels
+    providers = _hotel_providers(request, unique_cities, settings)
+    mode = settings.hotel_provider_mode
+    if mode == "serial":
+        _, hotels = first_non_empty(providers)
+    elif mode == "hedged":
+        # Backups run alongside a slow Hotelbeds, but their answer is only used
+        # once every higher-priority provider has come back empty.
+        _, hotels = hedged_first(
+            providers, hedge_delay=settings.hotel_hedge_delay, prefer_ranked=True
+        )
+    else:
+        raise ValueError(f"Unknown HOTEL_PROVIDER_MODE '{mode}'; use 'hedged' or 'serial'.")
+    return hotels or _fallback_hotels(request, unique_cities)
 
-    serp_hotels: List[HotelOption] = []
-    if settings.serpapi_key:
-        serp_hotels = _serpapi_hotels(unique_cities, request, settings.serpapi_key)
-    if serp_hotels:
-        return serp_hotels
 
-    booking_hotels = _booking_com_hotels(unique_cities, request, settings)
-    if booking_hotels:
-        return booking_hotels
+def _hotel_providers(request: TripRequest, cities: List[str], settings) -> List[Provider]:
+    """Configured providers in priority order: Hotelbeds, SerpApi, Booking.com."""
 
-    return _fallback_hotels(request, unique_cities)
+    providers: List[Provider] = []
+    if settings.hotelbeds_api_key and settings.hotelbeds_api_secret:
+        providers.append(("hotelbeds", partial(hotelbeds_search, request, cities)))
+    if settings.serpapi_key:
+        providers.append(("serpapi", partial(_serpapi_hotels, cities, request, settings.serpapi_key)))
+    if settings.rapidapi_key:
+        providers.append(("booking", partial(_booking_com_hotels, cities, request, settings)))
+    return providers
 
 
 def _lookup_destination(base_url: str, headers: dict, city: str) -> Optional[dict]:
     params = {"query": city, "locale": "en-gb"}
     try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.get(f"{base_url}{SEARCH_DEST_ENDPOINT}", params=params, headers=headers)
+        with protect("rapidapi"):
+            resp = get_http_client(base_url).get(
+                f"{base_url}{SEARCH_DEST_ENDPOINT}", params=params, headers=headers, timeout=10.0
+            )
             resp.raise_for_status()
-            payload = resp.json()
+        payload = resp.json()
     except Exception:
         return None
 
@@ -80,9 +93,13 @@ def _booking_com_hotels(cities: List[str], request: TripRequest, settings) -> Li
 
     hotels: List[HotelOption] = []
     for city in cities:
+        if race_lost():
+            break
         dest = _lookup_destination(base_url, headers, city)
         if not dest:
             continue
+        if race_lost():
+            break
         hotels.extend(_search_booking_hotels(base_url, headers, dest, request))
     return hotels
 
@@ -107,10 +124,12 @@ def _search_booking_hotels(base_url: str, headers: dict, dest_info: dict, reques
         "checkout_date": request.end_date,
     }
     try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.get(f"{base_url}{SEARCH_HOTELS_ENDPOINT}", params=params, headers=headers)
+        with protect("rapidapi"):
+            resp = get_http_client(base_url).get(
+                f"{base_url}{SEARCH_HOTELS_ENDPOINT}", params=params, headers=headers, timeout=10.0
+            )
             resp.raise_for_status()
-            payload = resp.json()
+        payload = resp.json()
     except Exception:
         return []
 
@@ -156,12 +175,14 @@ def _serpapi_hotels(cities: List[str], request: TripRequest, api_key: str) -> Li
         "api_key": api_key,
     }
     for city in cities:
+        if race_lost():
+            break
         params = dict(params_base, q=f"{city}, {request.primary_destination_country}")
         try:
-            with httpx.Client(timeout=15.0) as client:
-                resp = client.get(SERP_API_ENDPOINT, params=params)
+            with protect("serpapi"):
+                resp = get_http_client(SERP_API_ENDPOINT).get(SERP_API_ENDPOINT, params=params, timeout=15.0)
                 resp.raise_for_status()
-                data = resp.json()
+            data = resp.json()
         except Exception:
             continue
 
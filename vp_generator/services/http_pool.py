@@ -0,0 +1,145 @@
+"""Process-wide pooled HTTP clients shared by every provider integration.
+
+Async clients are kept per event loop, since their connections belong to the
+loop that opened them. :func:`aclose_http_clients` closes the clients of every
+loop that is still running, each on its own loop. A loop that has already
+stopped can no longer run the close, so its clients are only dropped; code
+that runs a short-lived loop in a worker thread should therefore call
+:func:`aclose_loop_http_clients` before that loop ends.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from typing import Dict, Iterable, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+try:  # HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``).
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on installed extras
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30.0
+# How long shutdown waits for another loop to close its clients.
+CLOSE_TIMEOUT = 5.0
+
+_lock = threading.Lock()
+_clients: Dict[str, httpx.Client] = {}
+# Async clients are tied to the event loop that opened their connections.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _limits() -> httpx.Limits:
+    """Per-host pool limits; each host gets its own client and therefore its own pool."""
+
+    return httpx.Limits(
+        max_connections=_env_int("VP_HTTP_MAX_CONNECTIONS_PER_HOST", 20),
+        max_keepalive_connections=_env_int("VP_HTTP_MAX_KEEPALIVE_PER_HOST", 10),
+        keepalive_expiry=float(_env_int("VP_HTTP_KEEPALIVE_EXPIRY", 30)),
+    )
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _client_kwargs() -> Dict[str, object]:
+    return {
+        "timeout": DEFAULT_TIMEOUT,
+        "limits": _limits(),
+        "http2": HTTP2_AVAILABLE,
+    }
+
+
+def get_http_client(url: str) -> httpx.Client:
+    """Return the shared keep-alive client for the host serving ``url``."""
+
+    key = _host_key(url)
+    client = _clients.get(key)
+    if client is not None and not client.is_closed:
+        return client
+    with _lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.Client(**_client_kwargs())
+            _clients[key] = client
+        return client
+
+
+def get_async_http_client(url: str) -> httpx.AsyncClient:
+    """Return the shared async client for ``url``'s host on the running event loop."""
+
+    loop = asyncio.get_running_loop()
+    key = _host_key(url)
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_client_kwargs())
+            per_loop[key] = client
+        return client
+
+
+def close_http_clients() -> None:
+    """Close every pooled sync client (connections are re-opened on next use)."""
+
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def _aclose_all(clients: Iterable[httpx.AsyncClient]) -> None:
+    for client in clients:
+        await client.aclose()
+
+
+async def aclose_loop_http_clients() -> None:
+    """Close the async clients owned by the running loop."""
+
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients: Tuple[httpx.AsyncClient, ...] = tuple(
+            _async_clients.pop(loop, {}).values()
+        )
+    await _aclose_all(clients)
+
+
+async def aclose_http_clients() -> None:
+    """Close every pooled client: async ones on the loop that owns them, then sync ones."""
+
+    current = asyncio.get_running_loop()
+    with _lock:
+        owned = [(loop, tuple(per_loop.values())) for loop, per_loop in _async_clients.items()]
+        _async_clients.clear()
+    for loop, clients in owned:
+        if loop is current:
+            await _aclose_all(clients)
+        elif loop.is_running():
+            try:
+                future = asyncio.run_coroutine_threadsafe(_aclose_all(clients), loop)
+                await asyncio.wait_for(asyncio.wrap_future(future), CLOSE_TIMEOUT)
+            except Exception as exc:  # noqa: BLE001 - the loop stopped or hung meanwhile
+                logger.warning("Could not close HTTP clients on another event loop: %s", exc)
+    close_http_clients()
@@ -0,0 +1,123 @@
+"""Thread-safe OAuth access-token cache shared by client-credential providers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A fetcher performs the token request and returns (access_token, expires_in_seconds),
+# or None when the provider is unreachable or rejects the credentials.
+TokenFetcher = Callable[[], Optional[Tuple[str, float]]]
+
+
+class OAuthTokenManager:
+    """Cache one bearer token and refresh it without stampeding the token endpoint.
+
+    * Single flight: when the token is missing or expired, exactly one caller
+      fetches a new one while concurrent callers wait for that result.
+    * Refresh ahead: once fewer than ``refresh_ahead`` seconds remain, callers
+      keep getting the current token while one background thread renews it.
+    * Short-lived tokens: ``expiry_margin`` is capped at a quarter of the
+      token's lifetime and ``refresh_ahead`` at half of what remains, so a
+      token that lives 300 s or less is still used for a while before the
+      next refresh instead of triggering one on every call.
+    * Failure backoff: after a failed fetch, callers get ``None`` for
+      ``failure_backoff`` seconds instead of all retrying at once.
+    """
+
+    def __init__(
+        self,
+        fetch: TokenFetcher,
+        *,
+        expiry_margin: float = 60.0,
+        refresh_ahead: float = 300.0,
+        failure_backoff: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._fetch = fetch
+        self.expiry_margin = expiry_margin
+        self.refresh_ahead = refresh_ahead
+        self.failure_backoff = failure_backoff
+        self._clock = clock
+        self._token = ""
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._retry_after = 0.0
+        self._refresh_lock = threading.Lock()
+        self._background: Optional[threading.Thread] = None
+
+    def get_token(self) -> Optional[str]:
+        """Return a valid token, fetching one first if necessary."""
+
+        now = self._clock()
+        token = self._token
+        if token and now < self._expires_at:
+            if now >= self._refresh_at and now >= self._retry_after:
+                self._refresh_in_background()
+            return token
+        with self._refresh_lock:
+            # Another caller may have refreshed while we waited for the lock.
+            now = self._clock()
+            if self._token and now < self._expires_at:
+                return self._token
+            if now < self._retry_after:
+                return None
+            return self._refresh_locked()
+
+    async def aget_token(self) -> Optional[str]:
+        """Async variant; the blocking fetch runs in a worker thread when needed."""
+
+        now = self._clock()
+        if self._token and now < self._refresh_at:
+            return self._token
+        return await asyncio.to_thread(self.get_token)
+
+    def invalidate(self) -> None:
+        """Drop the cached token, e.g. after the provider answers 401."""
+
+        with self._refresh_lock:
+            self._token = ""
+            self._expires_at = 0.0
+            self._refresh_at = 0.0
+
+    def _refresh_locked(self) -> Optional[str]:
+        try:
+            result = self._fetch()
+        except Exception as exc:  # noqa: BLE001 - fetchers should not break callers
+            logger.warning("Token fetch failed: %s", exc)
+            result = None
+        now = self._clock()
+        if not result or not result[0]:
+            self._retry_after = now + self.failure_backoff
+            return self._token if now < self._expires_at else None
+        token, expires_in = result
+        lifetime = max(0.0, float(expires_in))
+        usable = lifetime - min(self.expiry_margin, lifetime / 4)
+        self._token = token
+        self._expires_at = now + usable
+        self._refresh_at = self._expires_at - min(self.refresh_ahead, usable / 2)
+        self._retry_after = 0.0
+        return token
+
+    def _refresh_in_background(self) -> None:
+        if self._background is not None and self._background.is_alive():
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # a foreground refresh is already running
+
+        def _run() -> None:
+            try:
+                if self._clock() >= self._retry_after:
+                    self._refresh_locked()
+            finally:
+                self._refresh_lock.release()
+
+        self._background = threading.Thread(
+            target=_run, name="oauth-token-refresh", daemon=True
+        )
+        self._background.start()
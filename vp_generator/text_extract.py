@@ -0,0 +1,232 @@
+"""Single-pass extraction of prices, ratings, stops and durations from search text.
+
+Tavily rows and Exa results without a structured summary only carry free text.
+:func:`extract_facts` lower-cases that text once and reads every numeric field
+the agent needs in a single ``finditer`` sweep over one precompiled pattern;
+the keyword fields (nonstop, layover, board type) are substring checks on the
+same lower-cased copy. A 30 KB page is therefore scanned once rather than
+once per field.
+
+Prices are recognised in EUR, USD, GBP and INR, written either before the
+amount (``€412``, ``US$ 389``, ``Rs. 35,000``) or after it (``455 EUR``). They
+are normalised to EUR with the reference rates below.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Indicative rupees per unit; the same reference rates as
+# ``amadeus_client.convert_to_inr``, so both price paths stay comparable.
+INR_PER_UNIT = {"EUR": 90.0, "USD": 83.0, "GBP": 105.0, "INR": 1.0}
+
+DEFAULT_STAR_RATING = 4
+DEFAULT_STOPS = 1
+
+_CURRENCY_CODES = {
+    "eur": "EUR",
+    "usd": "USD",
+    "gbp": "GBP",
+    "inr": "INR",
+    "rs": "INR",
+    "rs.": "INR",
+}
+_CURRENCY_UNITS = {
+    "eur": "EUR",
+    "euro": "EUR",
+    "euros": "EUR",
+    "usd": "USD",
+    "dollar": "USD",
+    "dollars": "USD",
+    "gbp": "GBP",
+    "inr": "INR",
+    "rupee": "INR",
+    "rupees": "INR",
+}
+
+# Every numeric fact is anchored on a number, so one sweep over the digits finds
+# them all: the unit after the number says what it is, and a currency written
+# before it is checked in a short window to its left. Patterns run on
+# lower-cased text, which lets the engine skip straight to the next digit.
+_NUMBER_RE = re.compile(
+    r"(?P<amount>\d(?:[\d.,]*\d)?)"
+    r"(?:\s*(?P<unit>euros?|eur|usd|dollars?|gbp|inr|rupees?|[- ]?stars?|/5|stops?|hours?|hrs?|h)"
+    r"(?![a-z]))?"
+)
+_CURRENCY_SYMBOLS = {"€": "EUR", "$": "USD", "£": "GBP", "₹": "INR"}
+# A currency code before the amount ends in one of these characters; the regex
+# below only runs when it does.
+_CODE_ENDINGS = frozenset("rdps.")
+_CODE_PREFIX_RE = re.compile(r"\b(?P<currency>eur|usd|gbp|inr|rs\.?)\s?$")
+
+_BOARD_TYPES = (
+    ("breakfast", "Bed & Breakfast"),
+    ("half board", "Half Board"),
+    ("full board", "Full Board"),
+)
+_NONSTOP_WORDS = ("nonstop", "non-stop", "direct flight")
+
+
+@dataclass(frozen=True)
+class TextFacts:
+    """Fields read from one block of search text (defaults when absent)."""
+
+    price: float = 0.0
+    currency: Optional[str] = None
+    price_eur: float = 0.0
+    star_rating: int = DEFAULT_STAR_RATING
+    stops: int = DEFAULT_STOPS
+    duration_hours: Optional[int] = None
+    board_type: str = "Room Only"
+
+
+def to_eur(amount: float, currency: str) -> float:
+    if currency == "EUR":
+        return amount
+    rate = INR_PER_UNIT.get(currency.upper())
+    if rate is None:
+        return amount
+    return round(amount * rate / INR_PER_UNIT["EUR"], 2)
+
+
+def _parse_amount(raw: str) -> Optional[float]:
+    """Parse ``1,234.50``, ``1.234,50``, ``30,000`` or ``1.25`` into a float."""
+
+    if raw.isdigit():
+        return float(raw)
+    if "," in raw and "." in raw:
+        # Whichever separator comes last is the decimal point.
+        if raw.rfind(",") > raw.rfind("."):
+            raw = raw.replace(".", "").replace(",", ".")
+        else:
+            raw = raw.replace(",", "")
+    elif "," in raw:
+        whole, _, fraction = raw.rpartition(",")
+        raw = raw.replace(",", "") if len(fraction) == 3 else f"{whole.replace(',', '')}.{fraction}"
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def _currency_before(lowered: str, start: int) -> Optional[str]:
+    """Currency written immediately before ``lowered[start]`` (one space allowed)."""
+
+    index = start - 1
+    if index > 0 and lowered[index] == " ":
+        index -= 1
+    if index < 0:
+        return None
+    char = lowered[index]
+    if char in _CURRENCY_SYMBOLS:
+        return _CURRENCY_SYMBOLS[char]
+    if char in _CODE_ENDINGS:
+        match = _CODE_PREFIX_RE.search(lowered, max(0, index - 3), index + 1)
+        if match:
+            return _CURRENCY_CODES[match.group("currency")]
+    return None
+
+
+def _classify(lowered: str, match: "re.Match[str]") -> Optional[Tuple[str, Any]]:
+    """Turn one number match into ``(kind, value)``, or ``None`` if it is just a number."""
+
+    unit = match.group("unit")
+    if unit is None or unit in _CURRENCY_UNITS:
+        currency = _currency_before(lowered, match.start())
+        if currency is None and unit is None:
+            return None
+        amount = _parse_amount(match.group("amount"))
+        if amount is None:
+            return None
+        if currency is not None:
+            return "price_pre", (amount, currency)
+        return "price_post", (amount, _CURRENCY_UNITS[unit])
+    amount = _parse_amount(match.group("amount"))
+    if amount is None:
+        return None
+    if unit.endswith(("star", "stars", "/5")):
+        return "rating", int(round(amount))
+    if not amount.is_integer():
+        return None
+    if unit.startswith("stop"):
+        return "stops", int(amount)
+    return ("hours", int(amount)) if amount < 100 else None
+
+
+def _first(lowered: str, kinds: Tuple[str, ...]) -> Optional[Tuple[str, Any]]:
+    """First fact of one of ``kinds``; ``search`` beats ``finditer`` on short fields."""
+
+    position = 0
+    while True:
+        match = _NUMBER_RE.search(lowered, position)
+        if match is None:
+            return None
+        fact = _classify(lowered, match)
+        if fact is not None and fact[0] in kinds:
+            return fact
+        position = match.end()
+
+
+def extract_facts(text: str) -> TextFacts:
+    """Read price, star rating, stops, duration and board type in one sweep.
+
+    Each field keeps its first occurrence. As before, a price written with a
+    leading currency beats one with a trailing code, "nonstop" beats a stop
+    count, and breakfast beats half/full board.
+    """
+
+    if not text:
+        return TextFacts()
+    lowered = text.lower()
+    found: Dict[str, Any] = {}
+    for match in _NUMBER_RE.finditer(lowered):
+        fact = _classify(lowered, match)
+        if fact is not None:
+            found.setdefault(*fact)
+
+    price = found.get("price_pre") or found.get("price_post")
+    if any(word in lowered for word in _NONSTOP_WORDS):
+        stops = 0
+    else:
+        stops = found.get("stops", 1 if "layover" in lowered else DEFAULT_STOPS)
+    board_type = next((label for key, label in _BOARD_TYPES if key in lowered), "Room Only")
+    return TextFacts(
+        price=price[0] if price else 0.0,
+        currency=price[1] if price else None,
+        price_eur=to_eur(*price) if price else 0.0,
+        star_rating=found.get("rating", DEFAULT_STAR_RATING),
+        stops=stops,
+        duration_hours=found.get("hours"),
+        board_type=board_type,
+    )
+
+
+def price_eur(value: Any) -> float:
+    """EUR value of a price field: a number (assumed EUR) or text such as ``"₹35,000"``."""
+
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str) or not value:
+        return 0.0
+    lowered = value.lower()
+    fact = _first(lowered, ("price_pre", "price_post"))
+    if fact is None:
+        return 0.0
+    if fact[0] == "price_post":
+        # A later amount with a leading currency still takes precedence.
+        prefixed = _first(lowered, ("price_pre",))
+        fact = prefixed or fact
+    return to_eur(*fact[1])
+
+
+def extract_rating(value: Any) -> int:
+    """Star rating from ``"4-star"``, ``"4.5/5"`` or a bare number; 4 when unknown."""
+
+    if isinstance(value, (int, float)):
+        return int(round(value))
+    if not isinstance(value, str):
+        return DEFAULT_STAR_RATING
+    fact = _first(value.lower(), ("rating",))
+    return fact[1] if fact else DEFAULT_STAR_RATING
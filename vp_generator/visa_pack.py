@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import contextvars
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 
 from .models import (
@@ -16,7 +18,9 @@ from .models import (
     VisaPackDocuments,
 )
 from .utils import make_date_list, truncate_summary, format_friendly_date, format_friendly_datetime
-from .llm import llm_call, get_client
+from .llm import create_response, llm_call
+from .llm_cache import get_llm_cache, llm_cache_bypassed, llm_cache_key
+from .pipeline import Stage, run_stages
 from .services.flights import recommend_flights
 from .services.hotels import recommend_hotels
 from .services.insurance import recommend_insurance
@@ -24,6 +28,8 @@ from .services.insurance import recommend_insurance
 
 logger = logging.getLogger(__name__)
 
+SEGMENT_MODEL = "gpt-4.1-mini"
+
 
 def apply_budget_band_to_plan(trip_plan: TripPlan) -> None:
     band = (trip_plan.request.budget_band or "medium").lower()
@@ -107,7 +113,6 @@ def apply_rules_agent(trip_request: TripRequest) -> VisaRules:
 
 def generate_itinerary_segment_structured(trip_plan: TripPlan, segment_dates: List[str]) -> List[DayPlan]:
     req = trip_plan.request
-    client = get_client()
     tools = [
         {
             "type": "function",
@@ -164,25 +169,34 @@ def generate_itinerary_segment_structured(trip_plan: TripPlan, segment_dates: Li
     - No line breaks; just a single paragraph per day.
     - Visa-friendly: typical sightseeing, museums, walking tours, cafes, day trips.
     """
-    response = client.responses.create(
-        model="gpt-4.1-mini",
-        input=[{"role": "user", "content": prompt}],
-        tools=tools,
-        tool_choice={"type": "function", "name": "generate_itinerary_segment"},
-        temperature=0.3,
-        max_output_tokens=900,
-    )
-    tool_call = next(
-        (
-            item
-            for item in response.output
-            if item.type == "function_call" and item.name == "generate_itinerary_segment"
-        ),
-        None,
-    )
-    if tool_call is None:
-        raise RuntimeError("Model did not return a generate_itinerary_segment function call.")
-    data = json.loads(tool_call.arguments)
+    cache = get_llm_cache()
+    key = llm_cache_key(SEGMENT_MODEL, 0.3, prompt, tool="generate_itinerary_segment", max_output_tokens=900)
+    arguments = cache.get(key) if cache is not None and not llm_cache_bypassed() else None
+    if arguments is None:
+        response = create_response(
+            model=SEGMENT_MODEL,
+            input=[{"role": "user", "content": prompt}],
+            tools=tools,
+            tool_choice={"type": "function", "name": "generate_itinerary_segment"},
+            temperature=0.3,
+            max_output_tokens=900,
+        )
+        tool_call = next(
+            (
+                item
+                for item in response.output
+                if item.type == "function_call" and item.name == "generate_itinerary_segment"
+            ),
+            None,
+        )
+        if tool_call is None:
+            raise RuntimeError("Model did not return a generate_itinerary_segment function call.")
+        arguments = tool_call.arguments
+        data = json.loads(arguments)
+        if cache is not None:
+            cache.set(key, SEGMENT_MODEL, arguments)
+    else:
+        data = json.loads(arguments)
     raw_days = data.get("days", [])
     day_plans: List[DayPlan] = []
     for item in raw_days:
@@ -214,35 +228,47 @@ def generate_itinerary_segment_structured(trip_plan: TripPlan, segment_dates: Li
     return final_day_plans
 
 
-def plan_itinerary_agent(trip_plan: TripPlan) -> None:
+MAX_DAYS_PER_CALL = 8
+MAX_SEGMENT_WORKERS = 4
+
+
+def _fallback_day_plans(trip_plan: TripPlan, segment_dates: List[str]) -> List[DayPlan]:
+    city = trip_plan.request.destination_countries[0]
+    return [DayPlan(date=d, city=city, summary="Sightseeing and local exploration.") for d in segment_dates]
+
+
+def _plan_segment(trip_plan: TripPlan, segment_dates: List[str]) -> List[DayPlan]:
+    try:
+        return generate_itinerary_segment_structured(trip_plan, segment_dates)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Fallback itinerary used due to error: %s", exc)
+        return _fallback_day_plans(trip_plan, segment_dates)
+
+
+def plan_itinerary_agent(trip_plan: TripPlan, max_workers: int = MAX_SEGMENT_WORKERS) -> None:
     req = trip_plan.request
     all_dates = make_date_list(req.start_date, req.end_date)
-    MAX_DAYS_PER_CALL = 8
     logger.info("Planning itinerary for %s day(s)", len(all_dates))
+    segments = [all_dates[i : i + MAX_DAYS_PER_CALL] for i in range(0, len(all_dates), MAX_DAYS_PER_CALL)]
     all_day_plans: List[DayPlan] = []
-    for i in range(0, len(all_dates), MAX_DAYS_PER_CALL):
-        segment_dates = all_dates[i : i + MAX_DAYS_PER_CALL]
-        try:
-            segment_plans = generate_itinerary_segment_structured(trip_plan, segment_dates)
-            all_day_plans.extend(segment_plans)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("Fallback itinerary used due to error: %s", exc)
-            for d in segment_dates:
-                all_day_plans.append(
-                    DayPlan(date=d, city=req.destination_countries[0], summary="Sightseeing and local exploration.")
-                )
-    final_plans: List[DayPlan] = []
-    used_dates = set()
-    for d in all_dates:
-        matching = [dp for dp in all_day_plans if dp.date == d and dp.date not in used_dates]
-        if matching:
-            final_plans.append(matching[0])
-            used_dates.add(d)
-        else:
-            final_plans.append(
-                DayPlan(date=d, city=req.destination_countries[0], summary="Sightseeing and local exploration.")
-            )
-    trip_plan.itinerary = final_plans
+    if segments:
+        # Segments are independent LLM round-trips; run them side by side and
+        # reassemble by date below so completion order does not matter. Each
+        # runs in a copy of the caller's context so the LLM cache bypass
+        # (``?regenerate=true``) reaches the workers.
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(segments)))) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, _plan_segment, trip_plan, segment)
+                for segment in segments
+            ]
+            for future in futures:
+                all_day_plans.extend(future.result())
+    plans_by_date: Dict[str, DayPlan] = {}
+    for day_plan in all_day_plans:
+        plans_by_date.setdefault(day_plan.date, day_plan)
+    trip_plan.itinerary = [
+        plans_by_date.get(d) or _fallback_day_plans(trip_plan, [d])[0] for d in all_dates
+    ]
 
 
 def recommend_flights_agent(trip_plan: TripPlan) -> None:
@@ -320,7 +346,7 @@ def validate_trip_agent(trip_plan: TripPlan) -> None:
     trip_plan.validation_issues = issues
 
 
-def generate_documents_agent(trip_plan: TripPlan) -> None:
+def build_cover_letter_prompt(trip_plan: TripPlan) -> str:
     req = trip_plan.request
     rules = trip_plan.rules
     names = req.traveller_names or []
@@ -382,7 +408,28 @@ def generate_documents_agent(trip_plan: TripPlan) -> None:
 
     Output: plain text letter, no extra commentary.
     """
-    cover_letter = llm_call(cover_prompt)
+    return cover_prompt
+
+
+def draft_cover_letter_agent(trip_plan: TripPlan) -> None:
+    """Write the cover letter; it only needs rules and flights, so it can run early."""
+
+    cover_letter = llm_call(build_cover_letter_prompt(trip_plan)).strip()
+    trip_plan.documents = VisaPackDocuments(
+        cover_letter=cover_letter,
+        travel_itinerary_text="",
+        flights_summary="",
+        hotels_summary="",
+        checklist="",
+    )
+
+
+def generate_documents_agent(trip_plan: TripPlan) -> None:
+    rules = trip_plan.rules
+    if trip_plan.documents and trip_plan.documents.cover_letter:
+        cover_letter = trip_plan.documents.cover_letter
+    else:
+        cover_letter = llm_call(build_cover_letter_prompt(trip_plan))
     table_lines = ["| Date | City | Stay Options | Activities & Notes | Transport |", "| --- | --- | --- | --- | --- |"]
     for day in trip_plan.itinerary:
         stay_text = "<br>".join(day.stay_options) if day.stay_options else "See recommended stays"
@@ -458,15 +505,47 @@ def build_transport_suggestion(prev_city: str, next_city: str) -> str:
     return f"Travel from {prev_city} to {next_city} via train or short intra-Europe flight."
 
 
+def _apply_rules_stage(trip_plan: TripPlan) -> None:
+    trip_plan.rules = apply_rules_agent(trip_plan.request)
+
+
+# The legacy pipeline as a DAG: each stage names the plan resources it needs and
+# produces, and ``run_stages`` starts it as soon as those inputs exist.
+VISA_PACK_STAGES = (
+    Stage("budget", apply_budget_band_to_plan, inputs=("request",), outputs=("budget",)),
+    Stage("rules", _apply_rules_stage, inputs=("request",), outputs=("rules",)),
+    Stage("itinerary", plan_itinerary_agent, inputs=("request",), outputs=("itinerary",)),
+    Stage("flights", recommend_flights_agent, inputs=("request",), outputs=("flights",)),
+    Stage("hotels", recommend_hotels_agent, inputs=("itinerary",), outputs=("hotels",)),
+    Stage("insurance", recommend_insurance_agent, inputs=("request",), outputs=("insurance",)),
+    Stage(
+        "enrich_itinerary",
+        enrich_itinerary,
+        inputs=("itinerary", "flights", "hotels"),
+        outputs=("enriched_itinerary",),
+    ),
+    Stage(
+        "validate",
+        validate_trip_agent,
+        inputs=("enriched_itinerary", "flights", "hotels"),
+        outputs=("validation",),
+    ),
+    Stage(
+        "cover_letter",
+        draft_cover_letter_agent,
+        inputs=("rules", "flights"),
+        outputs=("cover_letter",),
+    ),
+    Stage(
+        "documents",
+        generate_documents_agent,
+        inputs=("cover_letter", "enriched_itinerary", "hotels", "rules"),
+        outputs=("documents",),
+    ),
+)
+
+
 def generate_visa_pack(trip_request: TripRequest) -> TripPlan:
     trip_plan = TripPlan(request=trip_request)
-    apply_budget_band_to_plan(trip_plan)
-    trip_plan.rules = apply_rules_agent(trip_request)
-    plan_itinerary_agent(trip_plan)
-    recommend_flights_agent(trip_plan)
-    recommend_hotels_agent(trip_plan)
-    recommend_insurance_agent(trip_plan)
-    enrich_itinerary(trip_plan)
-    validate_trip_agent(trip_plan)
-    generate_documents_agent(trip_plan)
+    run_stages(trip_plan, VISA_PACK_STAGES)
     return trip_plan